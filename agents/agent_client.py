@@ -0,0 +1,74 @@
+import logging
+import asyncio
+import aiohttp
+from api.api_sys import (
+    AGENT_POOL_LIMIT,
+    AGENT_POOL_LIMIT_PER_HOST,
+    AGENT_KEEPALIVE_TIMEOUT,
+    AGENT_REQUEST_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AgentClient:
+    """應用程式層級的 AI HTTP 用戶端（所有 Agent 共用同一個連線池）"""
+
+    limit = AGENT_POOL_LIMIT
+    limit_per_host = AGENT_POOL_LIMIT_PER_HOST
+    keepalive_timeout = AGENT_KEEPALIVE_TIMEOUT
+    request_timeout = AGENT_REQUEST_TIMEOUT
+
+    _session: aiohttp.ClientSession | None = None
+    _lock: asyncio.Lock | None = None
+
+    # === ⚙️ 調整連線池參數（需在 startup 前呼叫）===
+    @classmethod
+    def configure(cls, limit: int = None, limit_per_host: int = None,
+                  keepalive_timeout: float = None, request_timeout: float = None):
+        if cls._session is not None:
+            raise RuntimeError("AgentClient 已啟動，請先 shutdown 再調整設定")
+        if limit is not None:
+            cls.limit = limit
+        if limit_per_host is not None:
+            cls.limit_per_host = limit_per_host
+        if keepalive_timeout is not None:
+            cls.keepalive_timeout = keepalive_timeout
+        if request_timeout is not None:
+            cls.request_timeout = request_timeout
+
+    # === 🚀 啟動：建立共用 connector 與 session ===
+    @classmethod
+    async def startup(cls):
+        if cls._session is not None and not cls._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=cls.limit,
+            limit_per_host=cls.limit_per_host,
+            keepalive_timeout=cls.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        cls._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=cls.request_timeout),
+        )
+        logger.info("🔌 AgentClient 已啟動（limit=%s, per_host=%s）", cls.limit, cls.limit_per_host)
+
+    # === 🛑 關閉：釋放所有保持中的連線 ===
+    @classmethod
+    async def shutdown(cls):
+        session, cls._session = cls._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("🔌 AgentClient 已關閉")
+
+    # === 📡 取得共用 session（未啟動時自動啟動，方便腳本直接使用）===
+    @classmethod
+    async def get_session(cls) -> aiohttp.ClientSession:
+        if cls._session is None or cls._session.closed:
+            if cls._lock is None:
+                cls._lock = asyncio.Lock()
+            async with cls._lock:
+                if cls._session is None or cls._session.closed:
+                    await cls.startup()
+        return cls._session
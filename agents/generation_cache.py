@@ -0,0 +1,71 @@
+import logging
+import hashlib
+import json
+from api.api_sys import MODEL_NAME, LLM_CACHE_ENABLED, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+from controllers.llm_cache_controller import LLMCacheController
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationCache:
+    """AI 生成結果快取（內容定址：模型 + prompt + generationConfig → sha256）"""
+
+    enabled = LLM_CACHE_ENABLED
+    ttl = LLM_CACHE_TTL
+    max_entries = LLM_CACHE_MAX_ENTRIES
+
+    hits = 0
+    misses = 0
+    bypassed = 0
+    evictions = 0
+
+    # === 🔑 產生快取 key ===
+    @staticmethod
+    def make_key(prompt: str, generation_config: dict) -> str:
+        raw = json.dumps(
+            {"model": MODEL_NAME, "prompt": prompt, "generationConfig": generation_config},
+            ensure_ascii=False, sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # === 📥 讀取（use_cache=False 代表使用者明確要求重新生成）===
+    @classmethod
+    async def get(cls, key: str, use_cache: bool = True):
+        if not cls.enabled:
+            return None
+        if not use_cache:
+            cls.bypassed += 1
+            return None
+        try:
+            value = await LLMCacheController.lookup(key, cls.ttl)
+        except Exception as e:
+            logger.warning("⚠️ 讀取生成快取失敗：%s", e)
+            value = None
+        if value is None:
+            cls.misses += 1
+        else:
+            cls.hits += 1
+        return value
+
+    # === 📤 寫入並淘汰超量資料 ===
+    @classmethod
+    async def put(cls, key: str, value: dict):
+        if not cls.enabled or not value:
+            return
+        try:
+            await LLMCacheController.store(key, MODEL_NAME, value)
+            cls.evictions += await LLMCacheController.evict(cls.max_entries, cls.ttl)
+        except Exception as e:
+            logger.warning("⚠️ 寫入生成快取失敗：%s", e)
+
+    # === 📊 命中統計 ===
+    @classmethod
+    def stats(cls) -> dict:
+        lookups = cls.hits + cls.misses
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "bypassed": cls.bypassed,
+            "evictions": cls.evictions,
+            "hit_rate": round(cls.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,126 @@
+import asyncio
+import collections
+import time
+from api.api_sys import LLM_HEDGE_ENABLED, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MAX_RATIO, LLM_HEDGE_MIN_SAMPLES
+
+
+class LatencyTracker:
+    """保留最近 window 次主請求的延遲（被取消的以已等待時間為下限），用來計算百分位數"""
+
+    def __init__(self, window: int = 200):
+        self.samples = collections.deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(p * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgePolicy:
+    """
+    對沖請求：若超過「近期延遲第 p 百分位」仍未回應，就再送一次相同請求，
+    取先完成者並取消另一個。對沖次數受 max_ratio（佔總請求比例）限制。
+    """
+
+    def __init__(self, enabled: bool = LLM_HEDGE_ENABLED, percentile: float = LLM_HEDGE_PERCENTILE,
+                 max_ratio: float = LLM_HEDGE_MAX_RATIO, min_samples: int = LLM_HEDGE_MIN_SAMPLES):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.capacity_denied = 0
+
+    def threshold(self) -> float | None:
+        if len(self.latency.samples) < self.min_samples:
+            return None
+        return self.latency.percentile(self.percentile)
+
+    # === 🏁 執行（必要時對沖）===
+    async def run(self, factory, reserve=None, release=None):
+        """
+        factory：無參數、回傳 coroutine 的函式（每次呼叫都會送出一個新請求）。
+        reserve / release：對沖前向排程器多要一個名額；reserve() 回傳 False 代表目前太忙，不對沖。
+        """
+        self.requests += 1
+        primary = asyncio.ensure_future(self._timed(factory))
+        backup = None
+        try:
+            threshold = self.threshold() if self.enabled else None
+            if threshold is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done:
+                return primary.result()
+
+            if self.hedged >= self.max_ratio * self.requests:
+                self.budget_denied += 1
+                return await primary
+            if reserve is not None and not reserve():
+                self.capacity_denied += 1
+                return await primary
+
+            self.hedged += 1
+            backup = asyncio.ensure_future(self._timed(factory, record=False))
+            pending, error = {primary, backup}, None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 取消落後（或呼叫端已放棄）的請求
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+            if backup is not None and release is not None:
+                release()
+
+    async def _timed(self, factory, record: bool = True):
+        """
+        只記錄主請求：對沖請求晚出發、又常在主請求卡住時才贏，算進去會讓百分位數越算越低。
+        主請求落後被取消時，已等待的時間是實際延遲的下限，照樣記錄。
+        """
+        start = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            if record:
+                self.latency.record(time.monotonic() - start)
+            raise
+        if record:
+            self.latency.record(time.monotonic() - start)
+        return result
+
+    def stats(self) -> dict:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        threshold = self.threshold()
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+            "budget_denied": self.budget_denied,
+            "capacity_denied": self.capacity_denied,
+            "threshold_ms": ms(threshold),
+            "p50_ms": ms(self.latency.percentile(0.5)),
+            "p95_ms": ms(self.latency.percentile(0.95)),
+            "p99_ms": ms(self.latency.percentile(0.99)),
+        }
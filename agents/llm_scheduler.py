@@ -0,0 +1,184 @@
+import logging
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from api.api_sys import LLM_MAX_IN_FLIGHT, LLM_RPM, LLM_TPM
+from utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """數字越小越優先"""
+    INTERACTIVE = 0   # 使用者在畫面上等待的生成
+    BACKGROUND = 1    # 背景工作（例如佇列中的 job）
+    BATCH = 2         # 批次大量生成
+
+
+class TokenBucket:
+    """每分鐘 rate 個單位的令牌桶；rate <= 0 代表不限制"""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """還要等幾秒才拿得到 amount 個令牌（0 = 現在就可以）"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.rate
+
+    def take(self, amount: float):
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """
+    所有 AI 呼叫的共用排程器：
+    - 同時進行中的請求數上限（max_in_flight）
+    - 每分鐘請求數 / token 數的令牌桶
+    - 依 Priority 排隊，並透過 on_queue(位置) 回報排隊狀況給畫面
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, rpm: float = LLM_RPM, tpm: float = LLM_TPM):
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self._queue = []              # heap: (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._timer = None
+        self.paused_until = 0.0
+        self.admitted = 0
+        self.total_wait = 0.0
+
+    # === 🎟️ 取得執行名額（async with scheduler.slot(...)）===
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE, est_tokens: int = 0, on_queue=None):
+        await self.acquire(priority, est_tokens, on_queue)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE, est_tokens: int = 0, on_queue=None):
+        waiter = {
+            "future": asyncio.get_running_loop().create_future(),
+            "tokens": est_tokens,
+            "on_queue": on_queue,
+            "enqueued": time.monotonic(),
+            "position": None,
+        }
+        heapq.heappush(self._queue, (int(priority), next(self._seq), waiter))
+        self._dispatch()
+        if not waiter["future"].done():
+            self._notify_positions()
+        try:
+            await waiter["future"]
+        except asyncio.CancelledError:
+            # 已經拿到名額才被取消 → 還回去
+            if waiter["future"].done() and not waiter["future"].cancelled():
+                self.release()
+            self._dispatch()
+            raise
+
+    def try_acquire(self, est_tokens: int = 0) -> bool:
+        """不排隊：目前有空位且令牌足夠才拿名額（給對沖這類「可有可無」的請求用）"""
+        if any(not entry[2]["future"].done() for entry in self._queue):
+            return False
+        if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+            return False
+        if self.paused_until > time.monotonic():
+            return False
+        if self.requests.wait_time(1) > 0 or self.tokens.wait_time(est_tokens) > 0:
+            return False
+        self.requests.take(1)
+        self.tokens.take(est_tokens)
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    # === 🚦 依優先序放行，名額或令牌不足時排定稍後再試 ===
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        moved = False
+        while self._queue:
+            entry = self._queue[0]
+            waiter = entry[2]
+            if waiter["future"].done():        # 呼叫者已取消
+                heapq.heappop(self._queue)
+                moved = True
+                continue
+            if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+                break
+            wait = max(
+                self.paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(waiter["tokens"]),
+            )
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                break
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(waiter["tokens"])
+            self.in_flight += 1
+            self.admitted += 1
+            waited = time.monotonic() - waiter["enqueued"]
+            self.total_wait += waited
+            Metrics.observe("llm_queue_wait_seconds", waited, priority=Priority(entry[0]).name)
+            waiter["future"].set_result(None)
+            moved = True
+        if moved:
+            self._notify_positions()
+
+    # === ⏸️ 上游要求降速（429 + Retry-After）→ 暫停放行新請求 ===
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self._dispatch()
+
+    def _notify_positions(self):
+        pending = sorted(entry for entry in self._queue if not entry[2]["future"].done())
+        for position, (_, _, waiter) in enumerate(pending, start=1):
+            if waiter["on_queue"] and waiter["position"] != position:
+                waiter["position"] = position
+                try:
+                    waiter["on_queue"](position)
+                except Exception as e:
+                    logger.warning("⚠️ 排隊通知失敗：%s", e)
+
+    # === 📊 排程狀態 ===
+    def stats(self) -> dict:
+        waiting = [entry for entry in self._queue if not entry[2]["future"].done()]
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": len(waiting),
+            "queued_by_priority": {p.name: sum(1 for e in waiting if e[0] == p) for p in Priority},
+            "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            "admitted": self.admitted,
+            "avg_wait_seconds": round(self.total_wait / self.admitted, 4) if self.admitted else 0.0,
+        }
@@ -1,18 +1,188 @@
+import logging
 import aiohttp
 import asyncio
 import json
-from api.api_sys import API_URL, HEADERS
-from utils.json_cleaner import clean_json_text
+import inspect
+import time
+from api.api_sys import API_URL, STREAM_API_URL, HEADERS
+from agents.agent_client import AgentClient
+from agents.generation_cache import GenerationCache
+from agents.single_flight import SingleFlight
+from agents.llm_scheduler import LLMScheduler, Priority
+from agents.retry_policy import RetryPolicy, FATAL
+from agents.hedging import HedgePolicy
+from utils.metrics import Metrics
+from utils.json_cleaner import extract_json
+from utils.json_stream import IncrementalJSONParser
+
+logger = logging.getLogger(__name__)
 
 
 class ProjectAgent:
     """AI 專案生成 Agent - 專職 AI 溝通"""
 
+    api_url = API_URL  # 可改指向本機 stub（benchmark / 離線測試用）
+    stream_url = STREAM_API_URL
+    flights = SingleFlight()  # 相同 prompt 的並行請求共用一次 AI 呼叫
+    scheduler = LLMScheduler()  # 全域併發上限 + RPM/TPM 令牌桶 + 優先序
+    retry_policy = RetryPolicy()  # 錯誤分類 / 退避 / 期限 / 斷路器
+    hedge_policy = HedgePolicy()  # 慢請求對沖（降低尾端延遲）
+
+    generation_config = {
+        "temperature": 0.7,
+        "maxOutputTokens": 2048,
+        "topP": 0.9,
+        "topK": 40,
+    }
+
+    # === 📐 各欄位說明與輸出 token 預估（部分再生用）===
+    FIELD_HINTS = {
+        "description": "系統用途與特色簡述",
+        "architecture": "整體系統架構與主要模組說明",
+        "frontend.language": "前端語言（例如：JavaScript、Vue）",
+        "frontend.platform": "前端平台（例如：Web、App）",
+        "frontend.library": "主要前端框架（例如：React、Vue.js）",
+        "backend.language": "後端語言（例如：Python、Node.js）",
+        "backend.platform": "後端平台（例如：FastAPI、Spring Boot）",
+        "backend.library": "主要後端框架（例如：SQLAlchemy、Express.js）",
+    }
+    FIELD_TOKEN_BUDGET = {"description": 512, "architecture": 768}
+    DEFAULT_FIELD_TOKENS = 64       # 語言/平台/函式庫這類短欄位
+    PARTIAL_TOKEN_OVERHEAD = 64     # JSON 括號、key 名稱等固定開銷
+    PARTIAL_MIN_TOKENS = 256        # 下限：避免只選一個短欄位時輸出被截斷
+    # gemini-2.5 的思考 token 也算在 maxOutputTokens 內，部分再生的小額度會被思考吃光 → 關閉思考
+    PARTIAL_THINKING_CONFIG = {"thinkingBudget": 0}
+
+    # === 📊 Agent 狀態（快取命中、合併請求）===
+    @staticmethod
+    def stats() -> dict:
+        return {
+            "cache": GenerationCache.stats(),
+            "single_flight": ProjectAgent.flights.stats(),
+            "scheduler": ProjectAgent.scheduler.stats(),
+            "retry": ProjectAgent.retry_policy.snapshot(),
+            "hedging": ProjectAgent.hedge_policy.stats(),
+        }
+
     # === 🧠 初次或完整再生皆可用 ===
     @staticmethod
-    async def generate_project_json(project_name: str) -> dict:
-        """根據專案名稱生成完整專案 JSON"""
-        prompt = f"""
+    async def generate_project_json(project_name: str, use_cache: bool = True,
+                                    priority: Priority = Priority.INTERACTIVE, on_queue=None) -> dict:
+        """根據專案名稱生成完整專案 JSON（use_cache=False 會略過快取、強制重新生成）"""
+        prompt = ProjectAgent._project_prompt(project_name)
+        return await ProjectAgent._send_request(prompt, use_cache=use_cache, priority=priority, on_queue=on_queue)
+
+    # === 📡 串流生成：每個欄位一完成就透過 on_field(path, value) 回報 ===
+    @staticmethod
+    async def stream_project_json(project_name: str, on_field, use_cache: bool = True,
+                                  priority: Priority = Priority.INTERACTIVE, on_queue=None) -> dict:
+        """
+        使用 streamGenerateContent（SSE）生成完整專案 JSON。
+        on_field 可為一般函式或 async 函式，參數為 (("frontend", "language"), "Vue") 這類路徑與值。
+        on_queue(位置) 會在排隊等待 AI 名額時被呼叫。
+        串流失敗時退回一般（非串流）呼叫。
+        """
+        prompt = ProjectAgent._project_prompt(project_name)
+        config = ProjectAgent.generation_config
+        data = {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": config}
+
+        async def emit(path, value):
+            # 畫面回呼失敗（例如頁面已關閉）不應中斷共用中的串流
+            try:
+                result = on_field(path, value)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("⚠️ 串流欄位回呼失敗：%s", e)
+
+        async def emit_all(obj, prefix=()):
+            for key, value in obj.items():
+                if isinstance(value, dict):
+                    await emit_all(value, prefix + (key,))
+                else:
+                    await emit(prefix + (key,), value)
+
+        cache_key = GenerationCache.make_key(prompt, config)
+        cached = await GenerationCache.get(cache_key, use_cache=use_cache)
+        if cached is not None:
+            await emit_all(cached)
+            return cached
+
+        result, shared = await ProjectAgent.flights.do(
+            cache_key, lambda: ProjectAgent._stream_upstream(data, cache_key, emit, emit_all, priority, on_queue)
+        )
+        if shared and result:
+            await emit_all(result)  # 併入別人的串流 → 結果一次補齊
+        return result
+
+    # === 🌐 實際呼叫串流端點 ===
+    @staticmethod
+    async def _stream_upstream(data: dict, cache_key: str, emit, emit_all,
+                               priority: Priority = Priority.INTERACTIVE, on_queue=None) -> dict:
+        policy = ProjectAgent.retry_policy
+        if not policy.breaker.allow():
+            policy.fast_failed += 1
+            logger.warning("🚫 AI 服務暫時異常（斷路器開啟），直接返回")
+            return {}
+
+        probe = policy.breaker.state == policy.breaker.HALF_OPEN
+        parser = IncrementalJSONParser()
+        raw = []
+        start = time.perf_counter()
+        first_field = True
+        try:
+            policy.record_attempt()
+            session = await AgentClient.get_session()
+            async with ProjectAgent.scheduler.slot(priority, ProjectAgent._estimate_tokens(data), on_queue), \
+                    session.post(ProjectAgent.stream_url, headers=HEADERS, json=data) as response:
+                if response.status != 200:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history,
+                        status=response.status, headers=response.headers,
+                    )
+                async for line in response.content:
+                    line = line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = json.loads(line[len("data:"):])
+                    for part in (chunk.get("candidates") or [{}])[0].get("content", {}).get("parts", []):
+                        text = part.get("text", "")
+                        raw.append(text)
+                        for path, value in parser.feed(text):
+                            if first_field:
+                                Metrics.observe("agent_stream_first_field_seconds", time.perf_counter() - start)
+                                first_field = False
+                            await emit(path, value)
+        except (asyncio.TimeoutError, aiohttp.ClientError, json.JSONDecodeError) as e:
+            if policy.record_error(e) == FATAL:
+                logger.error("🚫 串流生成失敗且無法重試：%r", e)
+                return {}
+            logger.warning("⚠️ 串流生成失敗，改用一般呼叫：%r", e)
+            result = await ProjectAgent._request_upstream(data, cache_key, priority, on_queue)
+            if result:
+                await emit_all(result)
+            return result
+        finally:
+            if probe:
+                policy.breaker.release_probe()
+
+        policy.record_success()
+        Metrics.observe("agent_stream_seconds", time.perf_counter() - start)
+        result = parser.result if parser.done else None
+        if not result:
+            # 串流文字不完整 → 用容錯解析器再解析一次（可補齊截斷的結尾）
+            try:
+                result, _ = extract_json("".join(raw))
+            except json.JSONDecodeError:
+                result = {}
+        if result:
+            await GenerationCache.put(cache_key, result)
+        return result
+
+    # === 📝 完整專案 prompt ===
+    @staticmethod
+    def _project_prompt(project_name: str) -> str:
+        return f"""
 你是一名資深系統設計師。
 請根據使用者輸入的專案名稱「{project_name}」，產生一份標準 JSON 結構的系統設計初稿。
 請使用繁體中文，且只輸出 JSON，不要任何多餘文字。
@@ -36,87 +206,186 @@ JSON 結構如下：
 }}
 ⚠️ 請務必只輸出 JSON，開頭與結尾必須為 {{ 與 }}。
 """
-        return await ProjectAgent._send_request(prompt)
+
+    # === ✂️ 部分再生：只請 AI 產生勾選的欄位 ===
+    @staticmethod
+    async def generate_partial_json(project_name: str, current: dict, paths: list[tuple],
+                                    use_cache: bool = False,
+                                    priority: Priority = Priority.INTERACTIVE, on_queue=None) -> dict:
+        """
+        以目前專案內容為上下文，只重新生成 paths 指定的欄位（例如 ("frontend", "library")）。
+        回傳只含這些欄位的巢狀 JSON，maxOutputTokens 依欄位數量調整（不低於 PARTIAL_MIN_TOKENS，且關閉思考）。
+        """
+        paths = [tuple(p) for p in paths if p]
+        if not paths:
+            return {}
+
+        skeleton, budget = {}, ProjectAgent.PARTIAL_TOKEN_OVERHEAD
+        for path in paths:
+            dotted = ".".join(path)
+            ref = skeleton
+            for k in path[:-1]:
+                ref = ref.setdefault(k, {})
+            ref[path[-1]] = ProjectAgent.FIELD_HINTS.get(dotted, "")
+            budget += ProjectAgent.FIELD_TOKEN_BUDGET.get(dotted, ProjectAgent.DEFAULT_FIELD_TOKENS)
+
+        context = json.dumps({"project_name": project_name, **(current or {})}, ensure_ascii=False, indent=4)
+        structure = json.dumps(skeleton, ensure_ascii=False, indent=4)
+        prompt = f"""
+你是一名資深系統設計師。
+以下是專案「{project_name}」目前的系統設計 JSON：
+{context}
+
+請在不改變其他設定的前提下，只重新生成下列欄位：{", ".join(".".join(p) for p in paths)}。
+請使用繁體中文，且只輸出 JSON，不要任何多餘文字，也不要輸出未列出的欄位。
+
+JSON 結構如下：
+{structure}
+⚠️ 請務必只輸出 JSON，開頭與結尾必須為 {{ 與 }}。
+"""
+        config = {
+            **ProjectAgent.generation_config,
+            "maxOutputTokens": max(budget, ProjectAgent.PARTIAL_MIN_TOKENS),
+            "thinkingConfig": ProjectAgent.PARTIAL_THINKING_CONFIG,
+        }
+        return await ProjectAgent._send_request(prompt, generation_config=config, use_cache=use_cache,
+                                                priority=priority, on_queue=on_queue)
 
     # === 🚀 呼叫 Gemini 並解析結果（含詳細終端輸出） ===
     @staticmethod
-    async def _send_request(prompt: str) -> dict:
-        """呼叫 Gemini 並印出三階段輸出：原始 → 清理後 → 解析後"""
+    async def _send_request(prompt: str, generation_config: dict = None, use_cache: bool = True,
+                            priority: Priority = Priority.INTERACTIVE, on_queue=None) -> dict:
+        """呼叫 Gemini；各階段耗時記錄在 Metrics，原始與解析後內容只在 DEBUG 日誌輸出"""
+        config = generation_config or ProjectAgent.generation_config
         data = {
             "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 2048,
-                "topP": 0.9,
-                "topK": 40,
-            },
+            "generationConfig": config,
         }
 
-        for attempt in range(3):
+        # === 🗃️ 先查快取（相同模型 + prompt + 設定 → 直接回傳）===
+        cache_key = GenerationCache.make_key(prompt, config)
+        cached = await GenerationCache.get(cache_key, use_cache=use_cache)
+        if cached is not None:
+            logger.debug("🗃️ 命中生成快取，略過 AI 呼叫")
+            return cached
+
+        # === 🔗 相同請求正在進行中 → 直接共用結果 ===
+        result, shared = await ProjectAgent.flights.do(
+            cache_key, lambda: ProjectAgent._request_upstream(data, cache_key, priority, on_queue)
+        )
+        if shared:
+            logger.debug("🔗 已併入進行中的相同 AI 請求")
+        return result
+
+    # === 🌐 實際呼叫 Gemini（依 RetryPolicy 重試；每次嘗試都要先向排程器取得名額）===
+    @staticmethod
+    async def _request_upstream(data: dict, cache_key: str,
+                                priority: Priority = Priority.INTERACTIVE, on_queue=None) -> dict:
+        policy = ProjectAgent.retry_policy
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
+        est_tokens = ProjectAgent._estimate_tokens(data)
+
+        for attempt in range(policy.max_attempts):
+            if not policy.breaker.allow():
+                policy.fast_failed += 1
+                logger.warning("🚫 AI 服務暫時異常（斷路器開啟），直接返回")
+                return {}
+
+            probe = policy.breaker.state == policy.breaker.HALF_OPEN  # 這次是斷路器的試探請求
+            error = None
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(API_URL, headers=HEADERS, json=data, timeout=60) as response:
-                        if response.status != 200:
-                            print(f"❌ API 回應錯誤: {response.status}")
-                            await asyncio.sleep(1.5)
-                            continue
-
-                        result = await response.json()
-                        text = (
-                            result.get("candidates", [{}])[0]
-                            .get("content", {})
-                            .get("parts", [{}])[0]
-                            .get("text", "{}")
-                        )
-
-                        # === 🧠 第1段：原始 AI 回傳文字 ===
-                        print("\n🧠【原始 AI 回覆文字】")
-                        print("-" * 80)
-                        print(text)
-                        print("-" * 80)
-
-                        # 清理出 JSON 區塊
-                        if "```json" in text:
-                            start = text.find("```json") + len("```json")
-                            end = text.rfind("```")
-                            text = text[start:end].strip()
-                        if "{" in text and "}" in text:
-                            text = text[text.find("{"): text.rfind("}") + 1]
-
-                        # === 🧹 第2段：清理後文字 ===
-                        cleaned = clean_json_text(text) if "clean_json_text" in globals() else text
-                        print("\n🧹【清理後 JSON 文字】")
-                        print("-" * 80)
-                        print(cleaned)
-                        print("-" * 80)
-
-                        # 嘗試解析成 JSON
-                        json_data = {}
-                        try:
-                            json_data = json.loads(cleaned)
-                        except json.JSONDecodeError:
-                            print("⚠️ JSONDecodeError，嘗試修復格式…")
-                            fixed = cleaned.replace("\\n", "\n").replace("```", "").strip()
-                            json_data = json.loads(fixed)
-
-                        # === 📦 第3段：解析後 JSON 結構 ===
-                        print("\n📦【解析後 JSON 物件】")
-                        print(json.dumps(json_data, indent=4, ensure_ascii=False))
-                        print("=" * 80)
-
-                        if not json_data:
-                            print("⚠️ 回傳為空物件，重試中…")
-                            await asyncio.sleep(1.5)
-                            continue
-
-                        return json_data
+                policy.record_attempt()
+                async with ProjectAgent.scheduler.slot(priority, est_tokens, on_queue):
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError("超過請求期限")
+                    json_data = await asyncio.wait_for(
+                        ProjectAgent.hedge_policy.run(
+                            lambda: ProjectAgent._post_once(data),
+                            reserve=lambda: ProjectAgent.scheduler.try_acquire(est_tokens),
+                            release=ProjectAgent.scheduler.release,
+                        ),
+                        remaining,
+                    )
+
+                if json_data:
+                    policy.record_success()
+                    await GenerationCache.put(cache_key, json_data)
+                    return json_data
+                logger.warning("⚠️ 回傳為空物件，重試中…")
 
+            except aiohttp.ClientResponseError as e:
+                logger.warning("❌ API 回應錯誤: %s", e.status)
+                error = e
             except (asyncio.TimeoutError, aiohttp.ClientError) as e:
-                print(f"⚠️ API 連線異常: {e}")
-            except json.JSONDecodeError:
-                print("⚠️ JSON 解析失敗，再次嘗試…")
+                logger.warning("⚠️ API 連線異常: %r", e)
+                error = e
+            except json.JSONDecodeError as e:
+                logger.warning("⚠️ JSON 解析失敗，再次嘗試…")
+                error = e
+            finally:
+                if probe:  # 被取消或非預期例外時不會走到 record_error，試探名額要在這裡放開
+                    policy.breaker.release_probe()
+
+            kind = policy.record_error(error)
+            if kind == FATAL:
+                logger.error("🚫 錯誤無法透過重試解決，停止重試")
+                return {}
 
-            await asyncio.sleep(1.5)
+            delay = policy.next_delay(attempt, error)
+            if getattr(error, "status", None) == 429:
+                ProjectAgent.scheduler.pause(delay)  # 讓其他請求也一起降速
+            if attempt + 1 >= policy.max_attempts:
+                break
+            if loop.time() + delay >= deadline:
+                policy.deadline_exceeded += 1
+                logger.warning("⌛ 已達請求期限，停止重試")
+                break
+            policy.retries += 1
+            await asyncio.sleep(delay)  # 重試等待不佔用排程名額
+
+        logger.error("🚫 重試均失敗，返回空字典。")
+        return {}
+
+    # === 📨 單次呼叫並解析（非 200 會丟出 ClientResponseError）===
+    @staticmethod
+    async def _post_once(data: dict) -> dict:
+        session = await AgentClient.get_session()  # 共用連線池，不再每次重建
+        with Metrics.timer("agent_http_seconds"):
+            async with session.post(ProjectAgent.api_url, headers=HEADERS, json=data) as response:
+                Metrics.inc("agent_http_responses_total", status=response.status)
+                if response.status != 200:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history,
+                        status=response.status, headers=response.headers,
+                    )
+                result = await response.json()
 
-        print("🚫 三次嘗試均失敗，返回空字典。")
-        return {}
\ No newline at end of file
+        # 內容被安全機制擋下時 candidates / parts 可能是空陣列 → 當作空回應（INVALID）處理
+        candidates = result.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts") or [{}]
+        text = parts[0].get("text", "{}")
+
+        # === 🧠 第1段：原始 AI 回傳文字（DEBUG 才輸出）===
+        logger.debug("🧠 原始 AI 回覆文字（%d 字）：\n%s", len(text), text)
+
+        # === 🧹 第2段：單次掃描擷取 + 修復（圍欄、尾逗號、智慧引號、截斷…）===
+        with Metrics.timer("agent_parse_seconds"):
+            json_data, repairs = extract_json(text)
+        for kind in repairs:
+            Metrics.inc("agent_json_repairs_total", kind=kind)
+        if repairs:
+            logger.info("🧹 JSON 已自動修復：%s", ", ".join(repairs))
+
+        # === 📦 第3段：解析後 JSON 結構（序列化成本高，只在 DEBUG 時計算）===
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📦 解析後 JSON 物件：\n%s", json.dumps(json_data, indent=4, ensure_ascii=False))
+
+        return json_data
+
+    # === 🔢 估算此次請求的 token 用量（prompt 以中文約 1 字 1 token 粗估 + 輸出上限）===
+    @staticmethod
+    def _estimate_tokens(data: dict) -> int:
+        prompt_chars = sum(len(part.get("text", "")) for c in data["contents"] for part in c["parts"])
+        return prompt_chars + data["generationConfig"].get("maxOutputTokens", 0)
@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+import aiohttp
+from api.api_sys import (
+    LLM_RETRY_MAX_ATTEMPTS,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+    LLM_REQUEST_DEADLINE,
+    LLM_BREAKER_THRESHOLD,
+    LLM_BREAKER_RESET,
+)
+
+# === 🏷️ 錯誤分類 ===
+RETRYABLE = "retryable"   # 暫時性錯誤：逾時、連線中斷、429、5xx
+FATAL = "fatal"           # 重試也沒用：400/401/403/404 等
+INVALID = "invalid"       # 上游正常但內容不可用（JSON 壞掉 / 空物件），可重試但不算上游故障
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# 🧾 RetryPolicy.capture() 期間的錯誤紀錄（dict 在子 task 間共用，子 task 寫入呼叫端看得到）
+_outcome = contextvars.ContextVar("llm_outcome", default=None)
+
+
+class CircuitBreaker:
+    """連續失敗達門檻就「斷路」一段時間，期間直接失敗；冷卻後放一個試探請求（half_open）"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, reset_timeout: float = LLM_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state, self.failures, self._probing = self.CLOSED, 0, False
+
+    def release_probe(self):
+        """試探請求沒有得到結論就結束（被取消、非預期例外）→ 放開名額，讓下一個請求再試探"""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            if self.state != self.OPEN:
+                self.opened_count += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened_count": self.opened_count,
+            "retry_in_seconds": round(retry_in, 2),
+        }
+
+
+class RetryPolicy:
+    """AI 呼叫的重試策略：錯誤分類、Retry-After、指數退避 + jitter、整體期限與斷路器"""
+
+    def __init__(self, max_attempts: int = LLM_RETRY_MAX_ATTEMPTS, base_delay: float = LLM_RETRY_BASE_DELAY,
+                 max_delay: float = LLM_RETRY_MAX_DELAY, deadline: float = LLM_REQUEST_DEADLINE,
+                 breaker: CircuitBreaker = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self.attempts = 0
+        self.retries = 0
+        self.fatal = 0
+        self.fast_failed = 0
+        self.deadline_exceeded = 0
+        self.by_status = {}
+        self.last_error = None
+
+    # === 🏷️ 判斷錯誤類型 ===
+    @staticmethod
+    def classify(error: Exception = None) -> str:
+        if error is None or isinstance(error, json.JSONDecodeError):
+            return INVALID
+        # 回 200 但內容不是 JSON（例如代理伺服器的 HTML 頁面）→ 內容不可用，不是請求本身有誤
+        if isinstance(error, aiohttp.ContentTypeError) and error.status < 400:
+            return INVALID
+        if isinstance(error, aiohttp.ClientResponseError):
+            return RETRYABLE if error.status in RETRYABLE_STATUS else FATAL
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError)):
+            return RETRYABLE
+        return FATAL
+
+    # === ⏱️ 解析 Retry-After（秒數或 HTTP 日期）===
+    @staticmethod
+    def retry_after(error: Exception) -> float | None:
+        headers = getattr(error, "headers", None)
+        value = headers.get("Retry-After") if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, attempt: int) -> float:
+        """capped exponential backoff + full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def next_delay(self, attempt: int, error: Exception = None) -> float:
+        hinted = self.retry_after(error) if error is not None else None
+        return hinted if hinted is not None else self.backoff(attempt)
+
+    # === 🧾 讓呼叫端知道這次呼叫最後是哪一類錯誤（例如背景工作決定要不要重排）===
+    @staticmethod
+    @contextlib.contextmanager
+    def capture(outcome: dict = None):
+        """with RetryPolicy.capture() as outcome: ... → outcome["kind"] 為最後一次錯誤類型，沒出錯則為空 dict"""
+        outcome = {} if outcome is None else outcome
+        token = _outcome.set(outcome)
+        try:
+            yield outcome
+        finally:
+            _outcome.reset(token)
+
+    # === 📝 紀錄結果（只有上游故障才累計斷路器）===
+    def record_attempt(self):
+        self.attempts += 1
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_error(self, error: Exception = None) -> str:
+        kind = self.classify(error)
+        status = getattr(error, "status", None)
+        if status is not None:
+            self.by_status[str(status)] = self.by_status.get(str(status), 0) + 1
+            self.last_error = f"HTTP {status}"
+        elif error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"
+        else:
+            self.last_error = "empty response"
+        if kind == RETRYABLE:
+            self.breaker.record_failure()
+        elif kind == INVALID:
+            self.breaker.record_success()  # 上游有回應，只是內容不好
+        else:
+            self.fatal += 1
+            self.breaker.record_success()  # 400 / 401 等也是上游有回應，問題在請求本身
+        outcome = _outcome.get()
+        if outcome is not None:
+            outcome.update(kind=kind, error=self.last_error)
+        return kind
+
+    def snapshot(self) -> dict:
+        return {
+            "max_attempts": self.max_attempts,
+            "deadline_seconds": self.deadline,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "fatal": self.fatal,
+            "fast_failed": self.fast_failed,
+            "deadline_exceeded": self.deadline_exceeded,
+            "by_status": dict(self.by_status),
+            "last_error": self.last_error,
+            "breaker": self.breaker.snapshot(),
+        }
@@ -0,0 +1,42 @@
+import asyncio
+import copy
+
+
+class SingleFlight:
+    """相同 key 的並行呼叫只真正執行一次，其餘呼叫共用同一個進行中的 Future"""
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.calls = 0       # 總呼叫次數
+        self.executed = 0    # 實際執行次數
+        self.merged = 0      # 併入既有請求的次數
+
+    async def do(self, key: str, factory):
+        """
+        factory 為無參數、回傳 coroutine 的函式。
+        回傳 (結果, shared)；shared=True 表示此次呼叫是併入別人的請求。
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.merged += 1
+            # shield：單一呼叫者取消時不影響其他等待者；結果深拷貝避免彼此修改
+            result = await asyncio.shield(task)
+            return copy.deepcopy(result), True
+
+        self.executed += 1
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._in_flight.pop(key) if self._in_flight.get(key) is t else None)
+        return await asyncio.shield(task), False
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._in_flight
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "merged": self.merged,
+            "in_flight": len(self._in_flight),
+        }
@@ -12,7 +12,45 @@ if not API_KEY:
 MODEL_NAME = "models/gemini-2.5-flash"   # 或 "models/gemini-2.5-pro"
 
 API_URL = f"https://generativelanguage.googleapis.com/v1beta/{MODEL_NAME}:generateContent?key={API_KEY}"
+STREAM_API_URL = f"https://generativelanguage.googleapis.com/v1beta/{MODEL_NAME}:streamGenerateContent?alt=sse&key={API_KEY}"
 HEADERS = {"Content-Type": "application/json"}
 
+# === 🔌 AI 連線池設定（可在 api_key.env 覆寫）===
+AGENT_POOL_LIMIT = int(os.getenv("agent_pool_limit", "100"))                  # 全部連線上限
+AGENT_POOL_LIMIT_PER_HOST = int(os.getenv("agent_pool_limit_per_host", "20"))  # 每個主機連線上限
+AGENT_KEEPALIVE_TIMEOUT = float(os.getenv("agent_keepalive_timeout", "30"))    # 閒置連線保留秒數
+AGENT_REQUEST_TIMEOUT = float(os.getenv("agent_request_timeout", "60"))        # 單次請求逾時秒數
+
+# === 🚦 AI 呼叫排程設定（0 代表不限制）===
+LLM_MAX_IN_FLIGHT = int(os.getenv("llm_max_in_flight", "8"))    # 同時進行中的請求上限
+LLM_RPM = float(os.getenv("llm_rpm", "60"))                     # 每分鐘請求數
+LLM_TPM = float(os.getenv("llm_tpm", "250000"))                 # 每分鐘 token 數
+
+# === 🔁 AI 重試與斷路器設定 ===
+LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("llm_retry_max_attempts", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("llm_retry_base_delay", "0.5"))      # 指數退避起始秒數
+LLM_RETRY_MAX_DELAY = float(os.getenv("llm_retry_max_delay", "20"))         # 單次等待上限
+LLM_REQUEST_DEADLINE = float(os.getenv("llm_request_deadline", "90"))       # 一次使用者請求的總期限
+LLM_BREAKER_THRESHOLD = int(os.getenv("llm_breaker_threshold", "5"))        # 連續失敗幾次就斷路
+LLM_BREAKER_RESET = float(os.getenv("llm_breaker_reset", "30"))             # 斷路後多久放試探請求
+
+# === 🏁 對沖請求設定（預設關閉，開啟會多用一些配額換取較低的尾端延遲）===
+LLM_HEDGE_ENABLED = os.getenv("llm_hedge_enabled", "0") == "1"
+LLM_HEDGE_PERCENTILE = float(os.getenv("llm_hedge_percentile", "0.95"))    # 超過近期第幾百分位延遲才對沖
+LLM_HEDGE_MAX_RATIO = float(os.getenv("llm_hedge_max_ratio", "0.1"))       # 對沖請求最多佔總請求比例
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("llm_hedge_min_samples", "20"))      # 累積多少筆延遲後才啟用
+
+# === 🗃️ AI 生成結果快取設定 ===
+LLM_CACHE_ENABLED = os.getenv("llm_cache_enabled", "1") == "1"
+LLM_CACHE_TTL = float(os.getenv("llm_cache_ttl", str(24 * 60 * 60)))          # 快取有效秒數
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("llm_cache_max_entries", "500"))        # 最多保留筆數（超過以 LRU 淘汰）
+
+# === 🧵 背景生成工作（job 佇列）設定 ===
+JOB_WORKERS = int(os.getenv("job_workers", "4"))                  # 同時執行的工作數（實際送出仍受 llm_max_in_flight 限制）
+JOB_MAX_ATTEMPTS = int(os.getenv("job_max_attempts", "3"))        # 失敗幾次後不再重試
+JOB_POLL_INTERVAL = float(os.getenv("job_poll_interval", "2"))    # 沒收到新工作通知時，多久檢查一次佇列（秒）
+JOB_RETRY_BASE_DELAY = float(os.getenv("job_retry_base_delay", "10"))   # 失敗後第一次重排的等待秒數（之後每次加倍）
+JOB_RETRY_MAX_DELAY = float(os.getenv("job_retry_max_delay", "300"))    # 重排等待上限（秒）
+
 print("✅ 已成功載入 gemini_key 並設定 API_URL 和 HEADERS")
 print(f"model_name: {MODEL_NAME}")
\ No newline at end of file
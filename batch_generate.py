@@ -0,0 +1,197 @@
+"""
+批次生成：從 JSONL 逐行讀取專案名稱，以固定並行數呼叫 ProjectAgent.generate_project_json（Priority.BATCH）。
+
+- 輸入每行可為 {"project_name": "..."}、{"name": "..."} 或單純的 JSON 字串；欄位名稱可用 --name-field 指定
+- 結果一完成就 append 到輸出 JSONL（{"line", "project_name", "status", "seconds", "result" / "error"}）
+- 中斷後以同樣參數重跑：輸出檔中 status 為 ok 的行會略過，失敗的行會重試
+- --account：同時把結果寫進資料庫（每 --db-batch 筆一次批次 INSERT，同名專案略過不覆蓋）；
+  成功的結果等該批寫進資料庫後才寫到輸出檔，中斷時還沒入庫的行重跑會再生成一次
+- 任一 worker 發生未預期的錯誤（例如資料庫寫入失敗）→ 取消其他 worker 並結束
+- 結束時列出吞吐量與延遲百分位數
+
+執行方式（於專案根目錄）：
+    python batch_generate.py projects.jsonl -o results.jsonl --concurrency 8 --account willy
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+from agents.agent_client import AgentClient
+from agents.llm_scheduler import Priority
+from agents.project_agent import ProjectAgent
+from controllers.project_controller import ProjectController
+from controllers.user_account_controller import UserAccountController
+from migrations.runner import MigrationRunner
+from utils.metrics import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+# === 📖 逐行讀取輸入（不一次載入整個檔案）→ (行號, 專案名稱) ===
+def read_specs(path: str, name_field: str):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("⚠️ 第 %d 行不是合法 JSON，略過", line_no)
+                continue
+            name = spec if isinstance(spec, str) else spec.get(name_field) or spec.get("name")
+            if not isinstance(name, str) or not name.strip():
+                logger.warning("⚠️ 第 %d 行沒有專案名稱（%s），略過", line_no, name_field)
+                continue
+            yield line_no, name.strip()
+
+
+# === ♻️ 讀取既有輸出：已成功的行號（續跑時略過）===
+def completed_lines(path: str) -> set:
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 上次中斷時寫到一半的行
+            if record.get("status") == "ok":
+                done.add(record["line"])
+    return done
+
+
+# === 🗂️ AI 結果 → projects 欄位 ===
+def to_project_row(name: str, result: dict, user_id: int) -> dict:
+    frontend = result.get("frontend") or {}
+    backend = result.get("backend") or {}
+    return {
+        "name": name,
+        "description": result.get("description") or "",
+        "architecture": result.get("architecture") or "",
+        "frontend_language": frontend.get("language") or "",
+        "frontend_platform": frontend.get("platform") or "",
+        "frontend_library": frontend.get("library") or "",
+        "backend_language": backend.get("language") or "",
+        "backend_platform": backend.get("platform") or "",
+        "backend_library": backend.get("library") or "",
+        "user_id": user_id,
+    }
+
+
+def percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(q) - 1]
+
+
+async def run(args) -> int:
+    user_id = None
+    if args.account:
+        await MigrationRunner.upgrade()
+        user = await UserAccountController.get_single(account=args.account)
+        if user is None:
+            print(f"❌ 找不到帳號 {args.account}")
+            return 1
+        user_id = user.id
+
+    done = completed_lines(args.output)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)  # 讀檔速度跟著處理速度走
+    latencies, pending_rows, pending_records = [], [], []
+    counts = {"ok": 0, "error": 0, "skipped": 0, "saved": 0}
+
+    def write(out, record: dict):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()  # 每筆立即寫出，中斷也不會遺失已完成的結果
+
+    async def flush_rows(out):
+        rows, pending_rows[:] = list(pending_rows), []
+        records, pending_records[:] = list(pending_records), []
+        if rows:
+            counts["saved"] += await ProjectController.insert_missing(rows)
+        for record in records:  # 資料庫寫入成功後才記為完成，續跑時才不會略過沒入庫的行
+            write(out, record)
+
+    async def producer():
+        for line_no, name in read_specs(args.input, args.name_field):
+            if line_no in done:
+                counts["skipped"] += 1
+                continue
+            await queue.put((line_no, name))
+        for _ in range(args.concurrency):
+            await queue.put(None)
+
+    async def worker(out):
+        while (item := await queue.get()) is not None:
+            line_no, name = item
+            start = time.perf_counter()
+            try:
+                result = await ProjectAgent.generate_project_json(
+                    name, use_cache=not args.no_cache, priority=Priority.BATCH
+                )
+                error = None if result else "AI 沒有回傳結果"
+            except Exception as e:
+                result, error = None, str(e) or type(e).__name__
+            seconds = time.perf_counter() - start
+            latencies.append(seconds)
+
+            record = {"line": line_no, "project_name": name, "status": "error" if error else "ok",
+                      "seconds": round(seconds, 3)}
+            record.update({"error": error} if error else {"result": result})
+
+            if error:
+                write(out, record)
+                counts["error"] += 1
+                logger.warning("⚠️ 第 %d 行（%s）失敗：%s", line_no, name, error)
+                continue
+            counts["ok"] += 1
+            if user_id is None:
+                write(out, record)
+                continue
+            pending_rows.append(to_project_row(name, result, user_id))
+            pending_records.append(record)
+            if len(pending_rows) >= args.db_batch:
+                await flush_rows(out)
+
+    await AgentClient.startup()
+    start = time.perf_counter()
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            # TaskGroup：任何一個 task 失敗就取消其他 task，全部結束後才關閉輸出檔
+            async with asyncio.TaskGroup() as group:
+                group.create_task(producer())
+                for _ in range(args.concurrency):
+                    group.create_task(worker(out))
+            await flush_rows(out)
+    finally:
+        await AgentClient.shutdown()
+    elapsed = time.perf_counter() - start
+
+    processed = counts["ok"] + counts["error"]
+    print(f"\n📊 完成 {counts['ok']}、失敗 {counts['error']}、略過（先前已完成）{counts['skipped']}"
+          + (f"、寫入資料庫 {counts['saved']}" if user_id is not None else ""))
+    print(f"⏱️ 總時間 {elapsed:.1f}s，吞吐量 {processed / elapsed if elapsed else 0:.2f} 筆/秒（並行 {args.concurrency}）")
+    if latencies:
+        print(f"📈 延遲 p50 {percentile(latencies, 50):.2f}s / p90 {percentile(latencies, 90):.2f}s / "
+              f"p99 {percentile(latencies, 99):.2f}s / 最大 {max(latencies):.2f}s")
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="從 JSONL 批次生成專案資料")
+    parser.add_argument("input", help="輸入 JSONL（每行一個專案）")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="輸出 JSONL（已存在則續跑）")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時進行的生成數")
+    parser.add_argument("--name-field", default="project_name", help="輸入中專案名稱的欄位")
+    parser.add_argument("--account", help="一併寫入資料庫時，專案所屬的帳號")
+    parser.add_argument("--db-batch", type=int, default=50, help="每累積幾筆寫入資料庫一次")
+    parser.add_argument("--no-cache", action="store_true", help="不使用 AI 生成結果快取")
+    args = parser.parse_args()
+    setup_logging()
+    raise SystemExit(asyncio.run(run(args)))
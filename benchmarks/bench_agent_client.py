@@ -0,0 +1,66 @@
+"""
+比較「每次請求都新建 ClientSession」與「共用 AgentClient 連線池」的差異。
+
+執行方式（於專案根目錄）：
+    python -m benchmarks.bench_agent_client --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+import aiohttp
+from agents.agent_client import AgentClient
+from api.api_sys import HEADERS
+from benchmarks.stub_server import StubGeminiServer
+
+BODY = {"contents": [{"parts": [{"text": "ping"}]}]}
+
+
+async def _run(total: int, concurrency: int, post):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await post()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+async def main(total: int, concurrency: int, delay: float):
+    server = await StubGeminiServer(delay=delay).start()
+
+    # === ❌ 舊做法：每次請求建立新的 session / connector ===
+    async def post_fresh():
+        async with aiohttp.ClientSession() as session:
+            async with session.post(server.url, headers=HEADERS, json=BODY) as resp:
+                await resp.json()
+
+    # === ✅ 新做法：共用 AgentClient 連線池 ===
+    async def post_pooled():
+        session = await AgentClient.get_session()
+        async with session.post(server.url, headers=HEADERS, json=BODY) as resp:
+            await resp.json()
+
+    results = []
+    for label, post in [("每次新建 session", post_fresh), ("共用 AgentClient", post_pooled)]:
+        server.reset()
+        elapsed = await _run(total, concurrency, post)
+        results.append((label, elapsed, server.requests, len(server.connections)))
+
+    await AgentClient.shutdown()
+    await server.stop()
+
+    print(f"\n📊 {total} 次請求，並行 {concurrency}，stub 延遲 {delay * 1000:.0f} ms")
+    print(f"{'模式':<16}{'總時間(s)':>10}{'req/s':>10}{'TCP 連線數':>12}")
+    for label, elapsed, reqs, conns in results:
+        print(f"{label:<16}{elapsed:>10.3f}{reqs / elapsed:>10.1f}{conns:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.005, help="stub 回應延遲（秒）")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
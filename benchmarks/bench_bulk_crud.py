@@ -0,0 +1,68 @@
+"""
+比較 BaseController 逐筆 add / update / delete 與批次 add_many / update_many / delete_where。
+
+以 events 表為例（event_list_id 留空，不影響既有資料），跑完會把測試資料刪除。
+執行方式（於專案根目錄）：
+    python -m benchmarks.bench_bulk_crud --rows 500
+"""
+import argparse
+import asyncio
+import time
+from controllers.event_controller import EventController
+from models.user_account import UserAccount  # noqa: F401 讓 mapper 能解析 Project → UserAccount 關聯
+
+
+def _rows(n: int, tag: str) -> list[dict]:
+    return [{"sequence_no": i, "type": tag, "description": f"bench event {i}"} for i in range(n)]
+
+
+async def row_by_row(n: int) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    objs = [await EventController.add(**row) for row in _rows(n, "bench-row")]
+    timings["新增"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for obj in objs:
+        await EventController.update(obj.id, description=f"updated {obj.id}")
+    timings["更新"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for obj in objs:
+        await EventController.delete(obj.id)
+    timings["刪除"] = time.perf_counter() - start
+    return timings
+
+
+async def bulk(n: int) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    objs = await EventController.add_many(_rows(n, "bench-bulk"))
+    timings["新增"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await EventController.update_many([{"id": obj.id, "description": f"updated {obj.id}"} for obj in objs])
+    timings["更新"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await EventController.delete_where(id=[obj.id for obj in objs])
+    timings["刪除"] = time.perf_counter() - start
+    return timings
+
+
+async def main(n: int):
+    results = [("逐筆", await row_by_row(n)), ("批次", await bulk(n))]
+    # 保險：清掉中途失敗可能殘留的測試資料
+    await EventController.delete_where(type=["bench-row", "bench-bulk"])
+
+    print(f"\n📊 events 表 {n} 筆")
+    print(f"{'模式':<8}{'新增(s)':>10}{'更新(s)':>10}{'刪除(s)':>10}{'合計(s)':>10}")
+    for label, t in results:
+        print(f"{label:<8}{t['新增']:>10.3f}{t['更新']:>10.3f}{t['刪除']:>10.3f}{sum(t.values()):>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
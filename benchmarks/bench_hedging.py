@@ -0,0 +1,64 @@
+"""
+模擬「大部分請求很快、少數卡住」的上游，比較不對沖與 HedgePolicy 對沖時的端到端延遲百分位數，
+並列出 LatencyTracker 的門檻（第一次啟用時 / 結束時），確認不會因為只記到贏家而逐漸往下漂移。
+卡住比例超過 1 - 百分位數（預設 5%）時，主請求的 p95 本來就是卡住的延遲，門檻會跟著往上升。
+
+執行方式（於專案根目錄）：
+    python -m benchmarks.bench_hedging --requests 2000 --stall-rate 0.03
+"""
+import argparse
+import asyncio
+import random
+import time
+from agents.hedging import HedgePolicy
+
+
+def percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(p * (len(ordered) - 1)))]
+
+
+async def _run(policy: HedgePolicy, total: int, concurrency: int, upstream):
+    sem = asyncio.Semaphore(concurrency)
+    latencies, thresholds = [], []
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            await policy.run(upstream)
+            latencies.append(time.perf_counter() - start)
+            thresholds.append(policy.threshold())
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, [t for t in thresholds if t is not None]
+
+
+async def main(total: int, concurrency: int, base: float, stall: float, stall_rate: float, seed: int):
+    rng = random.Random(seed)
+
+    async def upstream():
+        delay = stall if rng.random() < stall_rate else base * rng.uniform(0.8, 1.5)
+        await asyncio.sleep(delay)
+        return {"ok": True}
+
+    print(f"\n📊 {total} 次請求，並行 {concurrency}，一般延遲 ~{base * 1000:.0f} ms，"
+          f"{stall_rate:.0%} 卡住 {stall * 1000:.0f} ms")
+    print(f"{'模式':<10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'對沖率':>9}{'門檻 首/末(ms)':>18}")
+    for label, enabled in [("不對沖", False), ("對沖", True)]:
+        policy = HedgePolicy(enabled=enabled)  # 其餘參數用 api_sys 的預設值
+        latencies, thresholds = await _run(policy, total, concurrency, upstream)
+        drift = f"{thresholds[0] * 1000:.0f} / {thresholds[-1] * 1000:.0f}" if thresholds else "-"
+        print(f"{label:<10}{percentile(latencies, 0.5) * 1000:>10.1f}{percentile(latencies, 0.95) * 1000:>10.1f}"
+              f"{percentile(latencies, 0.99) * 1000:>10.1f}{policy.stats()['hedge_rate']:>9.1%}{drift:>18}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base", type=float, default=0.02, help="一般請求延遲（秒）")
+    parser.add_argument("--stall", type=float, default=1.0, help="卡住的請求延遲（秒）")
+    parser.add_argument("--stall-rate", type=float, default=0.03, help="卡住的比例")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.base, args.stall, args.stall_rate, args.seed))
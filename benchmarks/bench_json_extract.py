@@ -0,0 +1,80 @@
+"""
+比較舊的清理流程（find/rfind 切片 → clean_json_text → json.loads → replace 後再 loads）
+與單次掃描的 extract_json，在壞掉的 AI 回覆語料上的成功率與速度。
+
+執行方式（於專案根目錄）：
+    python -m benchmarks.bench_json_extract --rounds 2000
+"""
+import argparse
+import json
+import os
+import time
+from utils.json_cleaner import clean_json_text, extract_json
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "malformed_responses.jsonl")
+
+
+def legacy_parse(text: str):
+    """原本 ProjectAgent._send_request 內的清理鏈（失敗時丟出 JSONDecodeError → 整次重試）"""
+    if "```json" in text:
+        start = text.find("```json") + len("```json")
+        end = text.rfind("```")
+        text = text[start:end].strip()
+    if "{" in text and "}" in text:
+        text = text[text.find("{"): text.rfind("}") + 1]
+    cleaned = clean_json_text(text)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        fixed = cleaned.replace("\\n", "\n").replace("```", "").strip()
+        return json.loads(fixed)
+
+
+def new_parse(text: str):
+    return extract_json(text)[0]
+
+
+def run(parser, samples, rounds):
+    ok = set()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for sample in samples:
+            try:
+                value = parser(sample["text"])
+                if value:
+                    ok.add(sample["kind"])
+            except json.JSONDecodeError:
+                pass
+    elapsed = time.perf_counter() - start
+    return ok, elapsed / (rounds * len(samples)) * 1e6
+
+
+def main(rounds: int):
+    with open(CORPUS, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    legacy_ok, legacy_us = run(legacy_parse, samples, rounds)
+    new_ok, new_us = run(new_parse, samples, rounds)
+
+    print(f"\n📊 語料 {len(samples)} 筆 × {rounds} 輪")
+    print(f"{'解析方式':<14}{'成功筆數':>8}{'平均 µs/筆':>12}")
+    print(f"{'舊清理鏈':<14}{len(legacy_ok):>8}{legacy_us:>12.1f}")
+    print(f"{'extract_json':<14}{len(new_ok):>8}{new_us:>12.1f}")
+    both = [sample for sample in samples if sample["kind"] in legacy_ok]
+    _, legacy_both_us = run(legacy_parse, both, rounds)
+    _, new_both_us = run(new_parse, both, rounds)
+    print(f"\n兩者都能解析的 {len(both)} 筆：舊 {legacy_both_us:.1f} µs/筆 ／ 新 {new_both_us:.1f} µs/筆")
+    print("（一次 AI 重試通常是數秒，救回一筆的價值遠大於多花的幾十微秒）")
+
+    print("\n舊流程失敗（每一筆都代表一次完整的 AI 重試）：")
+    for sample in samples:
+        if sample["kind"] not in legacy_ok:
+            mark = "✅ 新解析器可救回" if sample["kind"] in new_ok else "❌ 兩者皆失敗"
+            print(f"  - {sample['kind']:<32}{mark}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.rounds)
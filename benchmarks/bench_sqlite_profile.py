@@ -0,0 +1,115 @@
+"""
+SQLite 連線設定的並行讀寫測試：預設設定 vs WAL 設定 vs WAL + 唯讀連線池。
+
+每種設定都在暫存資料夾建立新的資料庫，同時跑 writers 個寫入工作（每次新增一筆專案並 commit）
+與 readers 個讀取工作（分頁查詢該使用者的專案），統計吞吐量、延遲與 database is locked 次數。
+執行方式（於專案根目錄）：
+    python -m benchmarks.bench_sqlite_profile --writers 8 --readers 16 --ops 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import func, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.future import select
+from init_db import Base, create_engine_with_profile
+from models.user_account import UserAccount
+from models.project import Project
+import controllers.project_controller  # noqa: F401 載入所有 model，讓 create_all 建立完整資料表
+
+
+async def _run_profile(path: str, pragmas, read_pool: bool, writers: int, readers: int, ops: int) -> dict:
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_engine_with_profile(url, pragmas=pragmas, pool_size=writers + readers)
+    read_engine = create_engine_with_profile(url, pragmas=pragmas, read_only=True, pool_size=readers) \
+        if read_pool else engine
+    write_sessions = async_sessionmaker(engine, expire_on_commit=False)
+    read_sessions = async_sessionmaker(read_engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with write_sessions() as session:
+        user_id = (await session.execute(
+            insert(UserAccount).values(account="bench", password="x").returning(UserAccount.id)
+        )).scalar_one()
+        await session.commit()
+
+    write_latency, read_latency, locked = [], [], [0]
+
+    async def writer(w: int):
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                async with write_sessions() as session:
+                    session.add(Project(name=f"w{w}-{i}", description="x" * 500, frontend_language="Python",
+                                        backend_language="Python", user_id=user_id))
+                    await session.commit()
+                write_latency.append(time.perf_counter() - start)
+            except OperationalError as e:
+                locked[0] += 1
+                print(f"⚠️ 寫入失敗：{e.orig}")
+
+    async def reader():
+        for _ in range(ops):
+            start = time.perf_counter()
+            try:
+                async with read_sessions() as session:
+                    await session.execute(
+                        select(Project.id, Project.name).where(Project.user_id == user_id)
+                        .order_by(Project.name).limit(50)
+                    )
+                    await session.execute(select(func.count(Project.id)))
+                read_latency.append(time.perf_counter() - start)
+            except OperationalError:
+                locked[0] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)), *(reader() for _ in range(readers)))
+    elapsed = time.perf_counter() - start
+
+    if read_engine is not engine:
+        await read_engine.dispose()
+    await engine.dispose()
+
+    def p95(samples):
+        return statistics.quantiles(samples, n=20)[-1] * 1000 if len(samples) >= 2 else 0.0
+
+    return {
+        "elapsed": elapsed,
+        "ops_per_s": (len(write_latency) + len(read_latency)) / elapsed,
+        "write_p95": p95(write_latency),
+        "read_p95": p95(read_latency),
+        "locked": locked[0],
+    }
+
+
+async def main(writers: int, readers: int, ops: int):
+    profiles = [
+        ("SQLite 預設", {}, False),
+        ("WAL 設定", None, False),
+        ("WAL + 唯讀池", None, True),
+    ]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, (label, pragmas, read_pool) in enumerate(profiles):
+            path = os.path.join(tmp, f"bench_{index}.db")
+            results.append((label, await _run_profile(path, pragmas, read_pool, writers, readers, ops)))
+
+    print(f"\n📊 寫入 {writers} × {ops}、讀取 {readers} × {ops}")
+    print(f"{'設定':<14}{'總時間(s)':>10}{'ops/s':>10}{'寫 p95(ms)':>12}{'讀 p95(ms)':>12}{'locked':>8}")
+    for label, r in results:
+        print(f"{label:<14}{r['elapsed']:>10.2f}{r['ops_per_s']:>10.0f}"
+              f"{r['write_p95']:>12.1f}{r['read_p95']:>12.1f}{r['locked']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.readers, args.ops))
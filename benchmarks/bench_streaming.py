@@ -0,0 +1,44 @@
+"""
+量測串流生成的「第一個欄位出現時間」與「完整結果時間」。
+
+執行方式（於專案根目錄）：
+    python -m benchmarks.bench_streaming --chunk-delay 0.05
+"""
+import argparse
+import asyncio
+import time
+from agents.agent_client import AgentClient
+from agents.generation_cache import GenerationCache
+from agents.project_agent import ProjectAgent
+from benchmarks.stub_server import StubGeminiServer
+
+
+async def main(chunk_size: int, chunk_delay: float):
+    server = await StubGeminiServer(chunk_size=chunk_size, chunk_delay=chunk_delay).start()
+    ProjectAgent.stream_url = server.stream_url
+    GenerationCache.enabled = False  # 只量測串流本身
+
+    arrivals = []
+    start = time.perf_counter()
+    result = await ProjectAgent.stream_project_json(
+        "串流測試", lambda path, value: arrivals.append((".".join(path), time.perf_counter() - start))
+    )
+    total = time.perf_counter() - start
+
+    await AgentClient.shutdown()
+    await server.stop()
+
+    print(f"\n📊 片段大小 {chunk_size} 字元，間隔 {chunk_delay * 1000:.0f} ms")
+    for path, t in arrivals:
+        print(f"  {path:<20}{t * 1000:>8.0f} ms")
+    first = next((t for p, t in arrivals if p != "project_name"), total)
+    print(f"第一個有效欄位：{first * 1000:.0f} ms ／ 完整結果：{total * 1000:.0f} ms（{first / total:.0%}）")
+    assert result and len(arrivals) >= 8, "串流結果不完整"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=24)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size, args.chunk_delay))
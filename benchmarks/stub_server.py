@@ -0,0 +1,78 @@
+import asyncio
+import json
+from aiohttp import web
+
+# === 🧪 本機 Gemini stub：回傳固定的 generateContent / streamGenerateContent 結果（離線測試 / benchmark 用）===
+
+SAMPLE_PROJECT = {
+    "project_name": "測試專案",
+    "description": "系統用途與特色簡述",
+    "architecture": "前後端分離，REST API",
+    "frontend": {"language": "JavaScript", "platform": "Web", "library": "Vue.js"},
+    "backend": {"language": "Python", "platform": "FastAPI", "library": "SQLAlchemy"},
+}
+
+
+class StubGeminiServer:
+    """模擬 Gemini API 的本機伺服器，並記錄實際建立的 TCP 連線數"""
+
+    def __init__(self, delay: float = 0.0, payload: dict = None, chunk_size: int = 24, chunk_delay: float = 0.0):
+        self.delay = delay
+        self.chunk_size = chunk_size      # 串流時每個 SSE 片段的字元數
+        self.chunk_delay = chunk_delay    # 串流片段之間的間隔（模擬逐 token 輸出）
+        self.payload = payload or SAMPLE_PROJECT
+        self.requests = 0
+        self.connections = set()  # 以 (client_ip, client_port) 辨識不同連線
+        self._runner = None
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1beta/models/stub:generateContent"
+
+    @property
+    def stream_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1beta/models/stub:streamGenerateContent?alt=sse"
+
+    async def _generate(self, request: web.Request):
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        await request.read()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        text = json.dumps(self.payload, ensure_ascii=False)
+        return web.json_response({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    async def _stream(self, request: web.Request):
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        await request.read()
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        text = "```json\n" + json.dumps(self.payload, ensure_ascii=False, indent=2) + "\n```"
+        for i in range(0, len(text), self.chunk_size):
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            chunk = {"candidates": [{"content": {"parts": [{"text": text[i:i + self.chunk_size]}], "role": "model"}}]}
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\r\n\r\n".encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1beta/models/{model}:generateContent", self._generate)
+        app.router.add_post("/v1beta/models/{model}:streamGenerateContent", self._stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    def reset(self):
+        self.requests = 0
+        self.connections.clear()
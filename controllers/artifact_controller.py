@@ -0,0 +1,175 @@
+import hashlib
+import logging
+from collections import defaultdict
+from sqlalchemy import func, or_, select, update
+from init_db import session_scope, commit_or_flush
+from controllers.base_controller import BaseController
+from controllers.entity_cache import EntityCache
+from controllers.purge_controller import PurgeController
+from utils.metrics import Metrics
+from models.project import Project
+from models.usecase import Usecase
+from models.event_list import EventList
+from models.sequence_diagram import SequenceDiagram
+from models.class_diagram import ClassDiagram
+from models.entity_relationship_diagram import EntityRelationshipDiagram
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactController:
+    """
+    下游產物（使用案例 / 事件清單 / 循序圖 / 類別圖 / ERD）與專案欄位的相依關係。
+    每個產物生成時記下所依據欄位的指紋 input_fingerprint = {欄位: hash}（由 ArtifactModelController 在新增時蓋上）；
+    專案儲存時只把「依據欄位的 hash 和目前不同」的產物標記 is_stale，開啟時再重新生成，不整批刪除。
+    """
+
+    # 🧬 產物 → 生成時用到的專案欄位（不在清單中的欄位變更不影響該產物）
+    DEPENDENCIES = {
+        Usecase: ["description", "architecture"],
+        EventList: ["description", "architecture"],
+        SequenceDiagram: ["description", "architecture", "frontend_platform", "backend_platform"],
+        ClassDiagram: ["description", "architecture", "backend_language", "backend_platform", "backend_library"],
+        EntityRelationshipDiagram: ["description", "architecture", "backend_platform", "backend_library"],
+    }
+
+    # 🔗 產物 → 往上找專案的外鍵欄位（使用案例直接指向專案，其餘經由使用案例）
+    OWNER_COLUMNS = {
+        Usecase: "project_id",
+        EventList: "use_case_id",
+        SequenceDiagram: "use_case_id",
+        ClassDiagram: "usecase_id",
+        EntityRelationshipDiagram: "use_case_id",
+    }
+
+    # === 🔑 欄位指紋（None 與空字串視為相同，和 upsert 的比較方式一致）===
+    @staticmethod
+    def _hash(value) -> str:
+        return hashlib.sha256((value or "").encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def fingerprint(cls, model, project: dict) -> dict:
+        """生成產物時呼叫：fingerprint(ClassDiagram, 專案資料) → {"description": "9f2c…", ...}"""
+        return {field: cls._hash(project.get(field)) for field in cls.DEPENDENCIES[model]}
+
+    # === 🔎 外鍵值（專案 id 或使用案例 id）→ 所屬專案目前的欄位值 ===
+    @classmethod
+    async def _projects(cls, session, model, owner_ids) -> dict:
+        fields = cls.DEPENDENCIES[model]
+        columns = [getattr(Project, field) for field in fields]
+        if model is Usecase:
+            query = select(Project.id, *columns).where(Project.id.in_(owner_ids))
+        else:
+            query = (
+                select(Usecase.id, *columns)
+                .join(Project, Project.id == Usecase.project_id)
+                .where(Usecase.id.in_(owner_ids))
+            )
+        return {row[0]: dict(zip(fields, row[1:])) for row in await session.execute(query)}
+
+    # === 🖋️ 新增產物前：依所屬專案目前的欄位值補上 input_fingerprint（呼叫端已指定的不覆蓋）===
+    @classmethod
+    async def stamp(cls, model, rows: list[dict]) -> list[dict]:
+        owner = cls.OWNER_COLUMNS[model]
+        owner_ids = {row[owner] for row in rows if row.get(owner) is not None and "input_fingerprint" not in row}
+        if not owner_ids:
+            return rows
+        async with session_scope(read_only=True) as session:
+            projects = await cls._projects(session, model, owner_ids)
+        return [
+            {**row, "input_fingerprint": cls.fingerprint(model, projects[row[owner]])}
+            if "input_fingerprint" not in row and row.get(owner) in projects else row
+            for row in rows
+        ]
+
+    # === 🏷️ 專案儲存後：依指紋把受影響的產物標記為過期，回傳各表筆數 ===
+    @classmethod
+    async def mark_stale(cls, project_id: int, project: dict) -> dict:
+        """
+        每張表一個 UPDATE ... WHERE 屬於此專案 AND json_extract(指紋, '$.欄位') IS NOT 新 hash。
+        沒有指紋的產物（建立時找不到所屬專案）無從判斷依據，一律視為過期。
+        回傳 {"class_diagrams": 2, ...}（只列出有標記到的表）
+        """
+        counts = {}
+        with Metrics.timer("db_seconds", op="mark_stale", model="artifacts"):
+            async with session_scope() as session:
+                for model, fields in cls.DEPENDENCIES.items():
+                    table = model.__tablename__
+                    changed = or_(*(
+                        func.json_extract(model.input_fingerprint, f"$.{field}").is_not(cls._hash(project.get(field)))
+                        for field in fields
+                    ))
+                    result = await session.execute(
+                        update(model)
+                        .where(PurgeController.owned_by(table, "projects", [project_id]))
+                        .where(model.is_stale.is_(False), changed)
+                        .values(is_stale=True)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if result.rowcount:
+                        counts[table] = result.rowcount
+                        EntityCache.invalidate(table, session)
+                await commit_or_flush(session)
+
+        logger.info("🏷️ 專案 %s 欄位變更，標記過期產物：%s", project_id, counts)
+        return counts
+
+    # === ✅ 重新生成後：寫回新指紋並清除過期標記 ===
+    @classmethod
+    async def mark_fresh(cls, model, ids: list, project: dict) -> int:
+        if not ids:
+            return 0
+        async with session_scope() as session:
+            result = await session.execute(
+                update(model)
+                .where(model.id.in_(ids))
+                .values(input_fingerprint=cls.fingerprint(model, project), is_stale=False)
+                .execution_options(synchronize_session=False)
+            )
+            EntityCache.invalidate(model.__tablename__, session)
+            await commit_or_flush(session)
+            return result.rowcount
+
+    # === ♻️ 重新生成後（只知道產物 id）：找出各自所屬的專案再呼叫 mark_fresh ===
+    @classmethod
+    async def refresh(cls, model, ids: list) -> int:
+        if not ids:
+            return 0
+        owner = getattr(model, cls.OWNER_COLUMNS[model])
+        async with session_scope(read_only=True) as session:
+            owners = dict((await session.execute(select(model.id, owner).where(model.id.in_(ids)))).all())
+            projects = await cls._projects(session, model, set(owners.values()) - {None})
+        groups = defaultdict(list)
+        for artifact_id, owner_id in owners.items():
+            if owner_id in projects:
+                groups[owner_id].append(artifact_id)
+        return sum([await cls.mark_fresh(model, group, projects[owner_id]) for owner_id, group in groups.items()])
+
+    # === 📋 某專案底下需要重新生成的產物：{"class_diagrams": [3, 7], ...} ===
+    @classmethod
+    async def stale(cls, project_id: int) -> dict:
+        found = {}
+        async with session_scope(read_only=True) as session:
+            for model in cls.DEPENDENCIES:
+                table = model.__tablename__
+                ids = (await session.scalars(
+                    select(model.id)
+                    .where(PurgeController.owned_by(table, "projects", [project_id]))
+                    .where(model.is_stale.is_(True))
+                )).all()
+                if ids:
+                    found[table] = list(ids)
+        return found
+
+
+class ArtifactModelController(BaseController):
+    """下游產物的 Controller 共用：新增時蓋上輸入指紋"""
+
+    @classmethod
+    async def add(cls, **kwargs):
+        (row,) = await ArtifactController.stamp(cls.model, [kwargs])
+        return await super().add(**row)
+
+    @classmethod
+    async def add_many(cls, rows: list[dict]) -> list:
+        return await super().add_many(await ArtifactController.stamp(cls.model, rows))
@@ -1,96 +1,357 @@
-from init_db import get_async_session_context
+from __future__ import annotations  # 類別內有 list() 方法，註解中的 list[...] 需延後求值
+import logging
+from init_db import session_scope, commit_or_flush, in_unit_of_work
+from controllers.entity_cache import EntityCache
+from utils.metrics import Metrics
 from sqlalchemy.orm import class_mapper
                            #class_mapper = 取得某個 model 的 mapper（映射器）
 from sqlalchemy.future import select
+from sqlalchemy import insert, update, delete, func, and_, or_
+
+logger = logging.getLogger(__name__)
+
+_READ_TABLES: dict = {}  # (Controller, profile) → 查詢會讀到的資料表
 
 # ✅ BaseController 是所有 Controller 的「共用模板」
 class BaseController:
     model = None  # 子類別要指定這裡是哪一個 model（例如 Stock, Project）
+    loader_profiles: dict = {}  # 🧩 名稱 → 關聯載入選項（selectinload…），子類別依畫面需求定義
+    cache_enabled: bool = True  # 🧠 讀取結果是否放進 EntityCache（自行管理寫入的 Controller 請設 False）
+
+    # 🧩 取出 loader profile（None → 只查本表，關聯一律不預先載入）
+    @classmethod
+    def _loader_options(cls, profile: str = None) -> list:
+        if profile is None:
+            return []
+        if profile not in cls.loader_profiles:
+            raise ValueError(f"{cls.__name__} 沒有名為 {profile!r} 的 loader profile")
+        return cls.loader_profiles[profile]
+
+    # 🧩 查詢會讀到的資料表：本表 + loader profile 沿路載入的關聯表（快取失效用）
+    @classmethod
+    def _read_tables(cls, profile: str = None) -> frozenset:
+        key = (cls, profile)
+        if key not in _READ_TABLES:
+            tables = {cls.model.__tablename__}
+            for option in cls._loader_options(profile):
+                for element in option.context:       # 每一段 selectinload / joinedload
+                    for entity in element.path.path:  # mapper、relationship 交錯的路徑
+                        mapper = getattr(entity, "mapper", None)
+                        if mapper is not None:
+                            tables.add(mapper.local_table.name)
+            _READ_TABLES[key] = frozenset(tables)
+        return _READ_TABLES[key]
+
+    # ⏱️ 每個資料庫操作的耗時 → db_seconds{op, model}
+    @classmethod
+    def _timer(cls, op: str):
+        return Metrics.timer("db_seconds", op=op, model=cls.model.__name__)
+
+    # 🧠 讀取快取：命中就不查資料庫；unit_of_work 內一律直接查（要看得到同交易尚未 commit 的寫入）
+    @classmethod
+    async def _cached(cls, op: str, args: dict, load, profile: str = None):
+        if not (cls.cache_enabled and EntityCache.enabled) or in_unit_of_work():
+            return await load()
+        key = EntityCache.make_key(cls.model.__tablename__, op, args)
+        hit, value = EntityCache.get(key)
+        if hit:
+            return EntityCache.copy(value)
+        generations = EntityCache.generations(cls._read_tables(profile))
+        value = await load()
+        if value is not None:  # 查無資料不放進快取：其他行程隨時可能新增
+            EntityCache.put(key, value, generations)
+        return EntityCache.copy(value)
+
+    # 🧹 本表有寫入 → 讓快取失效（commit 後會再清一次）
+    @classmethod
+    def _invalidate(cls, session=None):
+        EntityCache.invalidate(cls.model.__tablename__, session)
 
     @classmethod
     async def add(cls, **kwargs):
-        async with get_async_session_context() as session:
-            obj = cls.model(**kwargs)
-            
-            # 🟢 若 model 有 relationship 欄位，檢查是否有傳入關聯物件
-            mapper = class_mapper(cls.model)
-            for rel in mapper.relationships:
-                if rel.key in kwargs and kwargs[rel.key] is not None:
-                    related_obj = kwargs[rel.key]
-                    setattr(obj, rel.key, related_obj)
-
-            session.add(obj)
-            await session.commit()
-            await session.refresh(obj)
-            print(f"Added: {obj}")
-            return obj
+        with cls._timer("add"):
+            async with session_scope() as session:
+                obj = cls.model(**kwargs)
+                
+                # 🟢 若 model 有 relationship 欄位，檢查是否有傳入關聯物件
+                mapper = class_mapper(cls.model)
+                for rel in mapper.relationships:
+                    if rel.key in kwargs and kwargs[rel.key] is not None:
+                        related_obj = kwargs[rel.key]
+                        setattr(obj, rel.key, related_obj)
+
+                session.add(obj)
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                await session.refresh(obj)
+                logger.debug("Added: %s", obj)
+                return obj
     
     # 🗑 刪除資料
     @classmethod
     async def delete(cls, obj_id: int):
-        async with get_async_session_context() as session:
-            obj = await session.get(cls.model, obj_id)
-            if not obj:
-                print("❌ 沒有這筆資料")
-                return False
-            await session.delete(obj)
-            await session.commit()
-            print(f"🗑成功刪除: {obj}這筆資料")
-            return True
-        
+        with cls._timer("delete"):
+            async with session_scope() as session:
+                obj = await session.get(cls.model, obj_id)
+                if not obj:
+                    logger.info("❌ 沒有這筆資料")
+                    return False
+                await session.delete(obj)
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                logger.debug("🗑成功刪除: %s這筆資料", obj)
+                return True
+            
     
-    # ✏️ 更新資料
-    @classmethod
-    async def update(cls, obj_id: int, **kwargs):
-        async with get_async_session_context() as session:
-            obj = await session.get(cls.model, obj_id)
-            if not obj:
-                print("❌ 找不到這筆資料")
-                return None
-
-            for key, value in kwargs.items():
-                if hasattr(obj, key):
-                    setattr(obj, key, value)
-
-            await session.commit()
-            await session.refresh(obj)
-            print(f"✏️ 已更新: {obj}")
-            return obj
-        
+    # ✏️ 更新資料（只寫入值有變的欄位）
+    @classmethod
+    async def update(cls, obj_id: int, **kwargs) -> set | None:
+        """
+        和資料庫目前的值比較，只 UPDATE 有差異的欄位；完全沒變就不 commit、不讓快取失效。
+        回傳實際變更的欄位名稱（空集合 = 沒有變更）；找不到資料回傳 None。
+        """
+        with cls._timer("update"):
+            async with session_scope() as session:
+                obj = await session.get(cls.model, obj_id)
+                if not obj:
+                    logger.info("❌ 找不到這筆資料")
+                    return None
+
+                changed = {
+                    key for key, value in kwargs.items()
+                    if hasattr(obj, key) and getattr(obj, key) != value
+                }
+                if not changed:
+                    logger.debug("✏️ 沒有變更: %s", obj)
+                    return changed
+
+                for key in changed:
+                    setattr(obj, key, kwargs[key])
+
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                logger.debug("✏️ 已更新 %s: %s", sorted(changed), obj)
+                return changed
+            
     # 📋 列出資料
     @classmethod
-    async def list(cls, **filters):
+    async def list(cls, profile: str = None, **filters):
         """
         若沒傳入參數 → 列出所有資料
         若傳入條件（如 name='AI Tool'） → 根據條件過濾
+        profile：要一併載入的關聯（見子類別的 loader_profiles）
         """
-        async with get_async_session_context() as session:
-            query = select(cls.model)
-            if filters:
-                for key, value in filters.items():
-                    column = getattr(cls.model, key)
-                    query = query.where(column == value)
-
-            result = await session.execute(query)
-            records = result.scalars().all()
-
-            print(f"📋 查詢結果 ({len(records)} 筆): {records}")
-            return records
-        
+        async def load():
+            with cls._timer("list"):
+                async with session_scope(read_only=True) as session:
+                    query = select(cls.model).options(*cls._loader_options(profile))
+                    if filters:
+                        for key, value in filters.items():
+                            column = getattr(cls.model, key)
+                            query = query.where(column == value)
+
+                    result = await session.execute(query)
+                    records = result.scalars().all()
+
+                    logger.debug("📋 查詢結果 (%d 筆): %s", len(records), records)
+                    return records
+
+        return await cls._cached("list", {"profile": profile, **filters}, load, profile)
+            
     # 📍 查詢單筆資料（例如根據帳號、ID）
     @classmethod
-    async def get_single(cls, **filters):
+    async def get_single(cls, profile: str = None, **filters):
         """
         根據傳入條件（如 account='willy'）回傳第一筆匹配的資料。
         若無結果則回傳 None。
+        profile：要一併載入的關聯（見子類別的 loader_profiles）
         """
-        async with get_async_session_context() as session:
-            query = select(cls.model)
-            for key, value in filters.items():
-                column = getattr(cls.model, key)
+        async def load():
+            with cls._timer("get_single"):
+                async with session_scope(read_only=True) as session:
+                    query = select(cls.model).options(*cls._loader_options(profile))
+                    for key, value in filters.items():
+                        column = getattr(cls.model, key)
+                        query = query.where(column == value)
+
+                    result = await session.execute(query)
+                    obj = result.scalars().first()
+                    logger.debug("🔍 單筆查詢結果: %s", obj)
+                    return obj
+
+        return await cls._cached("get_single", {"profile": profile, **filters}, load, profile)
+
+    # 🧮 表格查詢：AG Grid 的排序 / 篩選模型轉成 SQL，長文字欄位只取前幾個字
+    @classmethod
+    async def grid_page(cls, columns: list[str], sort_model: list = None, filter_model: dict = None,
+                        start: int = 0, limit: int = 50, previews: dict = None, after: list = None, **filters):
+        """
+        columns：要回傳的欄位（同時是排序 / 篩選允許的欄位白名單），一律回傳 dict 列並附上主鍵。
+        sort_model：[{"colId": "name", "sort": "asc"}]
+        filter_model：{"name": {"filterType": "text", "type": "contains", "filter": "AI"}}，
+                      多條件 {"filterType": "text", "operator": "OR", "conditions": [...]} 也可以。
+        previews：{"description": 120} → 該欄位只回傳前 120 個字（SQL substr，全文不會離開資料庫）。
+        after：上一段回傳的 cursor（最後一列的排序值 + 主鍵）→ 用 keyset 接著往下讀，不再 OFFSET；
+               沒有 cursor（第一段、捲軸直接跳到中間）才退回 OFFSET start。
+        回傳 (rows, last_row, cursor)：已讀到最後時 last_row 為總筆數，否則 None；
+        cursor 交給下一段的 after（是完整欄位值，不是預覽，只留在伺服器端）。
+        排序欄位一律 coalesce 成 ""：NULL 和空字串排在一起、再靠主鍵分先後，keyset 比較才不會漏掉 NULL 列。
+        """
+        previews = previews or {}
+        pk = class_mapper(cls.model).primary_key[0].key
+        allowed = set(columns) | {pk}
+
+        def column(key: str):
+            if key not in allowed:
+                raise ValueError(f"{cls.__name__}: 不允許以 {key!r} 排序或篩選")
+            return getattr(cls.model, key)
+
+        sorts = [(func.coalesce(column(item["colId"]), ""), item.get("sort") == "desc")
+                 for item in sort_model or []]
+        sorts.append((getattr(cls.model, pk), False))
+        selected = [pk] + [key for key in columns if key != pk]
+        query = select(
+            *(func.substr(getattr(cls.model, key), 1, previews[key]).label(key) if key in previews
+              else getattr(cls.model, key)
+              for key in selected),
+            *(expr.label(f"_sort{index}") for index, (expr, _) in enumerate(sorts)),
+        )
+        for key, value in filters.items():
+            query = query.where(getattr(cls.model, key) == value)
+        for key, spec in (filter_model or {}).items():
+            query = query.where(cls._grid_condition(column(key), spec))
+        if after is not None:
+            query = query.where(cls._seek_condition(sorts, after))
+        query = query.order_by(*(expr.desc() if desc else expr for expr, desc in sorts))
+        if after is None:
+            query = query.offset(start)
+        query = query.limit(limit + 1)
+
+        async def load():
+            with cls._timer("grid_page"):
+                async with session_scope(read_only=True) as session:
+                    return (await session.execute(query)).mappings().all()
+
+        records = await cls._cached("grid_page", {
+            "columns": selected, "sort": sort_model, "filter": filter_model, "start": start,
+            "limit": limit, "previews": previews, "after": after, **filters,
+        }, load)
+        page = records[:limit]
+        rows = [{key: record[key] for key in selected} for record in page]
+        cursor = [page[-1][f"_sort{index}"] for index in range(len(sorts))] if page else None
+        last_row = start + len(records) if len(records) <= limit else None
+        logger.debug("🧮 表格查詢 %d 筆（起點 %d，%s，總筆數 %s）",
+                     len(rows), start, "keyset" if after is not None else "offset", last_row)
+        return rows, last_row, cursor
+
+    # 🔑 keyset 條件：排在 cursor 之後的列（逐欄字典序，asc 用 >、desc 用 <，主鍵最後分勝負）
+    @staticmethod
+    def _seek_condition(sorts: list, cursor: list):
+        if len(cursor) != len(sorts):
+            raise ValueError("grid cursor 與排序欄位數量不符")
+        branches = []
+        for index, (expr, desc) in enumerate(sorts):
+            equal = [sorts[i][0] == cursor[i] for i in range(index)]
+            beyond = expr < cursor[index] if desc else expr > cursor[index]
+            branches.append(and_(*equal, beyond))
+        return or_(*branches)
+
+    # 🔤 AG Grid 文字篩選 → SQL 條件（LIKE 在 SQLite 對英文字母不分大小寫，和 AG Grid 預設一致）
+    _TEXT_FILTERS = {
+        "contains": lambda col, text: col.contains(text, autoescape=True),
+        "notContains": lambda col, text: or_(col.is_(None), ~col.contains(text, autoescape=True)),
+        "equals": lambda col, text: func.lower(col) == text.lower(),
+        "notEqual": lambda col, text: or_(col.is_(None), func.lower(col) != text.lower()),
+        "startsWith": lambda col, text: col.startswith(text, autoescape=True),
+        "endsWith": lambda col, text: col.endswith(text, autoescape=True),
+        "blank": lambda col, text: or_(col.is_(None), col == ""),
+        "notBlank": lambda col, text: and_(col.is_not(None), col != ""),
+    }
+
+    @classmethod
+    def _grid_condition(cls, column, spec: dict):
+        if "conditions" in spec:
+            conditions = [cls._grid_condition(column, item) for item in spec["conditions"]]
+            return or_(*conditions) if spec.get("operator") == "OR" else and_(*conditions)
+        if spec.get("filterType", "text") != "text" or spec.get("type") not in cls._TEXT_FILTERS:
+            raise ValueError(f"{cls.__name__}: 不支援的篩選條件 {spec!r}")
+        return cls._TEXT_FILTERS[spec["type"]](column, str(spec.get("filter") or ""))
+
+    # ===================== 📦 批次操作（單一交易、不逐筆 refresh）=====================
+
+    # 🟢 批次新增：INSERT ... RETURNING，一次取回所有新物件
+    @classmethod
+    async def add_many(cls, rows: list[dict]) -> list:
+        """
+        rows 為欄位字典的清單（例如 [{"name": "A"}, {"name": "B"}]），只接受欄位、不處理 relationship。
+        回傳新增後的物件（含自動產生的 id），順序與 rows 相同。
+        """
+        if not rows:
+            return []
+        with cls._timer("add_many"):
+            async with session_scope() as session:
+                result = await session.scalars(insert(cls.model).returning(cls.model, sort_by_parameter_order=True), rows)
+                objs = result.all()
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                logger.debug("📦 批次新增 %d 筆 %s", len(objs), cls.model.__name__)
+                return objs
+
+    # ✏️ 批次更新：每個字典都要帶主鍵，依主鍵 executemany UPDATE
+    @classmethod
+    async def update_many(cls, rows: list[dict]) -> int:
+        """
+        rows 例如 [{"id": 1, "name": "新名稱"}, {"id": 2, "description": "..."}]。
+        回傳送出的筆數。
+        """
+        if not rows:
+            return 0
+        with cls._timer("update_many"):
+            async with session_scope() as session:
+                await session.execute(update(cls.model), rows)
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                logger.debug("✏️ 批次更新 %d 筆 %s", len(rows), cls.model.__name__)
+                return len(rows)
+
+    # ✏️ 條件更新：UPDATE ... SET values WHERE filters
+    @classmethod
+    async def update_where(cls, values: dict, **filters) -> int:
+        """update_where({"type": "例外"}, event_list_id=3) → 回傳受影響筆數"""
+        if not values:
+            return 0
+        query = cls._apply_filters(update(cls.model), filters).values(**values)
+        with cls._timer("update_where"):
+            async with session_scope() as session:
+                result = await session.execute(query.execution_options(synchronize_session=False))
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                return result.rowcount
+
+    # 🗑 條件刪除：DELETE ... WHERE filters
+    @classmethod
+    async def delete_where(cls, **filters) -> int:
+        """delete_where(id=[1, 2, 3]) / delete_where(use_case_id=5) → 回傳刪除筆數"""
+        query = cls._apply_filters(delete(cls.model), filters)
+        with cls._timer("delete_where"):
+            async with session_scope() as session:
+                result = await session.execute(query.execution_options(synchronize_session=False))
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                logger.debug("🗑 批次刪除 %d 筆 %s", result.rowcount, cls.model.__name__)
+                return result.rowcount
+
+    # 🔎 把 filters 轉成 WHERE（list / tuple / set → IN）
+    @classmethod
+    def _apply_filters(cls, query, filters: dict):
+        """沒有任何條件時拒絕執行，避免誤刪 / 誤改整張表"""
+        if not filters:
+            raise ValueError(f"{cls.__name__}: 批次更新 / 刪除必須指定條件")
+        for key, value in filters.items():
+            column = getattr(cls.model, key)
+            if isinstance(value, (list, tuple, set)):
+                query = query.where(column.in_(value))
+            else:
                 query = query.where(column == value)
+        return query
 
-            result = await session.execute(query)
-            obj = result.scalars().first()
-            print(f"🔍 單筆查詢結果: {obj}")
-            return obj
\ No newline at end of file
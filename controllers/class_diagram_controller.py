@@ -1,5 +1,5 @@
 from models.class_diagram import ClassDiagram
-from controllers.base_controller import BaseController
+from controllers.artifact_controller import ArtifactModelController
 
-class ClassDiagramController(BaseController):
+class ClassDiagramController(ArtifactModelController):
     model = ClassDiagram
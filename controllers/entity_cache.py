@@ -0,0 +1,155 @@
+import logging
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from init_db import ENTITY_CACHE_ENABLED, ENTITY_CACHE_MAX_ENTRIES, ENTITY_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "entity_cache_tables"  # session.info 裡記錄「這個交易寫過哪些表」
+
+
+class EntityCache:
+    """
+    行程內共用的實體快取（LRU + TTL），給 BaseController 的讀取使用。
+    key = (資料表, 操作, 查詢參數)；每筆快取記下查詢讀到的所有資料表（含 loader profile 載入的關聯表），
+    任何一張被寫入，這筆快取就失效。
+    每張表有一個 generation：查詢開始後若該表被寫入，查詢結果就不放進快取，避免存到舊資料。
+    快取裡的 ORM 物件不直接交給呼叫端，一律用 copy() 給一份複本；其他行程的寫入只能等 TTL 過期。
+    """
+
+    enabled = ENTITY_CACHE_ENABLED
+    max_entries = ENTITY_CACHE_MAX_ENTRIES
+    ttl = ENTITY_CACHE_TTL
+
+    _entries: OrderedDict = OrderedDict()   # key → (寫入時間, 值, 讀到的資料表)，越後面越新
+    _generations: dict = {}                  # 資料表 → 寫入次數
+    _table_stats: dict = {}                  # 資料表 → {"hits": n, "misses": n}
+
+    hits = 0
+    misses = 0
+    evictions = 0
+    invalidations = 0
+
+    # === 🔑 產生快取 key（查詢參數轉成字串，list / dict 也能當 key）===
+    @staticmethod
+    def make_key(table: str, op: str, args: dict) -> tuple:
+        return (table, op, repr(sorted(args.items())))
+
+    @classmethod
+    def generation(cls, table: str) -> int:
+        return cls._generations.get(table, 0)
+
+    @classmethod
+    def generations(cls, tables) -> dict:
+        return {table: cls.generation(table) for table in tables}
+
+    # === 📥 讀取：回傳 (是否命中, 值) ===
+    @classmethod
+    def get(cls, key: tuple):
+        stats = cls._table_stats.setdefault(key[0], {"hits": 0, "misses": 0})
+        entry = cls._entries.get(key)
+        if entry is not None and cls.ttl and time.monotonic() - entry[0] > cls.ttl:
+            del cls._entries[key]
+            entry = None
+        if entry is None:
+            cls.misses += 1
+            stats["misses"] += 1
+            return False, None
+        cls._entries.move_to_end(key)
+        cls.hits += 1
+        stats["hits"] += 1
+        return True, entry[1]
+
+    # === 💾 寫入：查詢期間任何一張讀到的表被寫過（generation 變了）就不存 ===
+    @classmethod
+    def put(cls, key: tuple, value, generations: dict):
+        """generations：查詢開始前 generations(讀到的資料表) 的結果"""
+        if any(cls.generation(table) != generation for table, generation in generations.items()):
+            return
+        cls._entries[key] = (time.monotonic(), value, frozenset(generations))
+        cls._entries.move_to_end(key)
+        while len(cls._entries) > cls.max_entries:
+            cls._entries.popitem(last=False)
+            cls.evictions += 1
+
+    # === 🧹 失效：清掉讀過某張表的所有 key；傳入 session 時 commit 後會再清一次 ===
+    @classmethod
+    def invalidate(cls, table: str, session=None):
+        """
+        寫入當下先清一次；交易還沒 commit 前，其他連線可能又把舊資料讀進快取，
+        所以把表名記在 session.info，等 after_commit 再清一次。
+        """
+        cls._generations[table] = cls.generation(table) + 1
+        stale = [key for key, entry in cls._entries.items() if table in entry[2]]
+        for key in stale:
+            del cls._entries[key]
+        cls.invalidations += 1
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(table)
+
+    # === 📄 複本：呼叫端改了物件的屬性也不會影響快取或其他請求 ===
+    @classmethod
+    def copy(cls, value):
+        """list 逐項複製；ORM 物件連同已載入的關聯一起複製成新的 detached 物件；其他值（dict 列、None）原樣回傳"""
+        return _copy(value, {})
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
+        for table in list(cls._generations):
+            cls._generations[table] += 1
+
+    # === 📊 命中率 ===
+    @classmethod
+    def stats(cls) -> dict:
+        total = cls.hits + cls.misses
+        return {
+            "enabled": cls.enabled,
+            "entries": len(cls._entries),
+            "max_entries": cls.max_entries,
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "hit_rate": round(cls.hits / total, 3) if total else 0.0,
+            "evictions": cls.evictions,
+            "invalidations": cls.invalidations,
+            "tables": {
+                table: {**s, "hit_rate": round(s["hits"] / (s["hits"] + s["misses"]), 3)}
+                for table, s in cls._table_stats.items() if s["hits"] + s["misses"]
+            },
+        }
+
+
+def _copy(value, memo: dict):
+    if isinstance(value, list):
+        return [_copy(item, memo) for item in value]
+    state = inspect(value, raiseerr=False)
+    if state is None or not hasattr(state, "mapper") or not hasattr(state, "dict"):
+        return value
+    if id(value) in memo:  # 雙向關聯（project.usecase[0].project）指回同一個複本
+        return memo[id(value)]
+    mapper = state.mapper
+    clone = mapper.class_manager.new_instance()
+    memo[id(value)] = clone
+    for attr in mapper.column_attrs:
+        if attr.key in state.dict:
+            set_committed_value(clone, attr.key, state.dict[attr.key])
+    make_transient_to_detached(clone)  # 和原本一樣是 detached：未載入的關聯存取時會報錯，不會偷偷查詢
+    for rel in mapper.relationships:
+        if rel.key in state.dict:
+            set_committed_value(clone, rel.key, _copy(state.dict[rel.key], memo))
+    return clone
+
+
+# === 🔁 交易 commit 後，再讓期間寫過的表失效一次（rollback 則只清掉紀錄）===
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for table in session.info.pop(_PENDING_KEY, ()):
+        EntityCache.invalidate(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,5 +1,5 @@
 from models.entity_relationship_diagram import EntityRelationshipDiagram
-from controllers.base_controller import BaseController
+from controllers.artifact_controller import ArtifactModelController
 
-class EntityRelationshipDiagramController(BaseController):
+class EntityRelationshipDiagramController(ArtifactModelController):
     model = EntityRelationshipDiagram
\ No newline at end of file
@@ -1,5 +1,5 @@
 from models.event_list import EventList
-from controllers.base_controller import BaseController
+from controllers.artifact_controller import ArtifactModelController
 
-class EventListController(BaseController):
+class EventListController(ArtifactModelController):
     model = EventList  # 指定這個 Controller 使用的 model 是 EventList
\ No newline at end of file
@@ -0,0 +1,114 @@
+import time
+from sqlalchemy import and_, func, or_, select, update
+from init_db import session_scope, commit_or_flush
+from models.generation_job import GenerationJob
+from controllers.base_controller import BaseController
+
+
+class JobController(BaseController):
+    model = GenerationJob  # 指定這個 Controller 使用的 model 是 GenerationJob
+    cache_enabled = False  # 狀態隨時在變，不放進 EntityCache
+
+    # 可以被取走的工作：排隊中、還有重試次數，且沒有在退避等待
+    @staticmethod
+    def _runnable(now: float):
+        return and_(
+            GenerationJob.status == "queued",
+            GenerationJob.attempts < GenerationJob.max_attempts,
+            or_(GenerationJob.run_after.is_(None), GenerationJob.run_after <= now),
+        )
+
+    # === ➕ 建立工作 ===
+    @classmethod
+    async def enqueue(cls, user_id: int, kind: str, payload: dict, priority: int, max_attempts: int):
+        return await cls.add(
+            user_id=user_id, kind=kind, payload=payload, priority=priority,
+            max_attempts=max_attempts, status="queued", created_at=time.time(),
+        )
+
+    # === 🎯 取下一個工作：一個 UPDATE ... RETURNING 完成「挑選 + 標記執行中」，多個 worker 不會搶到同一筆 ===
+    @classmethod
+    async def claim(cls):
+        now = time.time()
+        next_id = (
+            select(GenerationJob.id)
+            .where(cls._runnable(now))
+            .order_by(GenerationJob.priority, GenerationJob.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(GenerationJob)
+            .where(GenerationJob.id == next_id, GenerationJob.status == "queued")
+            .values(status="running", attempts=GenerationJob.attempts + 1, started_at=now)
+            .returning(GenerationJob)
+            .execution_options(synchronize_session=False)
+        )
+        with cls._timer("claim"):
+            async with session_scope() as session:
+                job = (await session.scalars(stmt)).first()
+                await commit_or_flush(session)
+                return job
+
+    # === ✅ 完成 ===
+    @classmethod
+    async def succeed(cls, job_id: int, result) -> int:
+        return await cls.update_where(
+            {"status": "succeeded", "result": result, "error": None, "finished_at": time.time()}, id=job_id
+        )
+
+    # === ❌ 失敗：可重試且還有次數 → retry_in 秒後再放回佇列，否則標記 failed；回傳新狀態 ===
+    @classmethod
+    async def fail(cls, job: GenerationJob, error: str, retry_in: float = None) -> str:
+        """retry_in=None 代表重試也沒用（例如請求本身有誤），直接標記 failed"""
+        if retry_in is not None and job.attempts < job.max_attempts:
+            await cls.update_where(
+                {"status": "queued", "error": error, "run_after": time.time() + retry_in}, id=job.id
+            )
+            return "queued"
+        await cls.update_where({"status": "failed", "error": error, "finished_at": time.time()}, id=job.id)
+        return "failed"
+
+    # === ♻️ 啟動時復原：上次行程結束時還在執行的工作，還有次數的放回佇列、次數用完的標記 failed ===
+    @classmethod
+    async def recover(cls) -> dict:
+        running = GenerationJob.status == "running"
+        exhausted = GenerationJob.attempts >= GenerationJob.max_attempts
+        async with session_scope() as session:
+            failed = await session.execute(
+                update(GenerationJob).where(running, exhausted)
+                .values(status="failed", error="執行中斷，已用完重試次數", finished_at=time.time())
+                .execution_options(synchronize_session=False)
+            )
+            queued = await session.execute(
+                update(GenerationJob).where(running, ~exhausted)
+                .values(status="queued", started_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await commit_or_flush(session)
+            return {"queued": queued.rowcount, "failed": failed.rowcount}
+
+    # === 🔢 排隊位置：前面還有幾個會先被取走的工作（同樣依 priority、id 排序）+ 1 ===
+    @classmethod
+    async def position(cls, job_id: int) -> int:
+        me = select(GenerationJob.priority, GenerationJob.id).where(GenerationJob.id == job_id).subquery()
+        ahead = (
+            select(func.count())
+            .select_from(GenerationJob)
+            .join(me, or_(
+                GenerationJob.priority < me.c.priority,
+                and_(GenerationJob.priority == me.c.priority, GenerationJob.id < me.c.id),
+            ))
+            .where(cls._runnable(time.time()))
+        )
+        async with session_scope(read_only=True) as session:
+            return await session.scalar(ahead) + 1
+
+    # === 📊 各狀態筆數 ===
+    @classmethod
+    async def counts(cls) -> dict:
+        async with session_scope(read_only=True) as session:
+            rows = await session.execute(
+                select(GenerationJob.status, func.count()).group_by(GenerationJob.status)
+            )
+            return {status: count for status, count in rows}
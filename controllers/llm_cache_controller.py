@@ -0,0 +1,74 @@
+import time
+from sqlalchemy import delete, func
+from sqlalchemy.future import select
+from init_db import engine, get_async_session_context
+from models.llm_cache import LLMCache
+from controllers.base_controller import BaseController
+
+class LLMCacheController(BaseController):
+    model = LLMCache  # 指定這個 Controller 使用的 model 是 LLMCache
+    cache_enabled = False  # 自己管理讀寫與 TTL，不放進 EntityCache
+
+    _table_ready = False
+
+    @classmethod
+    async def ensure_table(cls):
+        """舊資料庫沒有 llm_cache 表時自動建立"""
+        if cls._table_ready:
+            return
+        async with engine.begin() as conn:
+            await conn.run_sync(LLMCache.__table__.create, checkfirst=True)
+        cls._table_ready = True
+
+    @classmethod
+    async def lookup(cls, key: str, ttl: float):
+        """取出未過期的快取結果並更新存取時間；過期則順便刪除"""
+        await cls.ensure_table()
+        async with get_async_session_context() as session:
+            entry = await session.get(LLMCache, key)
+            if entry is None:
+                return None
+            now = time.time()
+            if ttl and now - entry.created_at > ttl:
+                await session.delete(entry)
+                await session.commit()
+                return None
+            entry.accessed_at = now
+            entry.hit_count = (entry.hit_count or 0) + 1
+            response = entry.response
+            await session.commit()
+            return response
+
+    @classmethod
+    async def store(cls, key: str, model_name: str, response: dict):
+        """寫入（或覆蓋）一筆快取結果"""
+        await cls.ensure_table()
+        now = time.time()
+        async with get_async_session_context() as session:
+            await session.merge(LLMCache(
+                key=key, model_name=model_name, response=response,
+                created_at=now, accessed_at=now, hit_count=0,
+            ))
+            await session.commit()
+
+    @classmethod
+    async def evict(cls, max_entries: int, ttl: float) -> int:
+        """刪除過期資料，並依最後存取時間（LRU）把總筆數壓回 max_entries 以內"""
+        await cls.ensure_table()
+        removed = 0
+        async with get_async_session_context() as session:
+            if ttl:
+                result = await session.execute(
+                    delete(LLMCache).where(LLMCache.created_at < time.time() - ttl)
+                )
+                removed += result.rowcount or 0
+
+            total = (await session.execute(select(func.count()).select_from(LLMCache))).scalar_one()
+            overflow = total - max_entries
+            if overflow > 0:
+                oldest = select(LLMCache.key).order_by(LLMCache.accessed_at).limit(overflow)
+                result = await session.execute(delete(LLMCache).where(LLMCache.key.in_(oldest)))
+                removed += result.rowcount or 0
+
+            await session.commit()
+        return removed
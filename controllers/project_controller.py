@@ -1,8 +1,103 @@
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
+from init_db import session_scope, commit_or_flush
 from models.project import Project
+from models.usecase import Usecase
+from models.usecase_actor import UsecaseActor
+from models.event_list import EventList
+from models.sequence_diagram import SequenceDiagram
+from models.sequence_object import SequenceObject
+from models.class_diagram import ClassDiagram
+from models.class_object import ClassObject
 from controllers.base_controller import BaseController
 
 class ProjectController(BaseController):
     model = Project  # 指定這個 Controller 使用的 model 是 Project
 
-   
-    
\ No newline at end of file
+    # 🧩 依畫面需求一次載入所需關聯（其餘關聯一律不載入）
+    loader_profiles = {
+        # 專案清單 / 總覽：只要使用案例的 id 與名稱
+        "summary": [
+            selectinload(Project.usecase).load_only(Usecase.id, Usecase.name),
+        ],
+        # 專案樹：使用案例 → 事件清單 → 事件、使用案例 → 參與者
+        "project_tree": [
+            selectinload(Project.usecase).selectinload(Usecase.event_list).selectinload(EventList.event),
+            selectinload(Project.usecase).selectinload(Usecase.usecase_actor).selectinload(UsecaseActor.actor),
+        ],
+        # 圖表編輯：循序圖 / 類別圖 / ER 圖與其物件
+        "diagram_editor": [
+            selectinload(Project.usecase).selectinload(Usecase.sequence_diagram)
+            .selectinload(SequenceDiagram.sequence_object).selectinload(SequenceObject.object),
+            selectinload(Project.usecase).selectinload(Usecase.class_diagram)
+            .selectinload(ClassDiagram.class_object).options(
+                selectinload(ClassObject.object),
+                selectinload(ClassObject.method),
+                selectinload(ClassObject.attribute),
+            ),
+            selectinload(Project.usecase).selectinload(Usecase.entity_relationship_diagram),
+        ],
+    }
+
+    # 🧬 核心欄位：任何一個變更，依據它的後續（使用案例 / 圖表…）產物就要重新生成（見 ArtifactController）
+    CORE_FIELDS = [
+        "description", "architecture",
+        "frontend_language", "frontend_platform", "frontend_library",
+        "backend_language", "backend_platform", "backend_library",
+    ]
+
+    WHITESPACE = " \t\r\n\f\v\u3000"  # SQLite trim() 預設只去半形空白，其餘要明確列出（含全形空白）
+
+    # 💾 新增或更新（以 user_id + name 判斷），一個 SQL 完成
+    @classmethod
+    async def upsert(cls, **data) -> dict:
+        """
+        INSERT ... ON CONFLICT(user_id, name) DO UPDATE ... WHERE 核心欄位有差異 RETURNING
+        回傳 {"id": 專案 id 或 None, "action": "created" / "updated" / "unchanged"}
+        - 沒有回傳列 → 核心欄位都相同，資料庫完全沒寫入
+        - core_revision == 0 → 新建立
+        - core_revision >= 1 → 核心欄位已變更（呼叫端應將受影響的下游產物標記過期）
+        """
+        stmt = sqlite_insert(cls.model).values(**data)
+        excluded = stmt.excluded
+        # 前後空白不算變更：舊資料可能沒有 strip 過，不能因此遞增 core_revision、把產物標成過期
+        changed = or_(*(
+            func.trim(func.coalesce(getattr(cls.model, field), ""), cls.WHITESPACE)
+            != func.trim(func.coalesce(getattr(excluded, field), ""), cls.WHITESPACE)
+            for field in cls.CORE_FIELDS
+        ))
+        updates = {key: getattr(excluded, key) for key in data if key not in ("user_id", "name")}
+        updates["core_revision"] = cls.model.core_revision + 1
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.model.user_id, cls.model.name],
+            set_=updates,
+            where=changed,
+        ).returning(cls.model.id, cls.model.core_revision)
+
+        with cls._timer("upsert"):
+            async with session_scope() as session:
+                row = (await session.execute(stmt)).first()
+                if row is not None:
+                    cls._invalidate(session)
+                await commit_or_flush(session)
+
+        if row is None:
+            return {"id": None, "action": "unchanged"}
+        return {"id": row.id, "action": "created" if row.core_revision == 0 else "updated"}
+
+
+    # 📦 批次新增，(user_id, name) 已存在的直接略過（批次匯入 / 中斷後重跑用）
+    @classmethod
+    async def insert_missing(cls, rows: list[dict]) -> int:
+        """一個 executemany INSERT ... ON CONFLICT DO NOTHING，回傳實際新增筆數"""
+        if not rows:
+            return 0
+        table = cls.model.__table__  # Core INSERT：executemany 才拿得到 rowcount
+        stmt = sqlite_insert(table).on_conflict_do_nothing(index_elements=[table.c.user_id, table.c.name])
+        with cls._timer("insert_missing"):
+            async with session_scope() as session:
+                result = await session.execute(stmt, rows)
+                cls._invalidate(session)
+                await commit_or_flush(session)
+                return result.rowcount
@@ -0,0 +1,122 @@
+import logging
+from sqlalchemy import delete, or_, select
+from init_db import Base, session_scope, commit_or_flush
+from utils.metrics import Metrics
+from controllers.entity_cache import EntityCache
+
+# ✅ 匯入所有 model，確保 Base.metadata 有完整的外鍵關係
+from models.user_account import UserAccount  # noqa: F401
+from models.project import Project  # noqa: F401
+from models.usecase import Usecase  # noqa: F401
+from models.usecase_actor import UsecaseActor  # noqa: F401
+from models.actor import Actor  # noqa: F401
+from models.event_list import EventList  # noqa: F401
+from models.event import Event  # noqa: F401
+from models.sequence_diagram import SequenceDiagram  # noqa: F401
+from models.sequence_object import SequenceObject  # noqa: F401
+from models.class_diagram import ClassDiagram  # noqa: F401
+from models.class_object import ClassObject  # noqa: F401
+from models.entity_relationship_diagram import EntityRelationshipDiagram  # noqa: F401
+from models.entity_relationship_object import EntityRelationshipObject  # noqa: F401
+from models.object import Object  # noqa: F401
+from models.method import Method  # noqa: F401
+from models.attribute import Attribute  # noqa: F401
+from models.generation_job import GenerationJob  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeController:
+    """
+    依 Base.metadata 的外鍵關係做級聯刪除：
+    從根資料表（例如 projects）往下找出所有「外鍵指向它」的下游表，
+    每張表一個 DELETE ... WHERE fk IN (子查詢)，由最下層往上刪，全部在同一個交易內。
+    共用的資料（例如 objects、actors）不會被刪，只刪掉指向它們的連結表。
+    """
+
+    _plans: dict = {}  # 根資料表名稱 → [(下游表, [(fk 欄位, 上游表, 上游欄位)])]，依刪除順序
+
+    # === 🗺️ 找出下游資料表與刪除順序（結果會快取）===
+    @classmethod
+    def plan(cls, root: str) -> list:
+        if root in cls._plans:
+            return cls._plans[root]
+
+        tables = Base.metadata.tables
+        downstream = {root}
+        changed = True
+        while changed:
+            changed = False
+            for table in tables.values():
+                if table.name in downstream:
+                    continue
+                if any(fk.column.table.name in downstream for fk in table.foreign_keys):
+                    downstream.add(table.name)
+                    changed = True
+
+        plan = []
+        for table in reversed(Base.metadata.sorted_tables):  # 子表在前、父表在後
+            if table.name == root or table.name not in downstream:
+                continue
+            links = [
+                (fk.parent, fk.column.table, fk.column)
+                for fk in table.foreign_keys
+                if fk.column.table.name in downstream
+            ]
+            plan.append((table, links))
+        cls._plans[root] = plan
+        return plan
+
+    # === 🔎 某張表「屬於這些根資料」的條件（多條路徑時取 OR）===
+    @classmethod
+    def _selector(cls, table, root_table, root_ids, plan_index: dict):
+        if table is root_table:
+            return root_table.primary_key.columns.values()[0].in_(root_ids)
+        conditions = []
+        for fk_column, parent, parent_column in plan_index[table.name]:
+            parent_selector = cls._selector(parent, root_table, root_ids, plan_index)
+            conditions.append(fk_column.in_(select(parent_column).where(parent_selector)))
+        return or_(*conditions) if len(conditions) > 1 else conditions[0]
+
+    # === 🎯 對外：某張下游表「屬於這些根資料」的 WHERE 條件（例如只更新某專案底下的圖表）===
+    @classmethod
+    def owned_by(cls, table: str, root: str, ids: list):
+        root_table = Base.metadata.tables[root]
+        plan_index = {t.name: links for t, links in cls.plan(root)}
+        return cls._selector(Base.metadata.tables[table], root_table, ids, plan_index)
+
+    # === 🔥 執行級聯刪除，回傳各表刪除筆數 ===
+    @classmethod
+    async def purge(cls, root: str, ids: list, include_root: bool = False) -> dict:
+        """
+        purge("projects", [3]) → 清掉專案 3 底下的使用案例、事件、圖表與物件連結（保留專案本身）
+        include_root=True → 連根資料一起刪除
+        回傳 {"events": 12, "event_lists": 4, ...}（只列出有刪到的表）
+        """
+        if not ids:
+            return {}
+        root_table = Base.metadata.tables[root]
+        plan = cls.plan(root)
+        plan_index = {table.name: links for table, links in plan}
+
+        counts = {}
+        with Metrics.timer("db_seconds", op="purge", model=root):
+            async with session_scope() as session:
+                for table, _ in plan:
+                    result = await session.execute(
+                        delete(table).where(cls._selector(table, root_table, ids, plan_index))
+                    )
+                    if result.rowcount:
+                        counts[table.name] = result.rowcount
+                if include_root:
+                    result = await session.execute(
+                        delete(root_table).where(cls._selector(root_table, root_table, ids, plan_index))
+                    )
+                    if result.rowcount:
+                        counts[root] = result.rowcount
+                for table in counts:
+                    EntityCache.invalidate(table, session)
+                await commit_or_flush(session)
+
+        logger.info("🔥 級聯清除 %s %s：%s", root, ids, counts)
+        return counts
@@ -1,5 +1,5 @@
 from models.sequence_diagram import SequenceDiagram
-from controllers.base_controller import BaseController  
+from controllers.artifact_controller import ArtifactModelController
 
-class SequenceDiagramController(BaseController):
+class SequenceDiagramController(ArtifactModelController):
     model = SequenceDiagram   # 指定這個 Controller 使用的 model 是 SequenceDiagram
\ No newline at end of file
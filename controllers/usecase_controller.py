@@ -1,5 +1,33 @@
+from sqlalchemy.orm import selectinload
 from models.usecase import Usecase
-from controllers.base_controller import BaseController
+from models.usecase_actor import UsecaseActor
+from models.event_list import EventList
+from models.sequence_diagram import SequenceDiagram
+from models.sequence_object import SequenceObject
+from models.class_diagram import ClassDiagram
+from models.class_object import ClassObject
+from controllers.artifact_controller import ArtifactModelController
 
-class PriceController(BaseController):
-    model = Usecase  # 指定這個 Controller 使用的 model 是 Usecase
\ No newline at end of file
+class UsecaseController(ArtifactModelController):
+    model = Usecase  # 指定這個 Controller 使用的 model 是 Usecase
+
+    # 🧩 依畫面需求一次載入所需關聯
+    loader_profiles = {
+        "summary": [],
+        # 使用案例明細：事件清單 → 事件、參與者
+        "project_tree": [
+            selectinload(Usecase.event_list).selectinload(EventList.event),
+            selectinload(Usecase.usecase_actor).selectinload(UsecaseActor.actor),
+        ],
+        # 圖表編輯：單一使用案例的三種圖與其物件
+        "diagram_editor": [
+            selectinload(Usecase.sequence_diagram)
+            .selectinload(SequenceDiagram.sequence_object).selectinload(SequenceObject.object),
+            selectinload(Usecase.class_diagram).selectinload(ClassDiagram.class_object).options(
+                selectinload(ClassObject.object),
+                selectinload(ClassObject.method),
+                selectinload(ClassObject.attribute),
+            ),
+            selectinload(Usecase.entity_relationship_diagram),
+        ],
+    }
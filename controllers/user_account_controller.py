@@ -1,7 +1,10 @@
+import logging
 from models.user_account import UserAccount
 from controllers.base_controller import BaseController
 from sqlalchemy.exc import IntegrityError
 
+logger = logging.getLogger(__name__)
+
 class UserAccountController(BaseController):
     model = UserAccount  # 指定使用的 model
 
@@ -11,12 +14,12 @@ class UserAccountController(BaseController):
         # 先查是否存在
         existing = await UserAccountController.get_single(account=account)
         if existing:
-            print("⚠️ 帳號已存在，跳過新增")
+            logger.info("⚠️ 帳號已存在，跳過新增")
             return False
 
         try:
             await UserAccountController.add(account=account, password=password)
             return True
         except IntegrityError:
-            print("⚠️ UNIQUE constraint failed, 新增失敗")
+            logger.warning("⚠️ UNIQUE constraint failed, 新增失敗")
             return False
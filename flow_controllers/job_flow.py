@@ -0,0 +1,214 @@
+# 📁 flow_controllers/job_flow.py
+import asyncio
+import logging
+import random
+import time
+from agents.llm_scheduler import Priority
+from agents.project_agent import ProjectAgent
+from agents.retry_policy import FATAL, RetryPolicy
+from api.api_sys import JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_POLL_INTERVAL, JOB_RETRY_BASE_DELAY, JOB_RETRY_MAX_DELAY
+from controllers.job_controller import JobController
+from flow_controllers.project_flow import ProjectFlowController
+from utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobError(Exception):
+    """工作本身有誤（類型不存在、參數不完整），重試也沒用"""
+
+
+class JobFlowController:
+    """
+    AI 生成改為背景工作：畫面只負責送出工作與輪詢進度，實際呼叫由 worker pool 執行。
+    工作存在 SQLite（generation_jobs），瀏覽器重新連線或伺服器重啟都不會遺失。
+    """
+
+    _workers: list = []
+    _wakeup: asyncio.Event = None
+    # 本行程中排隊 / 執行中的工作：job id → {"user_id", "status", "progress": {標籤: 內容}, "queue_position", "retry_at"}
+    # 完成後移除，之後的查詢改讀資料庫
+    _live: dict = {}
+
+    # 重試也沒用的錯誤（工作類型不存在、參數缺欄位）→ 直接標記 failed
+    NON_RETRYABLE = (JobError, KeyError)
+
+    # === 🔌 生命週期（main.py 的 app.on_startup / app.on_shutdown）===
+    @classmethod
+    async def startup(cls):
+        recovered = await JobController.recover()
+        if recovered["queued"]:
+            logger.info("♻️ 已將 %d 個中斷的工作放回佇列", recovered["queued"])
+        if recovered["failed"]:
+            logger.warning("♻️ %d 個中斷的工作已用完重試次數，標記為 failed", recovered["failed"])
+        cls._wakeup = asyncio.Event()
+        cls._workers = [asyncio.create_task(cls._worker(n)) for n in range(JOB_WORKERS)]
+        logger.info("🧵 啟動 %d 個背景工作 worker", JOB_WORKERS)
+
+    @classmethod
+    async def shutdown(cls):
+        # 執行到一半的工作維持 running，下次啟動由 recover() 放回佇列
+        for task in cls._workers:
+            task.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+
+    # === 📤 送出工作（畫面呼叫，立即回傳 job id）===
+    @classmethod
+    async def submit_generate(cls, project_name: str):
+        return await cls._submit("generate_project", {"project_name": project_name})
+
+    @classmethod
+    async def submit_regenerate(cls, project_name: str, fields: list[str], old_data: dict):
+        return await cls._submit("regenerate_fields", {
+            "project_name": project_name, "fields": fields, "old_data": old_data,
+        })
+
+    @classmethod
+    async def _submit(cls, kind: str, payload: dict, priority: Priority = Priority.INTERACTIVE):
+        uid = await ProjectFlowController.get_current_user_id()
+        if not uid:
+            return None
+        job = await JobController.enqueue(uid, kind, payload, int(priority), JOB_MAX_ATTEMPTS)
+        cls._live[job.id] = {"user_id": uid, "status": "queued", "progress": {}, "queue_position": None, "retry_at": None}
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+        logger.info("📤 已送出工作 #%s（%s）", job.id, kind)
+        return job.id
+
+    # === 🔎 查詢工作狀態（畫面輪詢；執行中讀記憶體，結束後讀資料庫）===
+    @classmethod
+    async def job_status(cls, job_id: int):
+        """
+        回傳 {"status", "progress", "queue_position", "retry_in", "result", "error"}；
+        不存在或不屬於目前使用者時回傳 None。
+        queue_position：排隊中 → 工作佇列中的位置；執行中 → 等待 AI 名額時排程器回報的位置。
+        retry_in：失敗後等待重排的剩餘秒數（沒有則為 None）。
+        """
+        uid = await ProjectFlowController.get_current_user_id()
+        live = cls._live.get(job_id)
+        if live is not None:
+            if live["user_id"] != uid:
+                return None
+            status, position = live["status"], live["queue_position"]
+            if status == "queued":
+                position = await JobController.position(job_id)
+            retry_in = max(0.0, live["retry_at"] - time.time()) if live["retry_at"] else None
+            return {"status": status, "progress": dict(live["progress"]), "queue_position": position,
+                    "retry_in": retry_in, "result": None, "error": None}
+
+        job = await JobController.get_single(id=job_id, user_id=uid)
+        if job is None:
+            return None
+        position = await JobController.position(job_id) if job.status == "queued" else None
+        retry_in = max(0.0, job.run_after - time.time()) if job.status == "queued" and job.run_after else None
+        return {"status": job.status, "progress": {}, "queue_position": position,
+                "retry_in": retry_in, "result": job.result, "error": job.error}
+
+    # === 🧵 worker：取工作 → 執行 → 寫回結果；沒工作時等通知或定時檢查 ===
+    @classmethod
+    async def _worker(cls, n: int):
+        while True:
+            try:
+                cls._wakeup.clear()
+                job = await JobController.claim()
+                if job is None:
+                    try:
+                        await asyncio.wait_for(cls._wakeup.wait(), JOB_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await cls._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # 資料庫暫時出錯也不能讓 worker 結束
+                logger.exception("❌ worker %d 發生錯誤：%s", n, e)
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    @classmethod
+    async def _run(cls, job):
+        live = cls._live.setdefault(job.id, {"user_id": job.user_id, "progress": {}, "queue_position": None})
+        live.update(status="running", retry_at=None)
+        handler = getattr(cls, cls.HANDLERS.get(job.kind, ""), None)
+        logger.info("▶️ 開始工作 #%s（%s，第 %d 次）", job.id, job.kind, job.attempts)
+
+        start = time.perf_counter()
+        retry_in, outcome = None, {}
+        try:
+            if handler is None:
+                raise JobError(f"未知的工作類型：{job.kind}")
+            with RetryPolicy.capture(outcome):
+                result = await handler(job.payload, live, Priority(job.priority))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry_in = cls.retry_delay(job.attempts, e, outcome)
+            status = await JobController.fail(job, str(e) or type(e).__name__, retry_in)
+            logger.warning("⚠️ 工作 #%s 失敗（%s）：%s", job.id, status, e)
+        else:
+            await JobController.succeed(job.id, result)
+            status = "succeeded"
+            logger.info("✅ 工作 #%s 完成", job.id)
+        Metrics.observe("job_seconds", time.perf_counter() - start, kind=job.kind)
+        Metrics.inc("jobs_total", kind=job.kind, status=status)
+
+        if status == "queued":  # 還有重試次數 → 退避時間過後回到佇列，進度從頭開始
+            live.update(status="queued", progress={}, queue_position=None, retry_at=time.time() + retry_in)
+        else:
+            cls._live.pop(job.id, None)
+
+    # === ⏳ 失敗後多久再重排：None = 不重試 ===
+    @classmethod
+    def retry_delay(cls, attempts: int, error: Exception, outcome: dict) -> float | None:
+        """
+        請求本身有誤（FATAL，例如 400）或工作參數錯誤 → 不重試。
+        其他 → 指數退避（加 jitter，避免同時失敗的工作一起回來），斷路器開啟時至少等到它放行試探。
+        """
+        if isinstance(error, cls.NON_RETRYABLE) or outcome.get("kind") == FATAL:
+            return None
+        delay = min(JOB_RETRY_MAX_DELAY, JOB_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0))
+        delay = random.uniform(delay / 2, delay)
+        breaker = ProjectAgent.retry_policy.breaker.snapshot()
+        return max(delay, breaker["retry_in_seconds"])
+
+    # === 🛠️ 各類工作的實際內容：回傳值存進 result，拋出例外代表這次失敗 ===
+    @staticmethod
+    async def _generate_project(payload: dict, live: dict, priority: Priority) -> dict:
+        def on_row(label, value):
+            live["progress"][label] = value
+
+        def on_queue(position):
+            live["queue_position"] = position
+
+        rows = await ProjectFlowController.stream_project_data(
+            payload["project_name"], on_row, on_queue=on_queue, priority=priority
+        )
+        if not rows:
+            raise RuntimeError("AI 生成失敗")
+        return {"rows": rows}
+
+    @staticmethod
+    async def _regenerate_fields(payload: dict, live: dict, priority: Priority) -> dict:
+        def on_queue(position):
+            live["queue_position"] = position
+
+        rows = await ProjectFlowController.regenerate_selected_fields(
+            payload["project_name"], payload["fields"], payload["old_data"], on_queue=on_queue, priority=priority
+        )
+        if rows is None:  # 模型沒有產生要求的欄位 → 視為失敗，交給退避重試，不要拿舊資料當成功
+            raise RuntimeError("AI 重新生成失敗")
+        return {"rows": rows}
+
+    HANDLERS = {  # 工作類型 → 處理函式名稱
+        "generate_project": "_generate_project",
+        "regenerate_fields": "_regenerate_fields",
+    }
+
+    # === 📊 維運用 ===
+    @classmethod
+    async def stats(cls) -> dict:
+        return {
+            "workers": len(cls._workers),
+            "live": len(cls._live),
+            "jobs": await JobController.counts(),
+        }
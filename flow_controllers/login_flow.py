@@ -1,6 +1,9 @@
+import logging
 from nicegui import app
 from controllers.user_account_controller import UserAccountController
 
+logger = logging.getLogger(__name__)
+
 class LoginFlowController:
 
     @staticmethod
@@ -15,13 +18,22 @@ class LoginFlowController:
         elif user.password != password:
             return {'status': 'error', 'message': '密碼錯誤'}
         else:
-            # ✅ 將登入資訊寫入 NiceGUI session
+            # ✅ 將登入資訊寫入 NiceGUI session（連同 user id，之後的 flow 不必再查資料庫）
             app.storage.user['current_user_account'] = account
-            print(f"✅ 使用者登入成功：{account}")
-            print(f"📦 目前 session 狀態：{app.storage.user}")
+            app.storage.user['current_user_identity'] = {'account': account, 'id': user.id}
+            logger.info("✅ 使用者登入成功：%s", account)
+            logger.debug("📦 目前 session 狀態：%s", app.storage.user)
 
             return {'status': 'success', 'message': f'歡迎回來，{account}'}
 
+    @staticmethod
+    async def handle_logout():
+        """登出流程（清除 session 內的登入資訊與 user id 快取）"""
+        account = app.storage.user.pop('current_user_account', None)
+        app.storage.user.pop('current_user_identity', None)
+        logger.info("👋 使用者登出：%s", account)
+        return {'status': 'success', 'message': '已登出'}
+
     @staticmethod
     async def handle_register(account: str, password: str):
         """註冊流程"""
@@ -32,4 +44,4 @@ class LoginFlowController:
         if success:
             return {'status': 'success', 'message': '註冊成功！即將返回登入頁...'}
         else:
-            return {'status': 'warning', 'message': '帳號已存在，請重新輸入'}
\ No newline at end of file
+            return {'status': 'warning', 'message': '帳號已存在，請重新輸入'}
@@ -1,26 +1,20 @@
 # 📁 flow_controllers/project_flow.py
+import json
+from collections import OrderedDict
 from nicegui import app
 from agents.project_agent import ProjectAgent
+from agents.llm_scheduler import Priority
 from controllers.project_controller import ProjectController
 from controllers.user_account_controller import UserAccountController
-
-# 可選：若你有這些 controller，就 import；沒有也沒關係（在 purge 內會 try/except）
-try:
-    from controllers.usecase_controller import UseCaseController
-    from controllers.usecasedetail_controller import UseCaseDetailController
-    from controllers.event_controller import EventController
-    from controllers.object_controller import ObjectController
-    from controllers.diagram_controller import DiagramController
-    from controllers.file_controller import FileController  # 例如產出的 md/pdf/code 管理
-except Exception:
-    UseCaseController = UseCaseDetailController = EventController = None
-    ObjectController = DiagramController = FileController = None
+from controllers.purge_controller import PurgeController
+from controllers.artifact_controller import ArtifactController
+from init_db import unit_of_work
 
 
 class ProjectFlowController:
     """整合 AI、資料庫、流程控制（含級聯清理）"""
 
-    # === 登入使用者 ===
+    # === 登入使用者（優先使用登入時快取的 user id，不查資料庫）===
     @staticmethod
     async def get_current_user_id():
         current_user = (
@@ -29,33 +23,66 @@ class ProjectFlowController:
             or app.storage.user.get('user')
         )
         if not current_user:
+            app.storage.user.pop('current_user_identity', None)
             return None
+
+        identity = app.storage.user.get('current_user_identity')
+        if identity and identity.get('account') == current_user:
+            return identity['id']
+
+        # 快取不存在或帳號已切換 → 查一次並重新快取
         user = await UserAccountController.get_single(account=current_user)
-        return user.id if user else None
+        if not user:
+            app.storage.user.pop('current_user_identity', None)
+            return None
+        app.storage.user['current_user_identity'] = {'account': current_user, 'id': user.id}
+        return user.id
 
     # === 初次生成 ===
     @staticmethod
-    async def generate_project_data(project_name: str):
-        result = await ProjectAgent.generate_project_json(project_name)
+    async def generate_project_data(project_name: str, on_queue=None, priority: Priority = Priority.INTERACTIVE):
+        result = await ProjectAgent.generate_project_json(project_name, priority=priority, on_queue=on_queue)
         return ProjectFlowController._to_grid_rows(result)
 
-    # === 再生（完整重生，但只覆蓋選取欄位）===
+    # === 串流生成：每完成一個欄位就以 on_row(標籤, 內容) 通知畫面；排隊時以 on_queue(位置) 通知 ===
     @staticmethod
-    async def regenerate_selected_fields(project_name: str, fields: list[str], old_data: dict):
-        new_result = await ProjectAgent.generate_project_json(project_name)
-        if not new_result:
+    async def stream_project_data(project_name: str, on_row, on_queue=None, priority: Priority = Priority.INTERACTIVE):
+        labels = {path: label for label, path in ProjectFlowController.FIELD_PATHS.items()}
+
+        def on_field(path, value):
+            label = labels.get(tuple(path))
+            if label and isinstance(value, str):
+                return on_row(label, value)
+
+        result = await ProjectAgent.stream_project_json(project_name, on_field, priority=priority, on_queue=on_queue)
+        return ProjectFlowController._to_grid_rows(result)
+
+    # === 欄位標籤 → JSON 路徑 ===
+    FIELD_PATHS = {
+        "專案描述": ("description",),
+        "系統架構": ("architecture",),
+        "前端語言": ("frontend", "language"),
+        "前端平台": ("frontend", "platform"),
+        "前端函式庫": ("frontend", "library"),
+        "後端語言": ("backend", "language"),
+        "後端平台": ("backend", "platform"),
+        "後端函式庫": ("backend", "library"),
+    }
+
+    # === 再生（只請 AI 產生選取欄位，再覆蓋回原資料；模型失敗或缺少欄位時回傳 None）===
+    @staticmethod
+    async def regenerate_selected_fields(project_name: str, fields: list[str], old_data: dict, on_queue=None,
+                                         priority: Priority = Priority.INTERACTIVE):
+        mapping = ProjectFlowController.FIELD_PATHS
+        paths = [mapping[f] for f in fields if f in mapping]
+        if not paths:
             return ProjectFlowController._to_grid_rows(old_data or {})
 
-        mapping = {
-            "專案描述": ("description",),
-            "系統架構": ("architecture",),
-            "前端語言": ("frontend", "language"),
-            "前端平台": ("frontend", "platform"),
-            "前端函式庫": ("frontend", "library"),
-            "後端語言": ("backend", "language"),
-            "後端平台": ("backend", "platform"),
-            "後端函式庫": ("backend", "library"),
-        }
+        current = ProjectFlowController._to_project_json(old_data or {})
+        new_result = await ProjectAgent.generate_partial_json(project_name, current, paths,
+                                                              priority=priority, on_queue=on_queue)
+        if not new_result:
+            return None  # 模型呼叫失敗：交給呼叫端決定重試，不把舊資料當成結果
 
         updated = (old_data or {}).copy()
         for field in fields:
@@ -65,56 +92,86 @@ class ProjectFlowController:
             value = new_result
             for k in path:
                 value = value.get(k, {}) if isinstance(value, dict) else ""
-            if isinstance(value, str):
-                ref = updated
-                for k in path[:-1]:
-                    ref = ref.setdefault(k, {})
-                ref[path[-1]] = value
+            if not isinstance(value, str):
+                return None  # 回傳內容缺少要求的欄位
+            ref = updated
+            for k in path[:-1]:
+                ref = ref.setdefault(k, {})
+            ref[path[-1]] = value
 
         return ProjectFlowController._to_grid_rows(updated)
 
-    # === 儲存（若核心欄位變更 → 級聯清空） ===
+    # === 儲存（若核心欄位變更 → 只把依據這些欄位的產物標記過期） ===
     @staticmethod
     async def save_project(data: dict):
-        uid = await ProjectFlowController.get_current_user_id()
-        if not uid:
-            return {"ok": False}
-        data = {k: (v or "").strip() if isinstance(v, str) else v for k, v in data.items()}
-        data["user_id"] = uid
-
-        existing = await ProjectController.get_single(name=data["name"])
-        if not existing:
-            await ProjectController.add(**data)
-            return {"ok": True, "action": "created"}
-
-        # 比對「核心欄位」是否有變更
-        core_changed = ProjectFlowController._has_core_changes(existing, data)
-        if core_changed:
-            await ProjectFlowController.purge_downstream(existing.id)  # 🔥 清掉 2/3 階段
-            await ProjectController.update(existing.id, **data)
-            return {"ok": True, "action": "updated_purged"}
-
-        # 沒變更就單純更新（或略過）
-        await ProjectController.update(existing.id, **data)
-        return {"ok": True, "action": "updated"}
-
-    # === 取得專案清單 ===
+        # 🧾 整個儲存流程共用一個交易：標記過期 + 更新專案要嘛全部成功、要嘛全部回滾
+        async with unit_of_work():
+            uid = await ProjectFlowController.get_current_user_id()
+            if not uid:
+                return {"ok": False}
+            data = {k: (v or "").strip() if isinstance(v, str) else v for k, v in data.items()}
+            data["user_id"] = uid
+
+            # 一個 INSERT ... ON CONFLICT DO UPDATE 完成新增 / 更新，核心欄位是否變更由 SQL 判斷
+            result = await ProjectController.upsert(**data)
+            if result["action"] == "updated":
+                stale = await ArtifactController.mark_stale(result["id"], data)  # 🏷️ 開啟時再重新生成
+                return {"ok": True, "action": "updated_stale", "stale": stale}
+            return {"ok": True, "action": result["action"]}
+
+    # === 專案清單表格（AG Grid infinite row model：排序 / 篩選 / 分頁都在 SQL 做）===
+    PAGE_SIZE = 50
+    MAX_BLOCK = 500          # 單次最多回傳筆數
+    PREVIEW_CHARS = 120      # 描述 / 架構只送前幾個字到瀏覽器，完整內容由「開啟專案」取得
+    GRID_COLUMNS = {"專案名稱": "name", "專案描述": "description", "系統架構": "architecture"}
+    MAX_CURSORS = 1000       # 🔑 keyset cursor 只留在伺服器：(使用者, 排序, 篩選, 起點列號) → 上一段最後一列
+    _grid_cursors: OrderedDict = OrderedDict()
+
     @staticmethod
-    async def list_user_projects():
+    async def query_project_grid(start_row: int = 0, end_row: int = PAGE_SIZE,
+                                 sort_model: list = None, filter_model: dict = None):
+        """
+        參數直接對應 AG Grid datasource 的 getRows(params)（colId 為表格欄位名稱）。
+        回傳 {"rows": [...], "last_row": 總筆數，還沒讀到最後一頁時為 -1}
+        """
         uid = await ProjectFlowController.get_current_user_id()
         if not uid:
-            return []
-        projects = await ProjectController.list(user_id=uid)
-        return [
-            {"id": p.id, "專案名稱": p.name, "專案描述": p.description or "", "系統架構": p.architecture or ""}
-            for p in projects
+            return {"rows": [], "last_row": 0}
+
+        columns = ProjectFlowController.GRID_COLUMNS
+        sort = [
+            {"colId": columns[item["colId"]], "sort": item.get("sort")}
+            for item in sort_model or [] if item.get("colId") in columns
         ]
+        filters = {columns[label]: spec for label, spec in (filter_model or {}).items() if label in columns}
+        preview = ProjectFlowController.PREVIEW_CHARS
+        start = max(start_row, 0)
+        # 往下捲時下一段的起點就是上一段的終點 → 接著 cursor 用 keyset；跳著捲（沒有 cursor）才用 OFFSET
+        state = json.dumps([uid, sort, filters], sort_keys=True, ensure_ascii=False)
+        cursors = ProjectFlowController._grid_cursors
+        rows, last_row, cursor = await ProjectController.grid_page(
+            columns=list(columns.values()), sort_model=sort, filter_model=filters,
+            start=start,
+            limit=min(max(end_row - start_row, 1), ProjectFlowController.MAX_BLOCK),
+            previews={"description": preview, "architecture": preview},
+            after=cursors.get((state, start)) if start else None,
+            user_id=uid,
+        )
+        if cursor is not None and last_row is None:
+            cursors[(state, start + len(rows))] = cursor
+            cursors.move_to_end((state, start + len(rows)))
+            while len(cursors) > ProjectFlowController.MAX_CURSORS:
+                cursors.popitem(last=False)
+        return {
+            "rows": [{"id": r["id"], **{label: r[key] or "" for label, key in columns.items()}} for r in rows],
+            "last_row": -1 if last_row is None else last_row,
+        }
 
     # === 刪除專案（含級聯清空） ===
     @staticmethod
     async def delete_project(project_id: int):
-        await ProjectFlowController.purge_downstream(project_id)
-        return await ProjectController.delete(project_id)
+        counts = await PurgeController.purge("projects", [project_id], include_root=True)
+        return counts.get("projects", 0) > 0
 
     # === 取得專案詳細（回填用） ===
     @staticmethod
@@ -134,49 +191,35 @@ class ProjectFlowController:
             "backend_library": p.backend_library or "",
         }
 
-    # === 級聯清除：UseCase / Detail / Event / Object / Diagram / Files ===
+    # === 需要重新生成的產物（開啟專案時提示使用者）===
     @staticmethod
-    async def purge_downstream(project_id: int):
-        # 這裡盡量不 throw，中間某一層沒有就跳過
-        async def _try(coro, label):
-            try:
-                if coro:
-                    await coro
-            except Exception as e:
-                print(f"⚠️ 清理 {label} 失敗：{e}")
-
-        if UseCaseDetailController:
-            await _try(UseCaseDetailController.delete_by_project(project_id), "UseCaseDetail")
-        if UseCaseController:
-            await _try(UseCaseController.delete_by_project(project_id), "UseCase")
-        if EventController:
-            await _try(EventController.delete_by_project(project_id), "Event")
-        if ObjectController:
-            await _try(ObjectController.delete_by_project(project_id), "Object")
-        if DiagramController:
-            await _try(DiagramController.delete_by_project(project_id), "Diagram")
-        if FileController:
-            await _try(FileController.delete_project_outputs(project_id), "Files")
-
-    # === 判斷核心欄位是否有變更（影響後續 2/3 階段） ===
+    async def stale_artifacts(project_id: int) -> dict:
+        """回傳 {"class_diagrams": [3, 7], ...}"""
+        return await ArtifactController.stale(project_id)
+
+    # === 級聯清除：UseCase / 事件 / 參與者連結 / 圖表 / 物件連結（依外鍵關係，單一交易）===
     @staticmethod
-    def _has_core_changes(existing, new_data: dict) -> bool:
-        fields = [
-            ("description", "description"),
-            ("architecture", "architecture"),
-            ("frontend_language", "frontend_language"),
-            ("frontend_platform", "frontend_platform"),
-            ("frontend_library", "frontend_library"),
-            ("backend_language", "backend_language"),
-            ("backend_platform", "backend_platform"),
-            ("backend_library", "backend_library"),
-        ]
-        for model_attr, new_key in fields:
-            old = (getattr(existing, model_attr) or "").strip()
-            new = (new_data.get(new_key) or "").strip()
-            if old != new:
-                return True
-        return False
+    async def purge_downstream(project_id: int) -> dict:
+        """回傳各表刪除筆數，例如 {"use_cases": 3, "events": 18, ...}"""
+        return await PurgeController.purge("projects", [project_id])
+
+    # === 表單資料（顯示標籤 key）→ 專案 JSON（供部分再生當上下文）===
+    @staticmethod
+    def _to_project_json(data: dict) -> dict:
+        result = {}
+        for label, path in ProjectFlowController.FIELD_PATHS.items():
+            value = data.get(label)
+            if value is None:  # 也接受已經是巢狀 JSON 的資料
+                value = data
+                for k in path:
+                    value = value.get(k) if isinstance(value, dict) else None
+            if not isinstance(value, str):
+                continue
+            ref = result
+            for k in path[:-1]:
+                ref = ref.setdefault(k, {})
+            ref[path[-1]] = value
+        return result
 
     # === JSON → 表格（供 View 顯示） ===
     @staticmethod
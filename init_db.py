@@ -1,14 +1,88 @@
 import contextlib
+import contextvars
+import os
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base
 from typing import AsyncGenerator
 
-DATABASE_URL = "sqlite+aiosqlite:///SQL/base.db"
-engine = create_async_engine(DATABASE_URL)
+# === 🗄️ 資料庫位置（可用 database_url 環境變數覆寫）===
+DATABASE_URL = os.getenv("database_url", "sqlite+aiosqlite:///SQL/base.db")
+
+# === ⚙️ SQLite 連線設定：每條連線建立時套用 ===
+# WAL：讀寫互不阻塞；synchronous=NORMAL 在 WAL 下仍安全，只是斷電時可能少最後幾筆交易
+SQLITE_PRAGMAS = {
+    "busy_timeout": int(os.getenv("sqlite_busy_timeout_ms", "5000")),   # 遇到鎖先等，不直接 database is locked（放第一個，後面切 WAL 也會等）
+    "journal_mode": os.getenv("sqlite_journal_mode", "WAL"),
+    "synchronous": os.getenv("sqlite_synchronous", "NORMAL"),
+    "cache_size": int(os.getenv("sqlite_cache_size", "-65536")),        # 負數 = KiB → 約 64 MB
+    "mmap_size": int(os.getenv("sqlite_mmap_size", "268435456")),       # 256 MB 記憶體映射讀取
+    "temp_store": os.getenv("sqlite_temp_store", "MEMORY"),
+    "foreign_keys": os.getenv("sqlite_foreign_keys", "ON"),
+}
+DB_POOL_SIZE = int(os.getenv("db_pool_size", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("db_max_overflow", "10"))
+DB_READ_POOL = os.getenv("db_read_pool", "0") == "1"                   # 讀取量大時開啟唯讀連線池
+DB_READ_POOL_SIZE = int(os.getenv("db_read_pool_size", "8"))
+
+# === 🧠 實體快取（BaseController 讀取用，本行程的寫入會自動失效）===
+# 其他行程的寫入（batch_generate.py、多個 uvicorn worker）不會通知這裡，最多 TTL 秒後才看得到；
+# 多行程共用資料庫時請調低 TTL 或設 entity_cache_enabled=0
+ENTITY_CACHE_ENABLED = os.getenv("entity_cache_enabled", "1") == "1"
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("entity_cache_max_entries", "2000"))
+ENTITY_CACHE_TTL = float(os.getenv("entity_cache_ttl", "30"))         # 秒；0 = 不過期，只靠寫入失效
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_engine_with_profile(url: str = DATABASE_URL, pragmas: dict = None, read_only: bool = False,
+                               pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    """
+    建立套用 SQLite 連線設定的 async engine。
+    read_only=True：以 mode=ro 開檔並設 query_only，只給讀取流程使用。
+    pragmas=None 代表使用 SQLITE_PRAGMAS；傳入 {} 則完全不設定（SQLite 預設值）。
+    """
+    pragmas = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+    sa_url = make_url(url)
+    if not sa_url.drivername.startswith("sqlite"):
+        return create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow)
+
+    if read_only:
+        sa_url = sa_url.set(database=f"file:{sa_url.database}", query={"mode": "ro", "uri": "true"})
+        pragmas.pop("journal_mode", None)   # 唯讀連線不能切換 journal 模式
+        pragmas["query_only"] = "ON"
+
+    engine = create_async_engine(sa_url, pool_size=pool_size, max_overflow=max_overflow)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+engine = create_engine_with_profile(DATABASE_URL)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+# 📖 唯讀連線池（未開啟時讀取也走主連線池）
+read_engine = create_engine_with_profile(DATABASE_URL, read_only=True, pool_size=DB_READ_POOL_SIZE) \
+    if DB_READ_POOL else engine
+read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False) \
+    if DB_READ_POOL else async_session_maker
+
 Base: DeclarativeMeta = declarative_base()
 
+# === 🐢 relationship 預設不預先載入，要關聯資料請在查詢時指定 loader profile ===
+# 開發時設 db_lazy_raise=1 → 任何「沒被 profile 載入就存取關聯」都會直接丟例外，方便抓出 N+1
+RELATIONSHIP_LAZY = "raise_on_sql" if os.getenv("db_lazy_raise", "0") == "1" else "select"
+
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -17,4 +91,58 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
 
-get_async_session_context = contextlib.asynccontextmanager(get_async_session)
\ No newline at end of file
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session_maker() as session:
+        yield session
+
+get_async_session_context = contextlib.asynccontextmanager(get_async_session)
+get_read_session_context = contextlib.asynccontextmanager(get_read_session)
+
+
+# === 🧾 Unit of Work：一個 flow 共用同一個 session / 交易 ===
+# async with unit_of_work(): 期間所有 BaseController 操作都加入同一個 session，
+# 各操作只 flush，離開時一次 commit；中途出錯整個回滾（例如「清除下游 + 更新專案」不會只做一半）。
+# 注意：不要在 unit_of_work 內等待 AI 呼叫，否則整段期間都握著 SQLite 的寫入鎖。
+_ambient_session: contextvars.ContextVar = contextvars.ContextVar("ambient_session", default=None)
+
+
+@contextlib.asynccontextmanager
+async def unit_of_work():
+    current = _ambient_session.get()
+    if current is not None:  # 巢狀呼叫 → 直接加入外層
+        yield current
+        return
+    async with async_session_maker() as session:
+        token = _ambient_session.set(session)
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            _ambient_session.reset(token)
+
+
+def in_unit_of_work() -> bool:
+    return _ambient_session.get() is not None
+
+
+@contextlib.asynccontextmanager
+async def session_scope(read_only: bool = False):
+    """有 unit_of_work 就用它的 session，否則開一個自己的（read_only → 唯讀連線池）"""
+    current = _ambient_session.get()
+    if current is not None:
+        yield current
+        return
+    async with (read_session_maker if read_only else async_session_maker)() as session:
+        yield session
+
+
+async def commit_or_flush(session: AsyncSession):
+    """在 unit_of_work 內只 flush（交給外層 commit），否則直接 commit"""
+    if _ambient_session.get() is session:
+        await session.flush()
+    else:
+        await session.commit()
+
@@ -3,6 +3,27 @@ from nicegui import ui,app
 from views.login_view import login_page
 from flow_controllers.login_flow import LoginFlowController
 from views.project_view import project_page
+from agents.agent_client import AgentClient
+from agents.project_agent import ProjectAgent
+from flow_controllers.job_flow import JobFlowController
+from controllers.entity_cache import EntityCache
+from migrations.runner import MigrationRunner
+from fastapi.responses import PlainTextResponse
+from utils.metrics import Metrics, setup_logging, flatten_stats
+
+# === 📝 日誌等級由 log_level 環境變數控制（DEBUG 才會輸出 AI 原始回覆）===
+setup_logging()
+
+# === 🗄️ 啟動時先把資料庫結構升級到最新版本 ===
+app.on_startup(MigrationRunner.upgrade)
+
+# === 🔌 應用程式生命週期：共用 AI 連線池 ===
+app.on_startup(AgentClient.startup)
+
+# === 🧵 背景生成工作：復原未完成的工作並啟動 worker（要比連線池先停）===
+app.on_startup(JobFlowController.startup)
+app.on_shutdown(JobFlowController.shutdown)
+app.on_shutdown(AgentClient.shutdown)
 
 @ui.page('/')
 def main():
@@ -20,6 +41,29 @@ def main_page():
 def project_page_route():
     project_page()
 
+# === 🩺 維運用：AI 呼叫狀態（快取、排程、重試 / 斷路器）===
+@app.get('/agent/status')
+def agent_status():
+    return ProjectAgent.stats()
+
+# === 🧵 維運用：背景工作佇列 ===
+@app.get('/jobs/status')
+async def jobs_status():
+    return await JobFlowController.stats()
+
+# === 🧠 維運用：實體快取命中率 ===
+@app.get('/db/cache')
+def db_cache_status():
+    return EntityCache.stats()
+
+# === 📈 Prometheus 指標：HTTP / 解析 / DB 各階段耗時 + AI 呼叫狀態 ===
+Metrics.register_collector(lambda: flatten_stats("agent", ProjectAgent.stats()))
+Metrics.register_collector(lambda: flatten_stats("entity_cache", EntityCache.stats()))
+
+@app.get('/metrics')
+def metrics():
+    return PlainTextResponse(Metrics.render())
+
 ui.run(
     storage_secret='private key to secure the browser session cookie',
     reload=False,
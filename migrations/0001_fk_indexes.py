@@ -0,0 +1,26 @@
+"""0001：所有外鍵欄位補上索引，並新增 projects(user_id, name) 複合索引（save_project 依名稱查詢用）"""
+
+# (索引名稱, 資料表, 欄位) —— 名稱與 model 的 index=True 產生的一致，新舊資料庫結構相同
+INDEXES = [
+    ("ix_projects_user_id_name", "projects", ["user_id", "name"]),
+    ("ix_use_cases_project_id", "use_cases", ["project_id"]),
+    ("ix_usecase_actors_actor_id", "usecase_actors", ["actor_id"]),
+    ("ix_event_lists_use_case_id", "event_lists", ["use_case_id"]),
+    ("ix_events_event_list_id", "events", ["event_list_id"]),
+    ("ix_sequence_diagrams_use_case_id", "sequence_diagrams", ["use_case_id"]),
+    ("ix_class_diagrams_usecase_id", "class_diagrams", ["usecase_id"]),
+    ("ix_entity_relationship_diagrams_use_case_id", "entity_relationship_diagrams", ["use_case_id"]),
+    ("ix_sequence_objects_sequence_diagram_id", "sequence_objects", ["sequence_diagram_id"]),
+    ("ix_sequence_objects_object_id", "sequence_objects", ["object_id"]),
+    ("ix_class_objects_class_diagram_id", "class_objects", ["class_diagram_id"]),
+    ("ix_class_objects_object_id", "class_objects", ["object_id"]),
+    ("ix_entity_relationship_objects_class_diagram_id", "entity_relationship_objects", ["class_diagram_id"]),
+    ("ix_entity_relationship_objects_object_id", "entity_relationship_objects", ["object_id"]),
+    ("ix_methods_object_id", "methods", ["object_id"]),
+    ("ix_attributes_object_id", "attributes", ["object_id"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
@@ -0,0 +1,26 @@
+"""0002：projects 新增 core_revision，(user_id, name) 改為唯一索引（供 INSERT ... ON CONFLICT 使用）"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade(conn):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(projects)")}
+    if "core_revision" not in columns:
+        conn.exec_driver_sql("ALTER TABLE projects ADD COLUMN core_revision INTEGER NOT NULL DEFAULT 0")
+
+    # 同一使用者重複的專案名稱：保留最早的一筆，其餘改名為「名稱 (#id)」，不刪任何資料；改了哪些逐筆記錄
+    duplicates = conn.exec_driver_sql(
+        "SELECT id, user_id, name FROM projects "
+        "WHERE id NOT IN (SELECT MIN(id) FROM projects GROUP BY user_id, name)"
+    ).fetchall()
+    for project_id, user_id, name in duplicates:
+        logger.warning("⚠️ 使用者 %s 有重複的專案名稱 %r：專案 #%s 改名為 %r",
+                       user_id, name, project_id, f"{name} (#{project_id})")
+    if duplicates:
+        conn.exec_driver_sql(
+            "UPDATE projects SET name = name || ' (#' || id || ')' WHERE id = ?",
+            [(row[0],) for row in duplicates],
+        )
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_projects_user_id_name")
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ux_projects_user_id_name ON projects (user_id, name)")
@@ -0,0 +1,47 @@
+"""0003：下游產物（使用案例 / 事件清單 / 三種圖）新增 input_fingerprint 與 is_stale，取代「核心欄位一改就全部清除」"""
+import hashlib
+import json
+
+# ⚠️ 以下是撰寫這個 migration 當時的定義，刻意不引用 ArtifactController：
+#    之後 Controller 的欄位或指紋算法改了，這個 migration 的結果也不能跟著變
+# 產物資料表 → (往上找專案的外鍵欄位, 生成時依據的專案欄位)
+ARTIFACTS = {
+    "use_cases": ("project_id", ["description", "architecture"]),
+    "event_lists": ("use_case_id", ["description", "architecture"]),
+    "sequence_diagrams": ("use_case_id", ["description", "architecture", "frontend_platform", "backend_platform"]),
+    "class_diagrams": ("usecase_id", ["description", "architecture", "backend_language", "backend_platform",
+                                      "backend_library"]),
+    "entity_relationship_diagrams": ("use_case_id", ["description", "architecture", "backend_platform",
+                                                     "backend_library"]),
+}
+
+
+def _hash(value) -> str:
+    return hashlib.sha256((value or "").encode("utf-8")).hexdigest()[:16]
+
+
+def upgrade(conn):
+    for table, (owner, fields) in ARTIFACTS.items():
+        columns = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+        if "input_fingerprint" not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN input_fingerprint JSON")
+        if "is_stale" not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN is_stale BOOLEAN NOT NULL DEFAULT 0")
+        _backfill(conn, table, owner, fields)
+
+
+def _backfill(conn, table: str, owner: str, fields: list):
+    """既有產物以專案目前的欄位值蓋上指紋（視為依目前內容生成），否則第一次儲存專案就會全部被標記過期"""
+    selected = ", ".join(f"p.{field}" for field in fields)
+    if table == "use_cases":
+        source = f"{table} a JOIN projects p ON p.id = a.{owner}"
+    else:
+        source = f"{table} a JOIN use_cases u ON u.id = a.{owner} JOIN projects p ON p.id = u.project_id"
+    rows = conn.exec_driver_sql(
+        f"SELECT a.id, {selected} FROM {source} WHERE a.input_fingerprint IS NULL"
+    ).fetchall()
+    if rows:
+        conn.exec_driver_sql(
+            f"UPDATE {table} SET input_fingerprint = ? WHERE id = ?",
+            [(json.dumps({field: _hash(value) for field, value in zip(fields, row[1:])}), row[0]) for row in rows],
+        )
@@ -0,0 +1,10 @@
+"""0004：generation_jobs 新增 run_after，失敗重排的工作要等退避時間過了才會再被取走"""
+
+
+def upgrade(conn):
+    tables = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "generation_jobs" not in tables:
+        return  # 還沒有這張表 → 之後由 create_all 依 model 建立（已含新欄位）
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(generation_jobs)")}
+    if "run_after" not in columns:
+        conn.exec_driver_sql("ALTER TABLE generation_jobs ADD COLUMN run_after FLOAT")
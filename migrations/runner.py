@@ -0,0 +1,124 @@
+"""
+資料庫結構版本管理（就地升級 SQL/base.db，不刪資料）。
+
+- 版本號記在 SQLite 的 PRAGMA user_version
+- migrations/NNNN_說明.py 各自提供 upgrade(conn)（同步 Connection），依編號依序執行，每個版本一個交易
+- 全新的資料庫：直接依 model 建表並標記為最新版本
+- 新增的資料表交給 create_all（checkfirst）；既有資料表的欄位 / 索引變更才寫成 migration
+
+執行方式（於專案根目錄）：
+    python -m migrations.runner            # 升級到最新版本
+    python -m migrations.runner --check    # 只做索引檢查，有未建索引的外鍵時 exit 1
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import re
+import sys
+from sqlalchemy import inspect
+from init_db import Base, engine
+import controllers.purge_controller  # noqa: F401 匯入所有 model，讓 Base.metadata 完整
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_DIR = os.path.dirname(__file__)
+MIGRATION_FILE = re.compile(r"^(\d{4})_\w+\.py$")
+
+
+class MigrationRunner:
+
+    # === 📚 找出所有 migration（依版本排序）===
+    @staticmethod
+    def discover() -> list:
+        migrations = []
+        for filename in sorted(os.listdir(MIGRATION_DIR)):
+            match = MIGRATION_FILE.match(filename)
+            if match:
+                module = importlib.import_module(f"migrations.{filename[:-3]}")
+                migrations.append((int(match.group(1)), filename[:-3], module))
+        return migrations
+
+    @staticmethod
+    def current_version(conn) -> int:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+    @staticmethod
+    def _set_version(conn, version: int):
+        conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+    # === ⬆️ 升級到最新版本（app 啟動時呼叫）===
+    @classmethod
+    async def upgrade(cls) -> list:
+        """回傳這次套用的 migration 名稱"""
+        migrations = cls.discover()
+        head = migrations[-1][0] if migrations else 0
+        applied = []
+
+        async with engine.begin() as conn:
+            fresh = not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("projects"))
+            if fresh:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(cls._set_version, head)
+                logger.info("🆕 建立新資料庫，結構版本 %s", head)
+                return applied
+            current = await conn.run_sync(cls.current_version)
+
+        for version, name, module in migrations:
+            if version <= current:
+                continue
+            async with engine.begin() as conn:  # 每個版本一個交易：失敗就整個版本回滾
+                await conn.run_sync(module.upgrade)
+                await conn.run_sync(cls._set_version, version)
+            applied.append(name)
+            logger.info("⬆️ 已套用 migration %s", name)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)  # 補建新加入的資料表
+            missing = await conn.run_sync(cls.unindexed_foreign_keys)
+        for table, column in missing:
+            logger.warning("⚠️ 外鍵 %s.%s 沒有索引", table, column)
+        return applied
+
+    # === 🔍 索引顧問：找出沒有任何索引（以該欄位開頭）的外鍵欄位 ===
+    @staticmethod
+    def unindexed_foreign_keys(conn) -> list:
+        inspector = inspect(conn)
+        missing = []
+        for table in inspector.get_table_names():
+            leading = set()
+            primary = inspector.get_pk_constraint(table).get("constrained_columns") or []
+            if primary:
+                leading.add(primary[0])
+            for index in inspector.get_indexes(table):
+                if index["column_names"]:
+                    leading.add(index["column_names"][0])
+            for fk in inspector.get_foreign_keys(table):
+                column = fk["constrained_columns"][0]
+                if column not in leading:
+                    missing.append((table, column))
+        return missing
+
+
+async def main(check_only: bool):
+    if not check_only:
+        applied = await MigrationRunner.upgrade()
+        print(f"✅ 已套用：{applied or '無（已是最新版本）'}")
+    async with engine.connect() as conn:
+        version = await conn.run_sync(MigrationRunner.current_version)
+        missing = await conn.run_sync(MigrationRunner.unindexed_foreign_keys)
+    await engine.dispose()
+    print(f"📌 目前結構版本：{version}")
+    for table, column in missing:
+        print(f"⚠️ 外鍵 {table}.{column} 沒有索引")
+    if not missing:
+        print("✅ 所有外鍵欄位都有索引")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="只檢查外鍵索引，不升級")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check)))
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer,String
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class Actor(Base):
@@ -8,7 +8,7 @@ class Actor(Base):
     id             = Column(Integer, primary_key=True, autoincrement=True)
     name           = Column(String(255), nullable=False)
 
-    usecase_actor = relationship('UsecaseActor', back_populates='actor', lazy='selectin')
+    usecase_actor = relationship('UsecaseActor', back_populates='actor', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<Actor(id={self.id}, name='{self.name}')>"
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
     #Attribute =屬性
@@ -11,9 +11,9 @@ class Attribute(Base):
     data_type   = Column(String(100), nullable=False, comment="資料類型")
     visibility  = Column(String(50), nullable=False, comment="可見性")
 
-    object_id   = Column(Integer, ForeignKey('class_objects.id'), nullable=False, comment="所屬類別物件ID")
+    object_id   = Column(Integer, ForeignKey('class_objects.id'), nullable=False, index=True, comment="所屬類別物件ID")
 
-    object      = relationship('ClassObject', back_populates='attribute', lazy='selectin')
+    object      = relationship('ClassObject', back_populates='attribute', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<Attribute(id={self.id}, name='{self.name}', data_type='{self.data_type}', visibility='{self.visibility}', object_id='{self.object_id}')>"
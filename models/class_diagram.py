@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 
 class ClassDiagram(Base):
     __tablename__ = 'class_diagrams'
@@ -15,7 +15,15 @@ class ClassDiagram(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
-    usecase_id = Column(Integer, ForeignKey('use_cases.id'))
-    usecase = relationship('Usecase', back_populates='class_diagram', lazy='selectin')
+    usecase_id = Column(Integer, ForeignKey('use_cases.id'), index=True)
 
-from models.usecase import Usecase
\ No newline at end of file
+    input_fingerprint = Column(JSON, nullable=True, comment="生成時依據的專案欄位指紋 {欄位: hash}")
+    is_stale = Column(Boolean, nullable=False, default=False, server_default="0", comment="依據的專案欄位已變更，開啟時需重新生成")
+
+    usecase = relationship('Usecase', back_populates='class_diagram', lazy=RELATIONSHIP_LAZY)
+    class_object = relationship('ClassObject', back_populates='class_diagram', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
+    entity_relationship_object = relationship('EntityRelationshipObject', back_populates='class_diagram', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
+
+from models.usecase import Usecase
+from models.class_object import ClassObject
+from models.entity_relationship_object import EntityRelationshipObject
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship 
 
 class ClassObject(Base):
@@ -7,14 +7,18 @@ class ClassObject(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    class_diagram_id = Column(Integer, ForeignKey('class_diagrams.id'), nullable=False)
-    object_id = Column(Integer, ForeignKey('objects.id'), nullable=False)
+    class_diagram_id = Column(Integer, ForeignKey('class_diagrams.id'), nullable=False, index=True)
+    object_id = Column(Integer, ForeignKey('objects.id'), nullable=False, index=True)
 
-    class_diagram = relationship('ClassDiagram', back_populates='class_object', lazy='selectin')
-    object = relationship('Object', back_populates='class_object', lazy='selectin')
+    class_diagram = relationship('ClassDiagram', back_populates='class_object', lazy=RELATIONSHIP_LAZY)
+    object = relationship('Object', back_populates='class_object', lazy=RELATIONSHIP_LAZY)
+    method = relationship('Method', back_populates='object', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
+    attribute = relationship('Attribute', back_populates='object', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
 
     def __repr__(self):
-        return f"<ClassObject(name={self.name}, class_diagram_id={self.class_diagram_id})>"
+        return f"<ClassObject(id={self.id}, class_diagram_id={self.class_diagram_id}, object_id={self.object_id})>"
     
 from models.class_diagram import ClassDiagram
-from models.object import Object
\ No newline at end of file
+from models.object import Object
+from models.method import Method
+from models.attribute import Attribute
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship 
 
 class EntityRelationshipObject(Base):
@@ -7,14 +7,14 @@ class EntityRelationshipObject(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    object_id = Column(Integer, ForeignKey('objects.id'), nullable=False)
-    class_diagram_id = Column(Integer, ForeignKey('class_diagrams.id'), nullable=False)
+    object_id = Column(Integer, ForeignKey('objects.id'), nullable=False, index=True)
+    class_diagram_id = Column(Integer, ForeignKey('class_diagrams.id'), nullable=False, index=True)
 
-    class_diagram = relationship('ClassDiagram', back_populates='entity_relationship_object', lazy='selectin')
-    object = relationship('Object', back_populates='entity_relationship_object', lazy='selectin')
+    class_diagram = relationship('ClassDiagram', back_populates='entity_relationship_object', lazy=RELATIONSHIP_LAZY)
+    object = relationship('Object', back_populates='entity_relationship_object', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<EntityRelationshipObject(class_diagram_id={self.class_diagram_id})>"
 
-from models.entity_relationship_diagram import EntityRelationshipDiagram
+from models.class_diagram import ClassDiagram
 from models.object import Object
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class Event(Base):
@@ -11,8 +11,8 @@ class Event(Base):
     type           = Column(String(255), nullable=False)        #事件類型        
     description    = Column(String(255), nullable=False)   
 
-    event_list_id  = Column(Integer, ForeignKey('event_lists.id'))
+    event_list_id  = Column(Integer, ForeignKey('event_lists.id'), index=True)
 
-    event_list = relationship('EventList', back_populates='event', lazy='selectin')
+    event_list = relationship('EventList', back_populates='event', lazy=RELATIONSHIP_LAZY)
 
 from models.event_list import EventList
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class EventList(Base):
@@ -7,10 +7,13 @@ class EventList(Base):
     id             = Column(Integer, primary_key=True, autoincrement=True)
     type           = Column(String(255), comment="事件列表類型")
     
-    use_case_id    = Column(Integer, ForeignKey('use_cases.id'))
+    use_case_id    = Column(Integer, ForeignKey('use_cases.id'), index=True)
 
-    event = relationship('Event', back_populates='event_list', lazy='selectin', cascade="all, delete-orphan")
-    usecase = relationship('Usecase', back_populates='event_list', lazy='selectin')
+    input_fingerprint = Column(JSON, nullable=True, comment="生成時依據的專案欄位指紋 {欄位: hash}")
+    is_stale          = Column(Boolean, nullable=False, default=False, server_default="0", comment="依據的專案欄位已變更，開啟時需重新生成")
+
+    event = relationship('Event', back_populates='event_list', lazy=RELATIONSHIP_LAZY, cascade="all, delete-orphan")
+    usecase = relationship('Usecase', back_populates='event_list', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<EventList(id={self.id}, type='{self.type}')>"
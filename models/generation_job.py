@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, JSON, Text, ForeignKey, Index
+from init_db import Base
+
+class GenerationJob(Base):
+    
+    __tablename__ = 'generation_jobs'
+    __table_args__ = (
+        Index("ix_generation_jobs_status_priority", "status", "priority", "id"),  # 取下一個工作用
+    )
+
+    id               = Column(Integer, primary_key=True, autoincrement=True)
+    user_id          = Column(Integer, ForeignKey("user_accounts.id"), nullable=False, index=True)
+    kind             = Column(String(64), nullable=False, comment="工作類型（generate_project / regenerate_fields）")
+    payload          = Column(JSON, nullable=False, comment="工作參數")
+    priority         = Column(Integer, nullable=False, default=1, comment="LLM 排程優先序（數字越小越優先）")
+    status           = Column(String(16), nullable=False, default="queued", comment="queued / running / succeeded / failed")
+    attempts         = Column(Integer, nullable=False, default=0, comment="已執行次數")
+    max_attempts     = Column(Integer, nullable=False, default=3, comment="最多執行次數")
+    result           = Column(JSON, nullable=True, comment="執行結果")
+    error            = Column(Text, nullable=True, comment="最後一次失敗原因")
+    created_at       = Column(Float, nullable=False, comment="建立時間（Unix 時間戳）")
+    started_at       = Column(Float, nullable=True, comment="最後一次開始執行時間")
+    finished_at      = Column(Float, nullable=True, comment="完成 / 失敗時間")
+    run_after        = Column(Float, nullable=True, comment="失敗重排後，這個時間之前不會被取走（Unix 時間戳）")
+
+    def __repr__(self):
+        return f"<GenerationJob(id={self.id}, kind='{self.kind}', status='{self.status}', attempts={self.attempts})>"
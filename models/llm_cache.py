@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Float, JSON
+from init_db import Base
+
+class LLMCache(Base):
+    
+    __tablename__ = 'llm_cache'
+
+    key              = Column(String(64), primary_key=True, comment="sha256(模型, prompt, generationConfig)")
+    model_name       = Column(String(255), nullable=False, comment="產生此結果的模型")
+    response         = Column(JSON, nullable=False, comment="解析後的 JSON 結果")
+    created_at       = Column(Float, nullable=False, comment="建立時間（Unix 時間戳）")
+    accessed_at      = Column(Float, nullable=False, index=True, comment="最後存取時間（LRU 用）")
+    hit_count        = Column(Integer, nullable=False, default=0, comment="命中次數")
+
+    def __repr__(self):
+        return f"<LLMCache(key='{self.key[:12]}…', model_name='{self.model_name}', hit_count={self.hit_count})>"
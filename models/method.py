@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
     
     #Method =方法
@@ -11,11 +11,11 @@ class Method(Base):
     visibility     = Column(String(50), comment="方法的可見性，如public、private、protected")
     parameters     = Column(String(255),comment="參數列表，以逗號分隔")
     
-    object_id      = Column(Integer, ForeignKey('class_objects.id'), nullable=False)
+    object_id      = Column(Integer, ForeignKey('class_objects.id'), nullable=False, index=True)
 
-    object         = relationship('ClassObject', back_populates='method', lazy='selectin')
+    object         = relationship('ClassObject', back_populates='method', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<Method(id={self.id}, name='{self.name}', return_type='{self.return_type}', visibility='{self.visibility}', object_id='{self.object_id}')>"
     
-from models.object import ClassObject
\ No newline at end of file
+from models.class_object import ClassObject
\ No newline at end of file
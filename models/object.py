@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
     #Object =物件
@@ -11,11 +11,10 @@ class Object(Base):
     name        = Column(String(255), nullable=False, index=True, comment="物件名稱")
     type        = Column(String(100), nullable=False, comment="物件類型")
 
-    sequence_object = relationship('SequenceObject', back_populates='object', lazy='selectin', cascade='all, delete-orphan')
-    class_object = relationship('ClassObject', back_populates='object', lazy='selectin', cascade='all, delete-orphan')
-    entity_relationship_object = relationship('EntityRelationshipObject', back_populates='object', lazy='selectin', cascade='all, delete-orphan')
-    method     = relationship('Method', back_populates='object', lazy='selectin', cascade='all, delete-orphan')
-    attribute  = relationship('Attribute', back_populates='object', lazy='selectin', cascade='all, delete-orphan')
+    sequence_object = relationship('SequenceObject', back_populates='object', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
+    class_object = relationship('ClassObject', back_populates='object', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
+    entity_relationship_object = relationship('EntityRelationshipObject', back_populates='object', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
+    # 方法 / 屬性的外鍵指向 class_objects，關聯定義在 ClassObject
 
 
     def __repr__(self):
@@ -23,6 +22,4 @@ class Object(Base):
 
 from models.sequence_object import SequenceObject
 from models.class_object import ClassObject
-from models.entity_relationship_object import EntityRelationshipObject
-from models.method import Method
-from models.attribute import Attribute
\ No newline at end of file
+from models.entity_relationship_object import EntityRelationshipObject
\ No newline at end of file
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
-from init_db import Base
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class Project(Base):
     
     __tablename__ = 'projects'
+    __table_args__ = (
+        Index("ux_projects_user_id_name", "user_id", "name", unique=True),  # 同一使用者的專案名稱不重複（upsert 依此判斷衝突）
+    )
 
     id                = Column(Integer, primary_key=True, autoincrement=True, index=True)
     name              = Column(String(255), nullable=False, index=True, comment="專案名稱")
@@ -16,17 +19,19 @@ class Project(Base):
     backend_language  = Column(String(255), nullable=False, comment="後端語言")
     backend_platform  = Column(String(255), comment="後端平台")
     backend_library   = Column(String(255), comment="後端框架/函式庫")
+    core_revision     = Column(Integer, nullable=False, default=0, server_default="0", comment="核心欄位變更次數")
     
     # 🟢 外鍵欄位：連到使用者
     user_id           = Column(Integer, ForeignKey("user_accounts.id"), nullable=False)
 
     # 🟢 多對一關聯：每個專案都有一位使用者
-    user = relationship("UserAccount", back_populates="project", lazy="selectin")
+    user = relationship("UserAccount", back_populates="project", lazy=RELATIONSHIP_LAZY)
     # 🟢 一對多關聯：每個專案可以有多個使用案例
-    usecase = relationship("Usecase", back_populates="project", lazy="selectin")
+    usecase = relationship("Usecase", back_populates="project", lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<Project(id={self.id}, name='{self.name}', description='{self.description}', user_id={self.user_id})>"
 
 # ✅ 延後匯入，避免循環依賴
-from models.usecase import Usecase
\ No newline at end of file
+from models.usecase import Usecase
+from models.user_account import UserAccount
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 
 class SequenceDiagram(Base):
     __tablename__ = 'sequence_diagrams'
@@ -15,11 +15,16 @@ class SequenceDiagram(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),comment="建立時間")
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc),comment="更新時間")
 
-    use_case_id = Column(Integer, ForeignKey('use_cases.id'), nullable=False)
+    use_case_id = Column(Integer, ForeignKey('use_cases.id'), nullable=False, index=True)
 
-    usecase = relationship('Usecase', back_populates='sequence_diagram', lazy='selectin')
+    input_fingerprint = Column(JSON, nullable=True, comment="生成時依據的專案欄位指紋 {欄位: hash}")
+    is_stale = Column(Boolean, nullable=False, default=False, server_default="0", comment="依據的專案欄位已變更，開啟時需重新生成")
+
+    usecase = relationship('Usecase', back_populates='sequence_diagram', lazy=RELATIONSHIP_LAZY)
+    sequence_object = relationship('SequenceObject', back_populates='sequence_diagram', lazy=RELATIONSHIP_LAZY, cascade='all, delete-orphan')
 
     def __repr__(self):
-        return f"<SequenceDiagram(name={self.name}, use_case_id={self.use_case_id})>"
+        return f"<SequenceDiagram(id={self.id}, use_case_id={self.use_case_id})>"
     
 from models.usecase import Usecase
+from models.sequence_object import SequenceObject
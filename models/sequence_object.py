@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship 
 
 class SequenceObject(Base):
@@ -7,14 +7,14 @@ class SequenceObject(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
  
-    sequence_diagram_id = Column(Integer, ForeignKey('sequence_diagrams.id'), nullable=False)
-    object_id = Column(Integer, ForeignKey('objects.id'), nullable=False)
+    sequence_diagram_id = Column(Integer, ForeignKey('sequence_diagrams.id'), nullable=False, index=True)
+    object_id = Column(Integer, ForeignKey('objects.id'), nullable=False, index=True)
 
-    sequence_diagram = relationship('SequenceDiagram', back_populates='sequence_objects', lazy='selectin')
-    object = relationship('Object', back_populates='sequence_objects', lazy='selectin')
+    sequence_diagram = relationship('SequenceDiagram', back_populates='sequence_object', lazy=RELATIONSHIP_LAZY)
+    object = relationship('Object', back_populates='sequence_object', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
-        return f"<SequenceObject(name={self.name}, sequence_diagram_id={self.sequence_diagram_id})>"
+        return f"<SequenceObject(id={self.id}, sequence_diagram_id={self.sequence_diagram_id}, object_id={self.object_id})>"
 
 from models.sequence_diagram import SequenceDiagram
 from models.object import Object
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String,Text, ForeignKey
-from init_db import Base
+from sqlalchemy import Column, Integer, String,Text, ForeignKey, JSON, Boolean
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class Usecase(Base):
@@ -15,14 +15,17 @@ class Usecase(Base):
     post_condition       = Column(String(255), comment="後置條件")
     trigger_condition    = Column(String(255))
 
-    project_id           = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id           = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
 
-    project = relationship("Project", back_populates="usecase", lazy="selectin")
-    usecase_actor = relationship("UsecaseActor", back_populates="usecase", lazy="selectin", cascade="all, delete-orphan")
-    event_list = relationship("EventList", back_populates="usecase", lazy="selectin", cascade="all, delete-orphan")
-    sequence_diagram = relationship("SequenceDiagram", back_populates="usecase", lazy="selectin", cascade="all, delete-orphan")
-    class_diagram = relationship("ClassDiagram", back_populates="usecase", lazy="selectin", cascade="all, delete-orphan")
-    entity_relationship_diagram = relationship("EntityRelationshipDiagram", back_populates="usecase", lazy="selectin", cascade="all, delete-orphan")
+    input_fingerprint    = Column(JSON, nullable=True, comment="生成時依據的專案欄位指紋 {欄位: hash}")
+    is_stale             = Column(Boolean, nullable=False, default=False, server_default="0", comment="依據的專案欄位已變更，開啟時需重新生成")
+
+    project = relationship("Project", back_populates="usecase", lazy=RELATIONSHIP_LAZY)
+    usecase_actor = relationship("UsecaseActor", back_populates="usecase", lazy=RELATIONSHIP_LAZY, cascade="all, delete-orphan")
+    event_list = relationship("EventList", back_populates="usecase", lazy=RELATIONSHIP_LAZY, cascade="all, delete-orphan")
+    sequence_diagram = relationship("SequenceDiagram", back_populates="usecase", lazy=RELATIONSHIP_LAZY, cascade="all, delete-orphan")
+    class_diagram = relationship("ClassDiagram", back_populates="usecase", lazy=RELATIONSHIP_LAZY, cascade="all, delete-orphan")
+    entity_relationship_diagram = relationship("EntityRelationshipDiagram", back_populates="usecase", lazy=RELATIONSHIP_LAZY, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<UseCase(id={self.id}, name='{self.name}')>"
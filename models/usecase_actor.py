@@ -1,15 +1,15 @@
 from sqlalchemy import Column, Integer,ForeignKey
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class UsecaseActor(Base):
     __tablename__ = 'usecase_actors'
 
     use_case_id        = Column(Integer, ForeignKey('use_cases.id'), primary_key=True)
-    actor_id           = Column(Integer, ForeignKey('actors.id'), primary_key=True)
+    actor_id           = Column(Integer, ForeignKey('actors.id'), primary_key=True, index=True)
 
-    usecase         = relationship('Usecase', back_populates='usecase_actor', lazy='selectin')
-    actor           = relationship('Actor', back_populates='usecase_actor', lazy='selectin')
+    usecase         = relationship('Usecase', back_populates='usecase_actor', lazy=RELATIONSHIP_LAZY)
+    actor           = relationship('Actor', back_populates='usecase_actor', lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<UsecaseActor(use_case_id={self.use_case_id}, actor_id={self.actor_id})>"
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String
-from init_db import Base
+from init_db import Base, RELATIONSHIP_LAZY
 from sqlalchemy.orm import relationship
 
 class UserAccount(Base):
@@ -12,7 +12,7 @@ class UserAccount(Base):
 
 
     # 🟢 一對多關聯：一個使用者有多個專案
-    project = relationship("Project", back_populates="user", lazy="selectin")
+    project = relationship("Project", back_populates="user", lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<UserAccount(id={self.id}, account='{self.account}')>"
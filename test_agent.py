@@ -0,0 +1,141 @@
+import asyncio
+import aiohttp
+from agents.project_agent import ProjectAgent
+from agents.hedging import HedgePolicy
+from agents.retry_policy import FATAL, INVALID, RETRYABLE, CircuitBreaker, RetryPolicy
+
+# ✅ ProjectAgent 的離線測試（不呼叫 Gemini）
+#    執行方式：python test_agent.py
+
+
+def test_partial_config_single_field():
+    """只再生一個短欄位：要關閉思考，輸出額度不能低於下限"""
+    sent = {}
+
+    async def fake_send(prompt, generation_config=None, use_cache=True, priority=None, on_queue=None):
+        sent.update(generation_config)
+        return {"frontend": {"library": "Vue.js"}}
+
+    original = ProjectAgent._send_request
+    ProjectAgent._send_request = staticmethod(fake_send)
+    try:
+        result = asyncio.run(ProjectAgent.generate_partial_json("測試", {}, [("frontend", "library")]))
+    finally:
+        ProjectAgent._send_request = original
+
+    assert result == {"frontend": {"library": "Vue.js"}}
+    assert sent["thinkingConfig"] == {"thinkingBudget": 0}, sent
+    assert sent["maxOutputTokens"] >= ProjectAgent.PARTIAL_MIN_TOKENS, sent
+    assert sent["temperature"] == ProjectAgent.generation_config["temperature"]
+
+
+# === 🔌 斷路器試探請求：不論怎麼結束都要放開試探名額 ===
+def _open_policy() -> RetryPolicy:
+    policy = RetryPolicy(max_attempts=1, breaker=CircuitBreaker(threshold=1, reset_timeout=0))
+    policy.breaker.state = CircuitBreaker.OPEN  # reset_timeout=0 → 下一次 allow() 就進入 half_open
+    return policy
+
+
+async def _probe_upstream(fake_post, policy: RetryPolicy):
+    """斷路器處於 half_open 時送出一次請求（_post_once 換成 fake_post）"""
+    original_policy, original_post = ProjectAgent.retry_policy, ProjectAgent._post_once
+    ProjectAgent.retry_policy, ProjectAgent._post_once = policy, staticmethod(fake_post)
+    try:
+        return await ProjectAgent._request_upstream(
+            {"contents": [], "generationConfig": ProjectAgent.generation_config}, "probe-test"
+        )
+    finally:
+        ProjectAgent.retry_policy, ProjectAgent._post_once = original_policy, original_post
+
+
+def test_classify_errors():
+    """非 JSON 的 200 回應是內容問題（INVALID），不是 FATAL；狀態碼錯誤仍依狀態碼判斷"""
+    assert RetryPolicy.classify(aiohttp.ContentTypeError(None, (), status=200)) == INVALID
+    assert RetryPolicy.classify(aiohttp.ContentTypeError(None, (), status=503)) == RETRYABLE
+    assert RetryPolicy.classify(aiohttp.ClientResponseError(None, (), status=400)) == FATAL
+    assert RetryPolicy.classify(aiohttp.ClientResponseError(None, (), status=429)) == RETRYABLE
+    assert RetryPolicy.classify(asyncio.TimeoutError()) == RETRYABLE
+
+
+def test_breaker_half_open_fatal_probe():
+    """試探請求收到 400：上游有回應 → 斷路器關閉，不會卡在試探中"""
+    async def bad_request(data):
+        raise aiohttp.ClientResponseError(None, (), status=400)
+
+    policy = _open_policy()
+    result = asyncio.run(_probe_upstream(bad_request, policy))
+    assert result == {}
+    assert policy.fatal == 1
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+    assert not policy.breaker._probing
+    assert policy.breaker.allow()
+
+
+def test_breaker_half_open_cancelled_probe():
+    """試探請求被取消：維持 half_open，但下一個請求可以再試探"""
+    async def hang(data):
+        await asyncio.sleep(30)
+
+    policy = _open_policy()
+    breaker = policy.breaker
+
+    async def scenario():
+        task = asyncio.create_task(_probe_upstream(hang, policy))
+        await asyncio.sleep(0.05)
+        assert breaker._probing
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker._probing
+    assert breaker.allow()
+
+
+def test_breaker_half_open_unexpected_error():
+    """試探請求丟出未分類的例外：例外照常往外拋，試探名額仍會放開"""
+    async def broken(data):
+        raise KeyError("candidates")
+
+    policy = _open_policy()
+    try:
+        asyncio.run(_probe_upstream(broken, policy))
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("KeyError 應該往外拋")
+    assert policy.breaker.state == CircuitBreaker.HALF_OPEN
+    assert not policy.breaker._probing
+
+
+# === 🏁 對沖：記錄主請求的延遲，而不是贏家的 ===
+def test_hedge_records_cancelled_primary():
+    """主請求卡住、對沖請求贏：記到的是主請求已等待的時間（下限），不是對沖請求的短延遲"""
+    policy = HedgePolicy(enabled=True, percentile=0.5, max_ratio=1.0, min_samples=1)
+    policy.latency.record(0.05)
+    calls = []
+
+    async def upstream():
+        calls.append(None)
+        await asyncio.sleep(0.5 if len(calls) == 1 else 0.0)
+        return len(calls)
+
+    async def scenario():
+        result = await policy.run(upstream)
+        await asyncio.sleep(0.01)  # 讓被取消的主請求跑完 except 區塊
+        return result
+
+    assert asyncio.run(scenario()) == 2
+    assert policy.hedge_wins == 1
+    assert len(policy.latency.samples) == 2
+    assert policy.latency.samples[-1] >= 0.04  # 至少等到對沖門檻（0.05s）才被取消
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
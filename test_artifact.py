@@ -0,0 +1,76 @@
+import asyncio
+from migrations.runner import MigrationRunner
+from controllers.artifact_controller import ArtifactController
+from controllers.purge_controller import PurgeController
+from controllers.user_account_controller import UserAccountController
+from controllers.project_controller import ProjectController
+from controllers.usecase_controller import UsecaseController
+from controllers.class_diagram_controller import ClassDiagramController
+
+# ✅ 驗證「只有依據欄位變更的產物才會被標記過期」
+#    執行方式：python test_artifact.py（測試資料會在結束時刪除）
+
+ACCOUNT = "artifact_test"
+
+
+async def save(user_id: int, **changes) -> dict:
+    """和 ProjectFlowController.save_project 相同：upsert 後依指紋標記過期"""
+    data = {
+        "name": "指紋測試", "description": "線上書店", "architecture": "前後端分離",
+        "frontend_language": "JavaScript", "frontend_library": "Vue.js",
+        "backend_language": "Python", "backend_library": "SQLAlchemy", "user_id": user_id,
+    }
+    data.update(changes)
+    result = await ProjectController.upsert(**data)
+    if result["action"] == "updated":
+        return await ArtifactController.mark_stale(result["id"], data)
+    return {}
+
+
+async def main():
+    await MigrationRunner.upgrade()
+    user = await UserAccountController.add(account=ACCOUNT, password="123456")
+    try:
+        await save(user.id)
+        project = await ProjectController.get_single(user_id=user.id, name="指紋測試")
+        usecases = await UsecaseController.add_many([{"name": f"使用案例 {i}", "project_id": project.id} for i in range(2)])
+        diagram = await ClassDiagramController.add(usecase_id=usecases[0].id)
+
+        # 1️⃣ 新增時就蓋上指紋
+        assert all(u.input_fingerprint == ArtifactController.fingerprint(type(u), {
+            "description": "線上書店", "architecture": "前後端分離"}) for u in usecases)
+        assert set(diagram.input_fingerprint) == set(ArtifactController.DEPENDENCIES[type(diagram)])
+        print("✅ 新增產物時蓋上指紋")
+
+        # 2️⃣ 只改前端函式庫：使用案例與類別圖都不依據它 → 不標記
+        stale = await save(user.id, frontend_library="React")
+        assert stale == {}, stale
+        assert await ArtifactController.stale(project.id) == {}
+        print("✅ 只改 frontend_library：產物維持最新")
+
+        # 3️⃣ 改描述：所有產物都依據它 → 全部標記過期
+        stale = await save(user.id, frontend_library="React", description="線上二手書店")
+        assert stale == {"use_cases": 2, "class_diagrams": 1}, stale
+        print(f"✅ 改 description：標記 {stale}")
+
+        # 4️⃣ 重新生成後清除過期標記
+        await ClassDiagramController.update(diagram.id, mermaid_code="classDiagram\n  class Book")
+        assert await ArtifactController.refresh(type(diagram), [diagram.id]) == 1
+        found = await ArtifactController.stale(project.id)
+        assert found == {"use_cases": sorted(u.id for u in usecases)}, found
+        print("✅ 重新生成後類別圖恢復最新")
+
+        # 5️⃣ 舊資料前後有空白、送出的是 strip 過的相同內容：不算變更，不遞增 core_revision
+        await ProjectController.update_where({"description": "  線上二手書店\n"}, id=project.id)
+        revision = (await ProjectController.get_single(id=project.id)).core_revision
+        assert await save(user.id, frontend_library="React", description="線上二手書店") == {}
+        assert (await ProjectController.get_single(id=project.id)).core_revision == revision
+        assert await ArtifactController.stale(project.id) == {"use_cases": sorted(u.id for u in usecases)}
+        print("✅ 只差前後空白：不視為核心欄位變更")
+    finally:
+        # 🧹 清掉測試資料
+        await PurgeController.purge("user_accounts", [user.id], include_root=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
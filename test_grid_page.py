@@ -0,0 +1,80 @@
+import asyncio
+from migrations.runner import MigrationRunner
+from controllers.project_controller import ProjectController
+from controllers.user_account_controller import UserAccountController
+
+# ✅ 專案表格的 keyset 分頁：排序值相同（ties）、NULL 與空字串都不會漏列或重複
+#    執行方式：python test_grid_page.py（測試資料會在結束時刪除）
+
+ACCOUNT = "grid_page_test"
+COLUMNS = ["name", "description", "architecture"]
+DESCRIPTIONS = ["B", None, "A", "", "A", None, "B", "A", None]
+ARCHITECTURES = ["MVC", None, "MVC", "MVC", None, "分層", "", "分層", "MVC"]
+
+
+async def walk(sort_model, user_id, size=2):
+    """第一段用 OFFSET，之後每段都接上一段的 cursor"""
+    ids, after, start = [], None, 0
+    while True:
+        rows, last_row, after = await ProjectController.grid_page(
+            columns=COLUMNS, sort_model=sort_model, start=start, limit=size, after=after, user_id=user_id,
+        )
+        ids += [row["id"] for row in rows]
+        start += len(rows)
+        if last_row is not None:
+            assert last_row == start, (last_row, start)
+            return ids
+
+
+def expected(projects, sort_model):
+    """Python 端的參考排序：NULL 視為 ""，最後以 id 分先後"""
+    ordered = sorted(projects, key=lambda p: p.id)
+    for item in reversed(sort_model):
+        ordered.sort(key=lambda p: getattr(p, item["colId"]) or "", reverse=item["sort"] == "desc")
+    return [p.id for p in ordered]
+
+
+async def main():
+    await MigrationRunner.upgrade()
+    user = await UserAccountController.add(account=ACCOUNT, password="123456")
+    try:
+        projects = await ProjectController.add_many([
+            {"name": f"表格 {i}", "description": description, "architecture": architecture,
+             "frontend_language": "Python", "backend_language": "Python", "user_id": user.id}
+            for i, (description, architecture) in enumerate(zip(DESCRIPTIONS, ARCHITECTURES))
+        ])
+
+        # 1️⃣ 單欄 / 多欄、asc / desc：逐段讀完與一次讀完的順序一致，每列剛好出現一次
+        for sort_model in (
+            [{"colId": "description", "sort": "asc"}],
+            [{"colId": "description", "sort": "desc"}],
+            [{"colId": "architecture", "sort": "desc"}, {"colId": "description", "sort": "asc"}],
+            [],
+        ):
+            ids = await walk(sort_model, user.id)
+            assert ids == expected(projects, sort_model), (sort_model, ids)
+            assert len(set(ids)) == len(projects)
+        print("✅ keyset 分頁：ties / NULL / 空字串不漏列、不重複")
+
+        # 2️⃣ 讀完第一段後有新資料（描述 NULL）排到 cursor 前面：
+        #    keyset 接著 cursor 讀，不會像 OFFSET 一樣重複上一段的最後一列
+        sort_model = [{"colId": "description", "sort": "asc"}]
+        first, _, cursor = await ProjectController.grid_page(
+            columns=COLUMNS, sort_model=sort_model, limit=5, user_id=user.id,
+        )
+        await ProjectController.add(name="表格 新增", frontend_language="Python", backend_language="Python",
+                                    user_id=user.id)
+        rest, _, _ = await ProjectController.grid_page(
+            columns=COLUMNS, sort_model=sort_model, start=5, limit=50, after=cursor, user_id=user.id,
+        )
+        seen = [row["id"] for row in first + rest]
+        assert len(seen) == len(set(seen)) == len(projects), seen
+        print("✅ 資料變動時 keyset 仍從上一段最後一列接著讀")
+    finally:
+        # 🧹 清掉測試資料
+        await ProjectController.delete_where(user_id=user.id)
+        await UserAccountController.delete_where(id=user.id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
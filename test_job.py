@@ -0,0 +1,99 @@
+import asyncio
+import time
+import aiohttp
+from migrations.runner import MigrationRunner
+from agents.project_agent import ProjectAgent
+from controllers.job_controller import JobController
+from controllers.user_account_controller import UserAccountController
+from flow_controllers.job_flow import JobFlowController
+
+# ✅ 背景工作的重試規則：失敗後退避、不可重試的錯誤直接失敗、排隊位置來自工作佇列
+#    執行方式：python test_job.py（測試資料會在結束時刪除）
+
+ACCOUNT = "job_test"
+
+
+async def run_with(handler, job):
+    """以指定的處理函式執行一次工作（不啟動 worker pool）"""
+    JobFlowController.HANDLERS["test"] = "_test_handler"
+    JobFlowController._test_handler = staticmethod(handler)
+    try:
+        await JobFlowController._run(job)
+    finally:
+        del JobFlowController.HANDLERS["test"]
+        del JobFlowController._test_handler
+    return await JobController.get_single(id=job.id)
+
+
+async def main():
+    await MigrationRunner.upgrade()
+    user = await UserAccountController.add(account=ACCOUNT, password="123456")
+    try:
+        # 1️⃣ 暫時性錯誤：放回佇列但要等退避時間，這段期間 claim() 拿不到
+        await JobController.enqueue(user.id, "test", {}, 0, 3)
+        job = await JobController.claim()
+
+        async def flaky(payload, live, priority):
+            raise RuntimeError("AI 生成失敗")
+
+        job = await run_with(flaky, job)
+        assert job.status == "queued" and job.run_after > time.time(), job
+        assert await JobController.claim() is None
+        await JobController.update_where({"run_after": time.time() - 1}, id=job.id)
+        job = await JobController.claim()
+        assert job is not None and job.attempts == 2
+        print("✅ 暫時性錯誤：退避時間過後才再被取走")
+
+        # 2️⃣ 上游回 400（FATAL）：重試也沒用 → 直接 failed，不再耗掉剩下的次數
+        async def bad_request(payload, live, priority):
+            ProjectAgent.retry_policy.record_error(aiohttp.ClientResponseError(None, (), status=400))
+            raise RuntimeError("AI 生成失敗")
+
+        job = await run_with(bad_request, job)
+        assert job.status == "failed" and job.attempts == 2, job
+        print("✅ FATAL 錯誤：直接標記 failed")
+
+        # 3️⃣ 排隊位置：依 priority、id 排在前面且可以被取走的工作數 + 1（退避中的不算）
+        jobs = [await JobController.enqueue(user.id, "test", {}, priority, 3) for priority in (1, 0, 1)]
+        assert [await JobController.position(j.id) for j in jobs] == [2, 1, 3]
+        await JobController.update_where({"run_after": time.time() + 60}, id=jobs[1].id)
+        assert [await JobController.position(j.id) for j in (jobs[0], jobs[2])] == [1, 2]
+        print("✅ 排隊位置來自工作佇列")
+        await JobController.delete_where(id=[j.id for j in jobs])
+
+        # 4️⃣ 再生欄位時模型沒有回傳結果：不能把舊資料當成功，要放回佇列退避
+        async def no_result(*args, **kwargs):
+            return {}
+
+        original = ProjectAgent.generate_partial_json
+        ProjectAgent.generate_partial_json = no_result
+        try:
+            payload = {"project_name": "再生測試", "fields": ["專案描述"], "old_data": {"description": "舊的"}}
+            await JobController.enqueue(user.id, "regenerate_fields", payload, 0, 3)
+            job = await JobController.claim()
+            await JobFlowController._run(job)
+            JobFlowController._live.pop(job.id, None)
+        finally:
+            ProjectAgent.generate_partial_json = original
+        job = await JobController.get_single(id=job.id)
+        assert job.status == "queued" and job.run_after > time.time() and job.result is None, job
+        print("✅ 再生沒有結果：視為失敗並退避重試")
+
+        # 5️⃣ 次數用完的工作：claim() 不再取走；中斷在執行中的，recover() 標記 failed 而不是放回佇列
+        await JobController.update_where({"attempts": 3, "run_after": None}, id=job.id)
+        assert await JobController.claim() is None
+        await JobController.update_where({"status": "running"}, id=job.id)
+        interrupted = await JobController.enqueue(user.id, "test", {}, 0, 3)
+        await JobController.update_where({"status": "running", "attempts": 1}, id=interrupted.id)
+        assert await JobController.recover() == {"queued": 1, "failed": 1}
+        assert (await JobController.get_single(id=job.id)).status == "failed"
+        assert (await JobController.get_single(id=interrupted.id)).status == "queued"
+        print("✅ 重試次數用完：不再被取走，中斷後也不會重新排隊")
+    finally:
+        # 🧹 清掉測試資料
+        await JobController.delete_where(user_id=user.id)
+        await UserAccountController.delete_where(id=user.id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
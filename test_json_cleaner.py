@@ -0,0 +1,42 @@
+from utils.json_cleaner import extract_json
+
+# ✅ extract_json 的容錯解析測試
+#    執行方式：python test_json_cleaner.py
+
+
+def test_fenced_json_after_braces_in_prose():
+    """說明文字含有 {name} 時，要以圍欄內的物件為準"""
+    value, repairs = extract_json('Sure! Use {name}.\n```json\n{"a": 1}\n```')
+    assert value == {"a": 1}
+    assert "stripped_prefix" in repairs
+
+
+def test_fence_inside_string_value():
+    """字串值裡的 ```json 不算圍欄"""
+    text = '{"doc": "```json\\n{\\"x\\": 1}\\n```"}'
+    value, repairs = extract_json(text)
+    assert value == {"doc": '```json\n{"x": 1}\n```'}
+    assert repairs == []
+
+
+def test_truncated_literal():
+    """截斷在 true / null / 數字中間：丟掉不完整的值與它的 key"""
+    assert extract_json('{"a":"x","b": tru')[0] == {"a": "x"}
+    assert extract_json('{"a": {"b": nul')[0] == {"a": {}}
+    assert extract_json('{"a": [1, 2, -')[0] == {"a": [1, 2]}
+    assert extract_json('{"a": 12')[0] == {"a": 12}  # 完整的值保留
+
+
+def test_truncated_unicode_escape():
+    """截斷在 \\u 跳脫中間：丟掉不完整的跳脫，字串其餘部分保留"""
+    value, repairs = extract_json('{"a": "x", "b": "caf\\u00')
+    assert value == {"a": "x", "b": "caf"}
+    assert "truncated" in repairs
+    assert extract_json('{"a": "caf\\u00e9"}')[0] == {"a": "café"}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
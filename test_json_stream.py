@@ -0,0 +1,47 @@
+from utils.json_stream import IncrementalJSONParser
+
+# ✅ IncrementalJSONParser 的串流解析測試
+#    執行方式：python test_json_stream.py
+
+
+def feed_all(chunks):
+    parser = IncrementalJSONParser()
+    events = [event for chunk in chunks for event in parser.feed(chunk)]
+    return parser, events
+
+
+def test_fields_reported_as_they_complete():
+    """欄位完整出現就回報，不必等整份 JSON 結束；切在任何位置都一樣"""
+    text = '```json\n{"name": "AI 助理", "frontend": {"language": "Vue", "tags": ["a", "b"]}, "n": 3}'
+    parser, events = feed_all(text[i:i + 3] for i in range(0, len(text), 3))
+    assert events == [
+        (("name",), "AI 助理"),
+        (("frontend", "language"), "Vue"),
+        (("frontend", "tags"), ["a", "b"]),
+        (("n",), 3),
+    ]
+    assert parser.done and parser.result["frontend"]["tags"] == ["a", "b"]
+
+
+def test_unicode_escape_split_across_chunks():
+    """\\uXXXX 被切成兩段也能正確組回"""
+    parser, events = feed_all(['{"a": "caf\\u00', 'e9"}'])
+    assert events == [(("a",), "café")]
+    assert parser.done
+
+
+def test_malformed_unicode_escape_kept_as_text():
+    """不合法的 \\u 跳脫不能讓解析器丟出 ValueError：保留成文字，後面的字元照常解析"""
+    parser, events = feed_all(['{"\\u[', '...": "\\u12"}'])
+    assert events == [(("\\u[...",), "\\u12")], events
+    assert parser.done
+
+    parser, _ = feed_all(['{"a": "x\\uZZ", "b": 1}'])
+    assert parser.result == {"a": "x\\uZZ", "b": 1}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+from sqlalchemy import event
+from init_db import engine, read_engine
+from migrations.runner import MigrationRunner
+from controllers.entity_cache import EntityCache
+from controllers.user_account_controller import UserAccountController
+from controllers.project_controller import ProjectController
+from controllers.usecase_controller import UsecaseController
+from controllers.event_list_controller import EventListController
+from controllers.event_controller import EventController
+
+# ✅ 驗證「登入」與「專案清單」送出的 SQL 數量不會隨資料量增加
+#    執行方式：python test_query_count.py（測試資料會在結束時刪除）
+
+ACCOUNT = "query_count_test"
+
+
+@contextlib.contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    targets = {engine.sync_engine, read_engine.sync_engine}  # 開啟唯讀連線池時讀取走 read_engine
+    for target in targets:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+async def main():
+    await MigrationRunner.upgrade()  # ✅ 確保資料表存在且結構為最新版本
+
+    # 1️⃣ 建立測試資料：1 位使用者、20 個專案、每個專案 3 個使用案例、每個使用案例 2 個事件清單 × 3 個事件
+    user = await UserAccountController.add(account=ACCOUNT, password="123456")
+    projects = await ProjectController.add_many([
+        {"name": f"專案 {i:02d}", "frontend_language": "Python", "backend_language": "Python", "user_id": user.id}
+        for i in range(20)
+    ])
+    usecases = await UsecaseController.add_many([
+        {"name": f"使用案例 {j}", "project_id": p.id} for p in projects for j in range(3)
+    ])
+    event_lists = await EventListController.add_many([
+        {"type": kind, "use_case_id": u.id} for u in usecases for kind in ("正常", "例外")
+    ])
+    await EventController.add_many([
+        {"sequence_no": k, "type": "事件", "description": f"事件 {k}", "event_list_id": e.id}
+        for e in event_lists for k in range(3)
+    ])
+
+    try:
+        # 2️⃣ 登入：只查帳號本身，不應連帶載入專案 / 使用案例 / 事件…
+        with count_statements() as statements:
+            found = await UserAccountController.get_single(account=ACCOUNT)
+        assert found.id == user.id
+        assert len(statements) == 1, f"登入送出 {len(statements)} 個查詢：{statements}"
+        print(f"✅ 登入：{len(statements)} 個查詢")
+
+        # 3️⃣ 專案清單（第一頁，只取表格欄位）
+        with count_statements() as statements:
+            rows, _, _ = await ProjectController.grid_page(
+                columns=["name", "description", "architecture"],
+                sort_model=[{"colId": "name", "sort": "asc"}], limit=10, user_id=user.id,
+            )
+        assert len(rows) == 10
+        assert len(statements) == 1, f"專案清單送出 {len(statements)} 個查詢：{statements}"
+        print(f"✅ 專案清單：{len(statements)} 個查詢")
+
+        # 4️⃣ 未指定 profile 的 list 也只查本表
+        with count_statements() as statements:
+            await ProjectController.list(user_id=user.id)
+        assert len(statements) == 1, f"list 送出 {len(statements)} 個查詢：{statements}"
+        print(f"✅ list()：{len(statements)} 個查詢")
+
+        # 5️⃣ project_tree：每一層關聯一個 IN 查詢，和筆數無關
+        with count_statements() as statements:
+            tree = await ProjectController.list(profile="project_tree", user_id=user.id)
+        assert sum(len(e.event) for p in tree for u in p.usecase for e in u.event_list) == 20 * 3 * 2 * 3
+        assert len(statements) <= 6, f"project_tree 送出 {len(statements)} 個查詢：{statements}"
+        print(f"✅ project_tree（{len(tree)} 個專案）：{len(statements)} 個查詢")
+
+        # 6️⃣ EntityCache：重複查詢不再送 SQL；寫入後自動失效
+        with count_statements() as statements:
+            again = await UserAccountController.get_single(account=ACCOUNT)
+            await ProjectController.grid_page(
+                columns=["name", "description", "architecture"],
+                sort_model=[{"colId": "name", "sort": "asc"}], limit=10, user_id=user.id,
+            )
+        assert again is not found and again.id == found.id  # 每次拿到複本，不共用同一個物件
+        assert len(statements) == 0, f"快取命中仍送出 {len(statements)} 個查詢：{statements}"
+        again.password = "被呼叫端改掉"
+        assert (await UserAccountController.get_single(account=ACCOUNT)).password == found.password
+        with count_statements() as statements:
+            for _ in range(2):
+                assert await UserAccountController.get_single(account=ACCOUNT + "_missing") is None
+        assert len(statements) == 2, f"查無資料不應放進快取，實際 {len(statements)} 個查詢"
+        assert await ProjectController.update(projects[0].id, description="已修改", name="專案 00") == {"description"}
+        with count_statements() as statements:
+            rows, _, _ = await ProjectController.grid_page(
+                columns=["name", "description", "architecture"],
+                sort_model=[{"colId": "name", "sort": "asc"}], limit=10, user_id=user.id,
+            )
+        assert rows[0]["description"] == "已修改"
+        assert len(statements) == 1, f"寫入後應重新查詢，實際 {len(statements)} 個查詢"
+        # 寫入關聯表（使用案例）也要讓載入它的 profile 快取失效
+        tree = await ProjectController.list(profile="project_tree", user_id=user.id)
+        before = sum(len(p.usecase) for p in tree)
+        usecases.append(await UsecaseController.add(name="新增的使用案例", project_id=projects[0].id))
+        tree = await ProjectController.list(profile="project_tree", user_id=user.id)
+        assert sum(len(p.usecase) for p in tree) == before + 1, "寫入使用案例後 project_tree 仍是舊資料"
+        print("✅ EntityCache：命中 0 個查詢、回傳複本、不快取查無資料，寫入本表 / 關聯表後重新查詢")
+        print(f"📊 {EntityCache.stats()}")
+
+        # 7️⃣ update 沒有任何變更：只讀一次資料，不送 UPDATE、不 commit
+        with count_statements() as statements:
+            changed = await ProjectController.update(projects[0].id, description="已修改")
+        assert changed == set()
+        assert len(statements) == 1, f"沒有變更仍送出 {len(statements)} 個查詢：{statements}"
+        print("✅ update 無變更：只有 1 個 SELECT")
+    finally:
+        # 🧹 清掉測試資料
+        await EventController.delete_where(event_list_id=[e.id for e in event_lists])
+        await EventListController.delete_where(id=[e.id for e in event_lists])
+        await UsecaseController.delete_where(id=[u.id for u in usecases])
+        await ProjectController.delete_where(user_id=user.id)
+        await UserAccountController.delete_where(id=user.id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -39,4 +39,180 @@ def remove_all_comments(text: str) -> str:
     code = re.sub(r'(^|\s)#.*$', '', code, flags=re.MULTILINE)
     code = re.sub(r'(^|\s)//.*$', '', code, flags=re.MULTILINE)
     code = re.sub(r'\n{2,}', '\n', code)
-    return code.strip()
\ No newline at end of file
+    return code.strip()
+
+# === 🛠️ 單次掃描的 JSON 擷取 + 修復 ===
+_OPEN_QUOTES = {"“", "„", "＂"}
+_CLOSE_QUOTES = {"”", "＂"}
+_PUNCT_FIXES = {"：": ":", "，": ",", "｛": "{", "｝": "}", "［": "[", "］": "]"}
+_CLOSERS = {"{": "}", "[": "]"}
+_DECODER = json.JSONDecoder()
+_ESCAPED_CONTROL = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_FENCE = re.compile(r"```[a-zA-Z]*\s*(?=\{)")   # 緊接著 { 的圍欄開頭
+_BARE_STOP = set('",:[]{}')
+
+
+def extract_json(text: str):
+    """
+    從 AI 回覆中找出最外層 JSON 物件並容錯解析：只掃描一次文字、只呼叫一次 json.loads。
+    可處理：```json 標記與前後說明文字、尾逗號、字串外的智慧引號 / 全形標點、
+    字串內未跳脫的換行、字串外的 \\n 字面值、回覆被截斷（補齊引號與括號，
+    丟棄不完整的 key、寫到一半的 true / 數字與 \\u 跳脫）。
+    有 ``` 圍欄時先從圍欄內的 { 開始（前面的說明文字可能含有 {name} 之類的大括號），
+    解不開再試第一個 {，修復掃描則以圍欄內的為準。
+    回傳 (解析結果, 修復項目清單)；找不到物件或無法修復時丟出 json.JSONDecodeError。
+    """
+    first = text.find("{")
+    if first < 0:
+        raise json.JSONDecodeError("找不到 JSON 物件", text, 0)
+    fence = _FENCE.search(text)
+    start = fence.end() if fence else first
+
+    repairs = []
+
+    def note(kind):
+        if kind not in repairs:
+            repairs.append(kind)
+
+    # 快速路徑：物件本身合法時直接交給 C 實作的解析器，不必逐字掃描
+    for candidate in dict.fromkeys((start, first)):
+        try:
+            value, end = _DECODER.raw_decode(text, candidate)
+        except json.JSONDecodeError:
+            continue
+        if text[:candidate].strip():
+            note("stripped_prefix")
+        if text[end:].strip().strip("`").strip():
+            note("stripped_suffix")
+        return value, repairs
+
+    if text[:start].strip():
+        note("stripped_prefix")
+
+    out = []
+    stack = []            # 每層：[開括號, 期待的語法 key/colon/value/comma, 目前 key 在 out 的起點]
+    in_string = False
+    smart_string = False  # 字串是否以智慧引號開頭（才接受智慧引號結尾）
+    i, n, end = start, len(text), len(text)
+
+    while i < n:
+        ch = text[i]
+
+        # --- 字串內 ---
+        if in_string:
+            if ch == "\\":
+                if i + 1 < n:
+                    out.append(text[i:i + 2])
+                i += 2                     # 結尾只剩單獨的 \ → 丟棄
+                continue
+            if ch == '"' or (smart_string and ch in _CLOSE_QUOTES):
+                out.append('"')
+                in_string = False
+                top = stack[-1]
+                top[1] = "colon" if top[0] == "{" and top[1] == "key" else "comma"
+            elif ch in _ESCAPED_CONTROL:
+                out.append(_ESCAPED_CONTROL[ch])
+                note("control_char")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        # --- 字串外 ---
+        if ch in _PUNCT_FIXES:
+            ch = _PUNCT_FIXES[ch]
+            note("fullwidth_punctuation")
+
+        if ch == '"' or ch in _OPEN_QUOTES:
+            if ch != '"':
+                note("smart_quotes")
+            in_string, smart_string = True, ch != '"'
+            if stack[-1][0] == "{" and stack[-1][1] == "key":
+                stack[-1][2] = len(out)
+            out.append('"')
+        elif ch in "{[":
+            out.append(ch)
+            stack.append([ch, "key" if ch == "{" else "value", None])
+        elif ch in "}]":
+            _drop_trailing_comma(out, note)
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                end = i + 1
+                break
+            stack[-1][1] = "comma"
+        elif ch == ",":
+            out.append(ch)
+            stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+        elif ch == ":":
+            out.append(ch)
+            stack[-1][1] = "value"
+        elif ch == "\\" and i + 1 < n and text[i + 1] in "nrt":
+            note("escaped_whitespace")     # 字串外的 \n 字面值 → 當作空白
+            i += 2
+            continue
+        elif ch == "`":
+            note("stray_fence")            # 物件內殘留的 ``` 標記
+        else:
+            out.append(ch)
+            if not ch.isspace():
+                stack[-1][1] = "comma"
+        i += 1
+
+    if stack:
+        note("truncated")
+        if in_string:
+            _drop_partial_escape(out)
+            out.append('"')
+            top = stack[-1]
+            top[1] = "colon" if top[0] == "{" and top[1] == "key" else "comma"
+        elif _drop_partial_scalar(out):
+            stack[-1][1] = "value"         # 值被丟掉 → 下面連同 key 一起移除
+        while stack:
+            opener, expect, key_start = stack.pop()
+            if opener == "{" and expect in ("colon", "value") and key_start is not None:
+                del out[key_start:]        # 只有 key、沒有值 → 整個丟掉
+            _drop_trailing_comma(out, note)
+            out.append(_CLOSERS[opener])
+            if stack:
+                stack[-1][1] = "comma"     # 剛補齊的子物件就是父層這個 key 的值
+    elif text[end:].strip().strip("`").strip():
+        note("stripped_suffix")
+
+    return json.loads("".join(out)), repairs
+
+
+def _drop_partial_escape(out: list):
+    """截斷在 \\u 跳脫中間（例如 "\\u00"）→ 丟掉不完整的跳脫"""
+    for k in range(len(out) - 1, max(-1, len(out) - 5), -1):
+        if out[k] == "\\u":
+            del out[k:]
+            return
+
+
+def _drop_partial_scalar(out: list) -> bool:
+    """截斷在字串外的值中間（例如 tru、nul、1.、-）→ 丟掉這個值；完整的值保留"""
+    j = len(out)
+    while j > 0 and out[j - 1].isspace():
+        j -= 1
+    k = j
+    while k > 0 and out[k - 1] not in _BARE_STOP and not out[k - 1].isspace():
+        k -= 1
+    if k == j:
+        return False
+    try:
+        json.loads("".join(out[k:j]))
+        return False
+    except json.JSONDecodeError:
+        del out[k:]
+        return True
+
+
+def _drop_trailing_comma(out: list, note):
+    """移除結尾括號前多餘的逗號（略過中間的空白）"""
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+        note("trailing_comma")
@@ -0,0 +1,134 @@
+import json
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class IncrementalJSONParser:
+    """
+    逐段餵入 AI 串流文字的 JSON 解析器。
+    每當物件內的某個欄位（字串、數字、陣列）完整出現時，就回報 (路徑, 值)，
+    例如 (("frontend", "language"), "Vue")；不必等整份 JSON 結束。
+    第一個 { 之前的文字（例如 ```json 標記）會被忽略。
+    """
+
+    def __init__(self):
+        self.result = None      # 逐步組出的完整物件
+        self.done = False       # 最外層 } 已出現
+        self._stack = []        # 每層：[container, 此層在父層的 key, 等待 key 中?, 目前 key]
+        self._in_string = False
+        self._escape = False
+        self._unicode = None    # \uXXXX 收集中的十六進位字元
+        self._chars = []
+        self._scalar = []
+
+    # === 📥 餵入一段文字，回傳本段新完成的欄位 ===
+    def feed(self, chunk: str) -> list[tuple[tuple, object]]:
+        events = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self.result is None:
+                if ch == "{":
+                    self._open({}, events)
+                continue
+            if self._in_string:
+                self._string_char(ch, events)
+                continue
+            if ch == '"':
+                self._flush_scalar(events)
+                self._in_string, self._chars = True, []
+            elif ch in "{[":
+                self._flush_scalar(events)
+                self._open({} if ch == "{" else [], events)
+            elif ch in "}]":
+                self._flush_scalar(events)
+                self._close(events)
+            elif ch == ",":
+                self._flush_scalar(events)
+                if isinstance(self._stack[-1][0], dict):
+                    self._stack[-1][2] = True
+            elif ch == ":" or ch.isspace():
+                self._flush_scalar(events)
+            else:
+                self._scalar.append(ch)
+        return events
+
+    # === 🔤 字串（含跳脫字元）===
+    def _string_char(self, ch: str, events: list):
+        if self._unicode is not None:
+            if ch not in _HEX_DIGITS:
+                # 不合法的 \u 跳脫（AI 偶爾會吐出來）→ 當成一般文字保留，目前字元照常處理
+                self._chars.append("\\u" + "".join(self._unicode))
+                self._unicode = None
+                self._string_char(ch, events)
+                return
+            self._unicode.append(ch)
+            if len(self._unicode) == 4:
+                self._chars.append(chr(int("".join(self._unicode), 16)))
+                self._unicode = None
+        elif self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode = []
+            else:
+                self._chars.append(_ESCAPES.get(ch, ch))
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+            text = "".join(self._chars)
+            top = self._stack[-1]
+            if isinstance(top[0], dict) and top[2]:
+                top[2], top[3] = False, text
+            else:
+                self._add_value(text, events)
+        else:
+            self._chars.append(ch)
+
+    # === 🔢 數字 / true / false / null ===
+    def _flush_scalar(self, events: list):
+        if not self._scalar:
+            return
+        token, self._scalar = "".join(self._scalar), []
+        try:
+            value = json.loads(token)
+        except json.JSONDecodeError:
+            value = token
+        self._add_value(value, events)
+
+    def _add_value(self, value, events: list):
+        container, _, _, key = self._stack[-1]
+        if isinstance(container, dict):
+            container[key] = value
+            if not self._inside_list():
+                events.append((self._path() + (key,), value))
+        else:
+            container.append(value)
+
+    def _open(self, container, events: list):
+        if self.result is None:
+            self.result = container
+            self._stack.append([container, None, True, None])
+            return
+        parent, _, _, key = self._stack[-1]
+        if isinstance(parent, dict):
+            parent[key] = container
+        else:
+            parent.append(container)
+        self._stack.append([container, key, isinstance(container, dict), None])
+
+    def _close(self, events: list):
+        container, key, _, _ = self._stack.pop()
+        if not self._stack:
+            self.done = True
+            return
+        # 陣列整包視為一個欄位值回報
+        if isinstance(container, list) and isinstance(self._stack[-1][0], dict) and not self._inside_list():
+            events.append((self._path() + (key,), container))
+
+    def _path(self) -> tuple:
+        return tuple(entry[1] for entry in self._stack[1:])
+
+    def _inside_list(self) -> bool:
+        return any(isinstance(entry[0], list) for entry in self._stack)
@@ -0,0 +1,142 @@
+import contextlib
+import logging
+import os
+import threading
+import time
+
+# === 📝 日誌：用標準 logging，等級由 log_level 環境變數控制（預設 INFO）===
+# logger.debug("... %s", obj) 在 DEBUG 關閉時不會呼叫 obj 的 __repr__，幾乎零成本
+LOG_LEVEL = os.getenv("log_level", "INFO").upper()
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """固定區間的延遲分佈（Prometheus 相容）"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class Metrics:
+    """行程內的計數器 / 直方圖，由 /metrics 以 Prometheus 文字格式輸出"""
+
+    _lock = threading.Lock()
+    counters: dict = {}      # (name, labels) → 數值
+    histograms: dict = {}    # (name, labels) → Histogram
+    collectors: list = []    # 輸出時才呼叫的函式，回傳 {name: 數值} 作為 gauge
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels):
+        key = cls._key(name, labels)
+        with cls._lock:
+            cls.counters[key] = cls.counters.get(key, 0) + value
+
+    @classmethod
+    def observe(cls, name: str, value: float, **labels):
+        key = cls._key(name, labels)
+        with cls._lock:
+            histogram = cls.histograms.get(key)
+            if histogram is None:
+                histogram = cls.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    # === ⏱️ 計時：with Metrics.timer("db_seconds", op="list"): ... ===
+    @classmethod
+    @contextlib.contextmanager
+    def timer(cls, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe(name, time.perf_counter() - start, **labels)
+
+    @classmethod
+    def register_collector(cls, collector):
+        cls.collectors.append(collector)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.counters.clear()
+            cls.histograms.clear()
+
+    # === 📤 Prometheus 文字格式 ===
+    @classmethod
+    def render(cls) -> str:
+        lines = []
+        with cls._lock:
+            counters = sorted(cls.counters.items())
+            histograms = sorted(cls.histograms.items(), key=lambda item: item[0])
+
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        for collector in cls.collectors:
+            try:
+                gauges = collector()
+            except Exception as e:
+                logging.getLogger(__name__).warning("metrics collector 失敗：%s", e)
+                continue
+            for name, value in sorted(gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{str(v)}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+def flatten_stats(prefix: str, stats: dict) -> dict:
+    """把巢狀的 stats() 結果攤平成 gauge：{"agent_cache_hits": 3, ...}（只保留數值）"""
+    flat = {}
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_stats(name, value))
+        elif isinstance(value, bool):
+            flat[name] = int(value)
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
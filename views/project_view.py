@@ -1,7 +1,28 @@
 # 📁 views/project_view.py
-import asyncio
-from nicegui import ui
+import json
+from nicegui import ui, app
 from flow_controllers.project_flow import ProjectFlowController
+from flow_controllers.job_flow import JobFlowController
+from flow_controllers.login_flow import LoginFlowController
+
+
+# === 📡 AG Grid datasource：把每次 getRows 的請求交給伺服器（ui.on('project_grid_rows')）===
+# params 先存在 window.projectGridRequests，伺服器查完後以同一個 id 呼叫 successCallback
+PROJECT_GRID_DATASOURCE = """({
+    getRows: (params) => {
+        window.projectGridRequests = window.projectGridRequests || {};
+        window.projectGridSeq = (window.projectGridSeq || 0) + 1;
+        const id = window.projectGridSeq;
+        window.projectGridRequests[id] = params;
+        emitEvent('project_grid_rows', {
+            id: id,
+            startRow: params.startRow,
+            endRow: params.endRow,
+            sortModel: params.sortModel,
+            filterModel: params.filterModel,
+        });
+    },
+})"""
 
 
 def project_page():
@@ -12,6 +33,7 @@ def project_page():
         selected_fields = []
         generated_data = {}      # 以「顯示標籤」為 key 的暫存（方便直接綁 UI）
         selected_project = None  # aggrid 選到的 row 資料
+        job_progress = {}        # 目前背景工作已填上的欄位（只回填有變動的）
 
     # --- 共用：把 dict 值回填到表單 ---
     def update_fields(data: dict):
@@ -30,26 +52,23 @@ def project_page():
                 mapping[label].value = value
                 State.generated_data[label] = value
 
-    # --- 初次生成（固定 baseline）---
+    # --- AI 忙碌時顯示排隊位置（工作佇列 / 排程器回報）---
+    def show_queue_position(position: int):
+        queue_label.set_text(f"⏳ AI 忙碌中，目前排隊第 {position} 位")
+
+    # --- 初次生成（送出背景工作；串流中每完成一個欄位，輪詢時就先填上）---
     async def generate_project():
         name = project_name_input.value.strip()
         if not name:
             return ui.notify("請輸入專案名稱", color="red")
 
+        job_id = await JobFlowController.submit_generate(name)
+        if job_id is None:
+            return ui.notify("請先登入", color="red")
         ui.notify("AI 生成中...", color="blue")
-        State.loading = True
-        rows = await ProjectFlowController.generate_project_data(name)
-        State.loading = False
-
-        if not rows:
-            return ui.notify("AI 生成失敗", color="red")
+        watch_job(job_id, "generate_project")
 
-        # 轉 row -> label dict，並回填 UI
-        State.generated_data = {r["項目"]: r["內容"] for r in rows}
-        update_fields(State.generated_data)
-        ui.notify("AI 初次生成完成 ✅", color="green")
-
-    # --- 再生（完整重生，但只覆蓋勾選欄位）---
+    # --- 再生（只請 AI 產生勾選欄位並覆蓋，同樣交給背景工作）---
     async def regenerate_selected():
         name = project_name_input.value.strip()
         if not name:
@@ -57,18 +76,60 @@ def project_page():
         if not State.selected_fields:
             return ui.notify("請選擇要再生的欄位", color="red")
 
+        job_id = await JobFlowController.submit_regenerate(name, list(State.selected_fields), dict(State.generated_data))
+        if job_id is None:
+            return ui.notify("請先登入", color="red")
         ui.notify(f"AI 正在重新生成：{', '.join(State.selected_fields)}...", color="blue")
+        watch_job(job_id, "regenerate_fields")
+
+    # --- 背景工作：job id 記在 session，重新整理 / 斷線重連後仍會繼續追蹤 ---
+    def watch_job(job_id: int, kind: str):
+        app.storage.user["active_job"] = {"id": job_id, "kind": kind}
+        State.job_progress = {}
         State.loading = True
-        new_rows = await ProjectFlowController.regenerate_selected_fields(
-            name, State.selected_fields, State.generated_data
-        )
-        State.loading = False
 
-        new_data = {r["項目"]: r["內容"] for r in new_rows if r["內容"]}
-        update_fields(new_data)
-        ui.notify("AI 再生完成 ✅", color="green")
+    def finish_job():
+        app.storage.user.pop("active_job", None)
+        State.job_progress = {}
+        State.loading = False
+        queue_label.set_text("")
 
-    # --- 儲存（若「核心欄位有變」→ 自動清掉 2/3 階段產物）---
+    async def poll_job():
+        active = app.storage.user.get("active_job")
+        if not active:
+            return
+        State.loading = True
+        status = await JobFlowController.job_status(active["id"])
+        if status is None:
+            return finish_job()
+
+        if status["retry_in"] is not None:
+            queue_label.set_text(f"⏳ 上次生成失敗，約 {status['retry_in']:.0f} 秒後自動重試")
+        elif status["queue_position"]:
+            show_queue_position(status["queue_position"])
+        else:
+            queue_label.set_text("")
+        new_fields = {k: v for k, v in status["progress"].items() if State.job_progress.get(k) != v}
+        if new_fields:
+            update_fields(new_fields)
+            State.job_progress.update(new_fields)
+
+        if status["status"] == "succeeded":
+            rows = status["result"]["rows"]
+            if active["kind"] == "generate_project":
+                # 轉 row -> label dict，並回填 UI（確保最後結果與畫面一致）
+                State.generated_data = {r["項目"]: r["內容"] for r in rows}
+                update_fields(State.generated_data)
+                ui.notify("AI 初次生成完成 ✅", color="green")
+            else:
+                update_fields({r["項目"]: r["內容"] for r in rows if r["內容"]})
+                ui.notify("AI 再生完成 ✅", color="green")
+            finish_job()
+        elif status["status"] == "failed":
+            ui.notify(f"AI 生成失敗：{status['error'] or ''}", color="red")
+            finish_job()
+
+    # --- 儲存（若「核心欄位有變」→ 依據這些欄位的 2/3 階段產物標記為過期）---
     async def save_project():
         name = project_name_input.value.strip()
         if not name:
@@ -95,10 +156,14 @@ def project_page():
         action = result.get("action")
         if action == "created":
             ui.notify("專案已新增 ✅", color="green")
-        elif action == "updated":
-            ui.notify("專案已更新（內容無重大變更）✅", color="green")
-        elif action == "updated_purged":
-            ui.notify("專案已更新 ✅ — 由於核心設定變更，已清空後續(UseCase/Detail/物件/圖/檔案)產物", color="orange")
+        elif action == "unchanged":
+            ui.notify("專案內容沒有變更 ✅", color="green")
+        elif action == "updated_stale":
+            stale = sum(result.get("stale", {}).values())
+            if stale:
+                ui.notify(f"專案已更新 ✅ — 受影響的 {stale} 項後續產物（UseCase / 圖表）已標記為過期，需要重新生成", color="orange")
+            else:
+                ui.notify("專案已更新 ✅ — 後續產物不受這次變更影響", color="green")
 
     # --- 開啟專案（把 DB 內容塞回上方表單）---
     async def on_open_project():
@@ -123,6 +188,9 @@ def project_page():
             "後端函式庫": detail["backend_library"],
         })
         ui.notify(f"已開啟專案：{detail['name']}", color="green")
+        stale = sum(len(ids) for ids in (await ProjectFlowController.stale_artifacts(row["id"])).values())
+        if stale:
+            ui.notify(f"此專案有 {stale} 項後續產物（UseCase / 圖表）依據的欄位已變更，需要重新生成", color="orange")
 
     # --- 刪除專案（含級聯清掉後續產物）---
     async def on_delete_project():
@@ -133,11 +201,32 @@ def project_page():
         ui.notify(f"已刪除專案：{row['專案名稱']}（含後續產物）", color="orange")
         await refresh_project_table()
 
-    # --- 專案清單（列表）---
+    # --- 專案清單：資料改由伺服器分段提供，這裡只要求表格重新讀取目前畫面 ---
     async def refresh_project_table():
-        rows = await ProjectFlowController.list_user_projects()
-        project_table.options["rowData"] = rows
-        project_table.update()
+        project_table.run_grid_method('refreshInfiniteCache')
+
+    # --- 表格要資料（捲動 / 排序 / 篩選時觸發）：查詢後呼叫對應請求的 successCallback ---
+    async def on_grid_rows(e):
+        request = e.args
+        request_id = int(request["id"])
+        try:
+            page = await ProjectFlowController.query_project_grid(
+                request["startRow"], request["endRow"], request.get("sortModel"), request.get("filterModel")
+            )
+            reply = (f"successCallback({json.dumps(page['rows'], ensure_ascii=False)}, "
+                     f"{int(page['last_row'])})")
+        except ValueError as err:
+            ui.notify(f"無法套用篩選：{err}", color="red")
+            reply = "failCallback()"
+        project_table.client.run_javascript(
+            f"window.projectGridRequests[{request_id}]?.{reply}; delete window.projectGridRequests[{request_id}];"
+        )
+
+    # --- 登出（清除 session 與 user id 快取）---
+    async def on_logout():
+        result = await LoginFlowController.handle_logout()
+        ui.notify(result['message'], color='primary')
+        ui.navigate.to('/')
 
     # --- 勾選再生欄位 ---
     def toggle_field(field: str):
@@ -159,6 +248,7 @@ def project_page():
                 ui.step('專案物件瀏覽')
                 ui.step('程式碼生成')
             ui.button('下一步', color='blue').classes('w-full')
+            ui.button('登出', color='grey', on_click=on_logout).props('outline').classes('w-full mt-2')
 
         # 中：主內容
         with ui.card().classes('col-span-2 p-6 bg-white rounded-xl shadow-md flex flex-col gap-4 overflow-y-auto'):
@@ -187,18 +277,23 @@ def project_page():
             ui.separator()
             ui.label('📂 專案清單').classes('text-lg font-bold text-gray-700')
 
+            # infinite row model：表格只保留看得到的幾段資料，排序 / 篩選 / 分頁交給 SQL
             with ui.aggrid({
                 'columnDefs': [
-                    {'headerName': '專案名稱', 'field': '專案名稱', 'sortable': True, 'filter': True},
+                    {'headerName': '專案名稱', 'field': '專案名稱'},
                     {'headerName': '專案描述', 'field': '專案描述', 'flex': 2},
                     {'headerName': '系統架構', 'field': '系統架構', 'flex': 2},
                 ],
                 'rowSelection': 'single',
-                'defaultColDef': {'resizable': True, 'sortable': True, 'filter': True},
+                'defaultColDef': {'resizable': True, 'sortable': True, 'filter': 'agTextColumnFilter'},
+                'rowModelType': 'infinite',
+                'cacheBlockSize': ProjectFlowController.PAGE_SIZE,
+                'maxBlocksInCache': 20,
+                ':getRowId': '(params) => String(params.data.id)',
+                ':datasource': PROJECT_GRID_DATASOURCE,
             }).classes('w-full h-64 mt-3') as project_table:
                 project_table.on('cellClicked', lambda e: setattr(State, 'selected_project', e.args.get('data')))
-
-            ui.timer(1.0, lambda: asyncio.create_task(refresh_project_table()), once=True)
+            ui.on('project_grid_rows', on_grid_rows)
 
         # 右：AI 再生欄位
         with ui.card().classes('col-span-1 p-5 bg-white rounded-xl shadow-md flex flex-col gap-3 h-full'):
@@ -212,3 +307,5 @@ def project_page():
             ui.button('重新生成選取欄位', color='green', on_click=regenerate_selected).classes('w-full mt-3')
             spinner = ui.spinner(size='lg', color='blue')
             spinner.bind_visibility_from(State, 'loading')
+            queue_label = ui.label('').classes('text-sm text-orange-600 text-center')
+            ui.timer(0.5, poll_job)  # 追蹤背景工作進度（沒有進行中的工作時不做任何事）